@@ -13,15 +13,15 @@ __author__ = "Orion Bot Team"
 AVAILABLE_MODULES = [
     "moderation",           # Basic moderation commands (kick, ban, warn, etc.)
     "utility",             # Information commands (userinfo, serverinfo, notes)
-    "mass_moderation",     # Mass moderation (purgewords, massban, clean)
+    "mass_moderation",     # Mass moderation (purgewords, massban, masskick, bulkunban, roleall, clean, archivethreads)
     "quarantine",          # Quarantine system, prison break games, throw, freshaccounts
     # Add more modules here as they are created
 ]
 
 # Feature overview
 FEATURES = {
-    "moderation": ["kick", "ban", "mute", "warn", "lockdown", "unlock", "slowmode", "warnings", "clearwarnings", "userinfo", "serverlock", "serverunlock", "antiraid"],
-    "utility": ["userinfo", "serverinfo", "notes", "deletenote"],
-    "mass_moderation": ["purgewords", "massban", "masskick", "clean", "idcheck"],
+    "moderation": ["kick", "ban", "tempban", "mute", "warn", "lockdown", "unlock", "slowmode", "warnings", "clearwarnings", "badwords", "userinfo", "serverlock", "serverunlock", "antiraid"],
+    "utility": ["userinfo", "serverinfo", "notes", "deletenote", "remindme", "backupstatus", "messagestats"],
+    "mass_moderation": ["purgewords", "massban", "masskick", "bulkunban", "roleall", "clean", "regex", "archivethreads", "idcheck"],
     "quarantine": ["quarantine", "unquarantine", "quarantinelist", "setjailcam", "throw", "freshaccounts", "prisonbreak", "prisonhelp", "quarantinedebug", "quarantinetrigger"],
 } 
\ No newline at end of file
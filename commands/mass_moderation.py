@@ -7,6 +7,51 @@ from typing import Optional
 
 from config import UTC
 from data_manager import save_warnings, warnings_data
+from utils.rest import rest_executor
+from utils.matching import Matcher
+from utils.progress import ProgressReporter
+
+# Discord only bulk deletes messages younger than 14 days - the margin covers long scans
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14) - datetime.timedelta(hours=1)
+# Most messages one bulk delete call accepts
+BULK_DELETE_LIMIT = 100
+
+# /clean link detection - simple link and Discord invite link patterns
+LINK_MATCHER = Matcher.for_patterns([r'https?://\S+'])
+INVITE_MATCHER = Matcher.for_patterns([r'discord(?:\.gg|app\.com/invite)/[a-zA-Z0-9]+'])
+
+# /purgewords pipeline: pages of history and matched messages waiting for the next stage
+PURGE_PAGE_QUEUE = 4
+PURGE_MATCH_QUEUE = 500
+
+async def bulk_delete_messages(channel, messages, reason=None):
+    """Delete messages 100 per call with the bulk endpoint
+
+    Returns the number deleted and the messages of chunks Discord rejected
+    (e.g. because one was already gone), to be deleted one by one instead.
+    """
+    deleted = 0
+    rejected = []
+    for start in range(0, len(messages), BULK_DELETE_LIMIT):
+        chunk = messages[start:start + BULK_DELETE_LIMIT]
+        try:
+            await channel.delete_messages(chunk, reason=reason)
+            deleted += len(chunk)
+        except discord.Forbidden:
+            raise
+        except discord.HTTPException as e:
+            print(f"Bulk delete of {len(chunk)} messages in {channel.name} failed, deleting them one by one: {e}")
+            rejected.extend(chunk)
+    return deleted, rejected
+
+async def delete_messages_individually(channel, messages):
+    """Delete messages too old for bulk deletion one at a time, within the channel's rate limit - returns the number deleted"""
+    results = await rest_executor.run([lambda message=message: message.delete() for message in messages], bucket=f"delete:{channel.id}")
+    return sum(1 for result in results if not isinstance(result, Exception))
+
+def bulk_progress(action):
+    """Return a progress formatter for RestExecutor runs"""
+    return lambda done, total, failed: f"⏳ {action}... {done}/{total} done, {failed} failed"
 
 async def setup_mass_moderation_commands(bot):
     """Setup mass moderation commands including purgewords"""
@@ -39,6 +84,9 @@ async def setup_mass_moderation_commands(bot):
                 await interaction.followup.send("Please provide at least one word to search for.", ephemeral=True)
                 return
                 
+            # All the words are checked in one pass over each message
+            word_matcher = Matcher.for_words(search_words, whole_words=exact_match)
+            
             # Validate batch_size
             batch_size = max(10, min(batch_size, 1000))  # Ensure batch size is between 10 and 1000
             
@@ -48,178 +96,144 @@ async def setup_mass_moderation_commands(bot):
                 f"Processing in batches of {batch_size} messages at a time...", 
                 ephemeral=True
             )
+            reporter = ProgressReporter(progress)
             
             # Stats tracking
-            total_scanned = 0
-            total_matched = 0
-            total_deleted = 0
-            total_batches = 0
-            rate_limited_count = 0
-            batch_stats = []
+            stats = {"scanned": 0, "matched": 0, "deleted": 0, "bulk_deleted": 0, "batches": 0}
             
             # Calculate date filters if specified
             now = datetime.datetime.now(UTC)
             older_than_date = None if older_than <= 0 else now - datetime.timedelta(days=older_than)
             newer_than_date = None if newer_than <= 0 else now - datetime.timedelta(days=newer_than)
             
-            # Flag to track if we've reached the end of messages
-            reached_end = False
-            last_message_id = None
+            # Matches newer than this go to the bulk delete endpoint, older ones are deleted singly
+            bulk_cutoff = now - BULK_DELETE_MAX_AGE
             
             # Log to store deleted message samples
             message_samples = []
             
-            # Process messages in batches until we've covered the entire channel
-            while not reached_end:
-                # Create a batch
-                batch_number = total_batches + 1
-                await progress.edit(content=f"🔍 Scanning batch #{batch_number} in {channel.mention}...\n" +
-                                    f"Total scanned so far: {total_scanned} messages")
-                
-                # Get messages for this batch
-                try:
-                    if last_message_id:
-                        # Get messages before the last one we processed
-                        messages = []
-                        async for msg in channel.history(limit=batch_size, before=discord.Object(id=last_message_id)):
-                            messages.append(msg)
-                    else:
-                        # First batch - get most recent messages
-                        messages = []
-                        async for msg in channel.history(limit=batch_size):
-                            messages.append(msg)
-                except Exception as e:
-                    await progress.edit(content=f"Error retrieving messages: {str(e)}")
-                    break
+            def is_match(message):
+                # Skip if doesn't match our filters
+                if user and message.author.id != user.id:
+                    return False
                     
-                # Check if we've reached the end of the channel history
-                if not messages:
-                    reached_end = True
-                    break
+                # Skip if doesn't match date filters
+                if older_than_date and message.created_at > older_than_date:
+                    return False
+                if newer_than_date and message.created_at < newer_than_date:
+                    return False
                     
-                # Save the ID of the last message in this batch
-                last_message_id = messages[-1].id
-                
-                # Track stats for this batch
-                batch_scanned = len(messages)
-                batch_matched = 0
-                batch_deleted = 0
-                batch_messages = []
-                
-                # Process each message in the batch
-                for message in messages:
-                    # Skip if doesn't match our filters
-                    if user and message.author.id != user.id:
-                        continue
-                        
-                    # Skip if doesn't match date filters
-                    if older_than_date and message.created_at > older_than_date:
-                        continue
-                    if newer_than_date and message.created_at < newer_than_date:
-                        continue
-                        
-                    # Check if message content matches the search words
-                    content = message.content.lower()
-                    match_found = False
-                    
-                    if exact_match:
-                        # Split content into words and check for exact matches
-                        message_words = re.findall(r'\b\w+\b', content)
-                        match_found = any(word in message_words for word in search_words)
-                    else:
-                        # Check if any search word is contained within the content
-                        match_found = any(word in content for word in search_words)
-                        
-                    if match_found:
-                        batch_matched += 1
-                        total_matched += 1
-                        
-                        # Keep track of matched message content for logs
-                        msg_info = f"[{message.author.display_name}]: {message.content[:100]}"
-                        if len(message.content) > 100:
-                            msg_info += "..."
-                        batch_messages.append(msg_info)
+                # Check if message content matches the search words
+                return word_matcher.matches(message.content)
+            
+            # The scan is a pipeline of three tasks joined by bounded queues: one pages
+            # through the history, one matches the pages and one deletes the matches.
+            # Fetching the next page overlaps matching and deleting, and the queue
+            # limits keep a slow stage from piling up messages in memory.
+            pages = asyncio.Queue(maxsize=PURGE_PAGE_QUEUE)
+            matches = asyncio.Queue(maxsize=PURGE_MATCH_QUEUE)
+            fetch_errors = []
+            
+            async def fetch_pages():
+                try:
+                    page = []
+                    async for message in channel.history(limit=None):
+                        page.append(message)
+                        if len(page) >= batch_size:
+                            await pages.put(page)
+                            page = []
+                    if page:
+                        await pages.put(page)
+                except discord.Forbidden:
+                    raise
+                except Exception as e:
+                    print(f"Error retrieving messages from {channel.name}: {e}")
+                    fetch_errors.append(e)
+                # None marks the end of the stream for the next stage
+                await pages.put(None)
+            
+            async def match_pages():
+                while True:
+                    page = await pages.get()
+                    if page is None:
+                        break
+                    for message in page:
+                        if not is_match(message):
+                            continue
+                        stats["matched"] += 1
                         
                         # Only store first 50 samples to avoid memory issues
                         if len(message_samples) < 50:
+                            msg_info = f"[{message.author.display_name}]: {message.content[:100]}"
+                            if len(message.content) > 100:
+                                msg_info += "..."
                             message_samples.append(msg_info)
                         
-                        # Try to delete the message
-                        try:
-                            retry_count = 0
-                            max_retries = 3
-                            deletion_success = False
-                            
-                            while not deletion_success and retry_count < max_retries:
-                                try:
-                                    await message.delete()
-                                    batch_deleted += 1
-                                    total_deleted += 1
-                                    deletion_success = True
-                                    
-                                    # Add delay between deletions to manage rate limits
-                                    await asyncio.sleep(0.8)  # 800ms delay
-                                except discord.errors.HTTPException as e:
-                                    if e.status == 429:  # Rate limited
-                                        rate_limited_count += 1
-                                        retry_count += 1
-                                        
-                                        # Extract retry_after from exception or use increasing backoff
-                                        retry_after = getattr(e, 'retry_after', 1.5 * retry_count)
-                                        
-                                        # Update progress with rate limit info
-                                        await progress.edit(content=f"⚠️ Rate limited! Waiting {retry_after:.1f}s before continuing...\n" +
-                                                            f"Batch #{batch_number}: {batch_deleted}/{batch_matched} deleted so far")
-                                        
-                                        # Wait before retrying
-                                        await asyncio.sleep(retry_after)
-                                    else:
-                                        # Other HTTP error, skip this message
-                                        break
-                                except Exception:
-                                    # Any other error, skip this message
-                                    break
-                            
-                            # If we couldn't delete after max retries, log it
-                            if not deletion_success:
-                                print(f"Failed to delete message after {max_retries} attempts: {message.id}")
-                        except Exception as e:
-                            print(f"Error deleting message: {e}")
-                
-                # Update batch stats
-                total_scanned += batch_scanned
-                total_batches += 1
-                
-                # Store this batch's stats
-                batch_stats.append({
-                    "batch": batch_number,
-                    "scanned": batch_scanned,
-                    "matched": batch_matched,
-                    "deleted": batch_deleted,
-                    "oldest_msg_id": last_message_id
-                })
-                
-                # Update progress with batch results
-                batch_info = f"✅ Batch #{batch_number} complete:\n"
-                batch_info += f"- Scanned: {batch_scanned} messages\n"
-                batch_info += f"- Matched: {batch_matched} messages\n"
-                batch_info += f"- Deleted: {batch_deleted} messages\n\n"
-                batch_info += f"📊 Running Total:\n"
-                batch_info += f"- Total Scanned: {total_scanned} messages\n"
-                batch_info += f"- Total Deleted: {total_deleted}/{total_matched} messages\n"
-                batch_info += f"- Rate Limits: {rate_limited_count} occurrences\n\n"
-                
-                if not reached_end:
-                    batch_info += "⏳ Continuing to next batch..."
-                
-                await progress.edit(content=batch_info)
-                
-                # If this batch had no matches, do a shorter delay
-                if batch_matched == 0:
-                    await asyncio.sleep(1)  # 1 second between batches with no matches
-                else:
-                    # Allow a bit more time between batches with matches
-                    await asyncio.sleep(2)  # 2 seconds between batches with matches
+                        await matches.put(message)
+                    stats["scanned"] += len(page)
+                    stats["batches"] += 1
+                    report_progress()
+                await matches.put(None)
+            
+            def report_progress():
+                reporter.update(
+                    f"🔍 Scanning {channel.mention}... ({stats['batches']} batches)\n" +
+                    f"📊 Running Total:\n" +
+                    f"- Total Scanned: {stats['scanned']} messages\n" +
+                    f"- Total Deleted: {stats['deleted']}/{stats['matched']} messages\n" +
+                    f"- Bulk Deleted: {stats['bulk_deleted']} messages"
+                )
+            
+            async def delete_recent(messages):
+                deleted, rejected = await bulk_delete_messages(channel, messages, reason="Purge words")
+                stats["bulk_deleted"] += deleted
+                stats["deleted"] += deleted
+                if rejected:
+                    stats["deleted"] += await delete_messages_individually(channel, rejected)
+                report_progress()
+            
+            async def delete_old(messages):
+                stats["deleted"] += await delete_messages_individually(channel, messages)
+                report_progress()
+            
+            async def delete_matches():
+                # Recent matches are deleted 100 at a time, older ones in groups of 100 single deletes
+                recent = []
+                old = []
+                while True:
+                    message = await matches.get()
+                    if message is None:
+                        break
+                    if message.created_at > bulk_cutoff:
+                        recent.append(message)
+                        if len(recent) >= BULK_DELETE_LIMIT:
+                            await delete_recent(recent)
+                            recent = []
+                    else:
+                        old.append(message)
+                        if len(old) >= BULK_DELETE_LIMIT:
+                            await delete_old(old)
+                            old = []
+                if recent:
+                    await delete_recent(recent)
+                if old:
+                    await delete_old(old)
+            
+            stages = [asyncio.create_task(stage()) for stage in (fetch_pages, match_pages, delete_matches)]
+            try:
+                await asyncio.gather(*stages)
+            finally:
+                # If one stage failed, stop the others instead of leaving them blocked on a queue
+                for task in stages:
+                    task.cancel()
+            
+            if fetch_errors:
+                await interaction.followup.send(f"Error retrieving messages: {str(fetch_errors[0])}", ephemeral=True)
+            
+            total_scanned = stats["scanned"]
+            total_matched = stats["matched"]
+            total_deleted = stats["deleted"]
+            total_batches = stats["batches"]
             
             # Create final report embed and buttons
             if total_batches == 0:
@@ -309,7 +323,7 @@ async def setup_mass_moderation_commands(bot):
                 print(f"Error sending purge log: {e}")
             
             # Send final report to user with buttons
-            await progress.edit(content=None, embed=result_embed, view=PurgeActionView())
+            await reporter.finish(content=None, embed=result_embed, view=PurgeActionView())
             
         except discord.Forbidden:
             await interaction.followup.send("I don't have permission to delete messages in that channel.", ephemeral=True)
@@ -330,21 +344,21 @@ async def setup_mass_moderation_commands(bot):
                 await interaction.followup.send("No valid user IDs provided. Please provide space-separated user IDs.", ephemeral=True)
                 return
             
-            # Track results
-            success = []
-            failed = []
+            # Ban them concurrently, within the guild's rate limits
+            progress_msg = await interaction.followup.send(f"⏳ Banning {len(ids)} users...", ephemeral=True)
+            reporter = ProgressReporter(progress_msg)
+            results = await rest_executor.run(
+                [
+                    lambda user_id=user_id: interaction.guild.ban(discord.Object(id=int(user_id)), reason=f"Mass ban: {reason}", delete_message_days=delete_days)
+                    for user_id in ids
+                ],
+                bucket=f"ban:{interaction.guild.id}",
+                progress=reporter.callback(bulk_progress("Banning"))
+            )
             
-            # Process each ID
-            for user_id in ids:
-                try:
-                    # Try to convert to int
-                    user_id = int(user_id)
-                    
-                    # Ban the user
-                    await interaction.guild.ban(discord.Object(id=user_id), reason=f"Mass ban: {reason}", delete_message_days=delete_days)
-                    success.append(str(user_id))
-                except Exception as e:
-                    failed.append(f"{user_id} ({str(e)})")
+            # Track results
+            success = [user_id for user_id, result in zip(ids, results) if not isinstance(result, Exception)]
+            failed = [f"{user_id} ({str(result)})" for user_id, result in zip(ids, results) if isinstance(result, Exception)]
             
             # Send results
             result = f"✅ Successfully banned {len(success)} users:\n"
@@ -364,10 +378,182 @@ async def setup_mass_moderation_commands(bot):
                     color=discord.Color.red()
                 )
                 log_embed.add_field(name="Reason", value=reason)
-                log_embed.add_field(name="Banned IDs", value=", ".join(success) if success else "None", inline=False)
+                log_embed.add_field(name="Banned IDs", value=", ".join(success)[:1024] if success else "None", inline=False)
+                await log_channel.send(embed=log_embed)
+            
+            await reporter.finish(content=result[:2000])
+        except Exception as e:
+            await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
+
+    @bot.tree.command(name="masskick", description="Kick multiple users at once")
+    @app_commands.describe(members="The members to kick (space separated mentions)", reason="Reason for the kick")
+    @app_commands.default_permissions(administrator=True)
+    async def masskick(interaction: discord.Interaction, members: str, reason: str = "Mass kick"):
+        try:
+            await interaction.response.defer(ephemeral=True)
+            
+            # Get member mentions
+            matches = re.findall(r'<@!?(\d+)>', members)
+            
+            if not matches:
+                await interaction.followup.send("No valid member mentions provided. Please mention the users to kick.", ephemeral=True)
+                return
+            
+            # Check every member before kicking anyone
+            targets = []
+            failed = []
+            for user_id in matches:
+                member = interaction.guild.get_member(int(user_id))
+                if not member:
+                    failed.append(f"<@{user_id}> (Not found)")
+                elif member.top_role >= interaction.user.top_role:
+                    failed.append(f"{member.mention} (Higher role)")
+                else:
+                    targets.append(member)
+            
+            # Kick them concurrently, within the guild's rate limits
+            progress_msg = await interaction.followup.send(f"⏳ Kicking {len(targets)} members...", ephemeral=True)
+            reporter = ProgressReporter(progress_msg)
+            results = await rest_executor.run(
+                [lambda member=member: member.kick(reason=f"Mass kick: {reason}") for member in targets],
+                bucket=f"kick:{interaction.guild.id}",
+                progress=reporter.callback(bulk_progress("Kicking"))
+            )
+            
+            success = [member.mention for member, result in zip(targets, results) if not isinstance(result, Exception)]
+            failed += [f"{member.mention} ({str(result)})" for member, result in zip(targets, results) if isinstance(result, Exception)]
+            
+            # Send results
+            result = f"✅ Successfully kicked {len(success)} members:\n"
+            if success:
+                result += " ".join(success) + "\n\n"
+            
+            if failed:
+                result += f"❌ Failed to kick {len(failed)} members:\n"
+                result += " ".join(failed)
+            
+            await reporter.finish(content=result[:2000])
+        except Exception as e:
+            await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
+
+    @bot.tree.command(name="bulkunban", description="Unban multiple users by ID")
+    @app_commands.describe(user_ids="User IDs separated by spaces", reason="Reason for the unban")
+    @app_commands.default_permissions(administrator=True)
+    async def bulk_unban(interaction: discord.Interaction, user_ids: str, reason: str = "Bulk unban"):
+        try:
+            await interaction.response.defer(ephemeral=True)
+            
+            # Parse user IDs
+            ids = [id.strip() for id in user_ids.split() if id.strip().isdigit()]
+            
+            if not ids:
+                await interaction.followup.send("No valid user IDs provided. Please provide space-separated user IDs.", ephemeral=True)
+                return
+            
+            # Unban them concurrently, within the guild's rate limits
+            progress_msg = await interaction.followup.send(f"⏳ Unbanning {len(ids)} users...", ephemeral=True)
+            reporter = ProgressReporter(progress_msg)
+            results = await rest_executor.run(
+                [
+                    lambda user_id=user_id: interaction.guild.unban(discord.Object(id=int(user_id)), reason=f"Bulk unban: {reason}")
+                    for user_id in ids
+                ],
+                bucket=f"ban:{interaction.guild.id}",
+                progress=reporter.callback(bulk_progress("Unbanning"))
+            )
+            
+            # Track results
+            success = []
+            failed = []
+            for user_id, result in zip(ids, results):
+                if isinstance(result, discord.NotFound):
+                    failed.append(f"{user_id} (Not banned)")
+                elif isinstance(result, Exception):
+                    failed.append(f"{user_id} ({str(result)})")
+                else:
+                    success.append(user_id)
+            
+            # Send results
+            result = f"✅ Successfully unbanned {len(success)} users:\n"
+            if success:
+                result += ", ".join(success) + "\n\n"
+            
+            if failed:
+                result += f"❌ Failed to unban {len(failed)} users:\n"
+                result += ", ".join(failed)
+            
+            # Send log to mod-logs channel
+            log_channel = discord.utils.get(interaction.guild.text_channels, name="mod-logs")
+            if log_channel:
+                log_embed = discord.Embed(
+                    title="Bulk Unban Executed",
+                    description=f"{len(success)} users were unbanned by {interaction.user.mention}",
+                    color=discord.Color.green()
+                )
+                log_embed.add_field(name="Reason", value=reason)
+                log_embed.add_field(name="Unbanned IDs", value=", ".join(success)[:1024] if success else "None", inline=False)
                 await log_channel.send(embed=log_embed)
             
-            await interaction.followup.send(result, ephemeral=True)
+            await reporter.finish(content=result[:2000])
+        except Exception as e:
+            await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
+
+    @bot.tree.command(name="roleall", description="Add a role to all members (USE WITH CAUTION)")
+    @app_commands.describe(role="The role to add to everyone", reason="Reason for adding this role to everyone")
+    @app_commands.default_permissions(administrator=True)
+    async def role_all(interaction: discord.Interaction, role: discord.Role, reason: str):
+        try:
+            await interaction.response.defer(ephemeral=True)
+            
+            if role >= interaction.guild.me.top_role:
+                await interaction.followup.send("I cannot add a role higher than or equal to my highest role.", ephemeral=True)
+                return
+            
+            # Safety check - require explicit confirmation
+            await interaction.followup.send(
+                f"⚠️ **CAUTION**: You are about to add {role.mention} to **ALL** members in the server.\n\n"
+                f"This will affect {len(interaction.guild.members)} members and cannot be easily undone.\n\n"
+                f"**Reason provided**: {reason}\n\n"
+                f"Are you ABSOLUTELY sure you want to continue? Reply with 'YES I CONFIRM' to proceed.",
+                ephemeral=True
+            )
+            
+            def check(m):
+                return m.author.id == interaction.user.id and m.content == "YES I CONFIRM" and m.channel.id == interaction.channel.id
+            
+            try:
+                await bot.wait_for("message", check=check, timeout=30.0)
+            except asyncio.TimeoutError:
+                await interaction.followup.send("Operation cancelled due to timeout.", ephemeral=True)
+                return
+            
+            # Add the role concurrently, within the guild's rate limits
+            members = [member for member in interaction.guild.members if role not in member.roles]
+            progress_msg = await interaction.followup.send(f"⏳ Adding {role.name} to {len(members)} members...", ephemeral=True)
+            reporter = ProgressReporter(progress_msg)
+            results = await rest_executor.run(
+                [lambda member=member: member.add_roles(role, reason=f"Mass role assignment: {reason}") for member in members],
+                bucket=f"member_roles:{interaction.guild.id}",
+                progress=reporter.callback(bulk_progress(f"Adding {role.name}"))
+            )
+            
+            fail_count = sum(1 for result in results if isinstance(result, Exception))
+            success_count = len(results) - fail_count
+            await reporter.finish(content=f"✅ Role assignment complete! Added {role.mention} to {success_count} members. Failed: {fail_count}")
+            
+            # Log to mod-logs
+            log_channel = discord.utils.get(interaction.guild.text_channels, name="mod-logs")
+            if log_channel:
+                log_embed = discord.Embed(
+                    title="Mass Role Assignment",
+                    description=f"{interaction.user.mention} added {role.mention} to all members.",
+                    color=discord.Color.blue(),
+                    timestamp=datetime.datetime.now(UTC)
+                )
+                log_embed.add_field(name="Reason", value=reason, inline=False)
+                log_embed.add_field(name="Success", value=str(success_count), inline=True)
+                log_embed.add_field(name="Failed", value=str(fail_count), inline=True)
+                await log_channel.send(embed=log_embed)
         except Exception as e:
             await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
 
@@ -403,6 +589,7 @@ async def setup_mass_moderation_commands(bot):
             
             # Create progress message
             progress = await interaction.followup.send(f"Searching for messages to delete in {target_channel.mention}...", ephemeral=True)
+            reporter = ProgressReporter(progress)
             
             # Define the filter based on type
             def message_filter(message):
@@ -417,33 +604,25 @@ async def setup_mass_moderation_commands(bot):
                 elif type == "file":
                     return len(message.attachments) > 0
                 elif type == "link":
-                    # Simple link detection regex
-                    return bool(re.search(r'https?://\S+', message.content))
+                    return LINK_MATCHER.matches(message.content)
                 elif type == "invite":
-                    # Discord invite link detection
-                    return bool(re.search(r'discord(?:\.gg|app\.com/invite)/[a-zA-Z0-9]+', message.content))
+                    return INVITE_MATCHER.matches(message.content)
                 return False
                 
             # Get messages and filter them
             deleted_count = 0
-            last_report_time = datetime.datetime.now()
             
             async for message in target_channel.history(limit=amount):
                 if message_filter(message):
                     try:
                         await message.delete()
                         deleted_count += 1
-                        
-                        # Update progress periodically
-                        now = datetime.datetime.now()
-                        if deleted_count % 5 == 0 or (now - last_report_time).total_seconds() > 3:
-                            await progress.edit(content=f"Deleting messages... Removed {deleted_count} so far.")
-                            last_report_time = now
+                        reporter.update(f"Deleting messages... Removed {deleted_count} so far.")
                     except:
                         pass
                         
             # Create final report
-            await progress.edit(content=f"✅ Clean complete! Deleted {deleted_count} messages matching criteria: {type}.")
+            await reporter.finish(content=f"✅ Clean complete! Deleted {deleted_count} messages matching criteria: {type}.")
             
             # Log to mod-logs
             try:
@@ -464,4 +643,186 @@ async def setup_mass_moderation_commands(bot):
         except discord.Forbidden:
             await interaction.followup.send("I don't have permission to delete messages in that channel.", ephemeral=True)
         except Exception as e:
-            await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True) 
\ No newline at end of file
+            await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True) 
+
+    # Pattern scanning command (advanced regex search)
+    @bot.tree.command(name="regex", description="Scan and delete messages matching a regex pattern")
+    @app_commands.describe(
+        channel="The channel to scan",
+        pattern="Regex pattern to search for",
+        user="Optional: Only scan messages from this user",
+        limit="Optional: Maximum number of messages to scan (0 for all retrievable messages)",
+        action="Action to take on matching messages"
+    )
+    @app_commands.choices(action=[
+        app_commands.Choice(name="Delete", value="delete"),
+        app_commands.Choice(name="Report only", value="report")
+    ])
+    @app_commands.default_permissions(manage_messages=True)
+    async def regex(interaction: discord.Interaction, channel: discord.TextChannel, pattern: str,
+                    user: Optional[discord.Member] = None, limit: int = 1000, action: str = "report"):
+        try:
+            # Verify regex pattern
+            try:
+                matcher = Matcher.for_patterns([pattern])
+            except re.error as e:
+                await interaction.response.send_message(f"Invalid regex pattern: {str(e)}", ephemeral=True)
+                return
+            
+            # Defer response for long operation
+            await interaction.response.defer(ephemeral=True)
+            
+            # Validate limit
+            if limit <= 0:
+                limit = None  # Will retrieve all possible messages
+            
+            # Create progress message
+            progress = await interaction.followup.send(f"Scanning messages in {channel.mention} for pattern: `{pattern}`...", ephemeral=True)
+            reporter = ProgressReporter(progress)
+            
+            # Track messages
+            scanned_count = 0
+            matched = []
+            matched_messages = []
+            
+            # Scan messages
+            async for message in channel.history(limit=limit):
+                scanned_count += 1
+                
+                # Skip messages from non-target user if specified
+                if user and message.author.id != user.id:
+                    continue
+                
+                if matcher.matches(message.content):
+                    matched.append(message)
+                    
+                    # Create message info for logs
+                    if len(matched_messages) < 15:
+                        msg_info = f"[{message.author.display_name}]: {message.content[:100]}"
+                        if len(message.content) > 100:
+                            msg_info += "..."
+                        matched_messages.append(msg_info)
+                
+                reporter.update(f"Scanning... Found {len(matched)} matches (scanned {scanned_count} messages so far).")
+            
+            matched_count = len(matched)
+            deleted_count = 0
+            
+            # Delete matches - recent ones 100 per call, older ones one by one
+            if action == "delete" and matched:
+                reporter.update(f"Deleting {matched_count} matching messages...")
+                bulk_cutoff = datetime.datetime.now(UTC) - BULK_DELETE_MAX_AGE
+                recent = [message for message in matched if message.created_at > bulk_cutoff]
+                old = [message for message in matched if message.created_at <= bulk_cutoff]
+                deleted_count, rejected = await bulk_delete_messages(channel, recent, reason="Regex scan")
+                if old or rejected:
+                    deleted_count += await delete_messages_individually(channel, old + rejected)
+            
+            # Create final report
+            if action == "delete":
+                report = f"✅ Scan complete! Found {matched_count} matches and deleted {deleted_count} messages.\n"
+            else:
+                report = f"✅ Scan complete! Found {matched_count} matches.\n"
+            report += f"Scanned a total of {scanned_count} messages in {channel.mention}.\n"
+            
+            # Send to mod-logs if available
+            try:
+                log_channel = discord.utils.get(interaction.guild.text_channels, name="mod-logs")
+                if log_channel:
+                    log_embed = discord.Embed(
+                        title="Regex Pattern Scan",
+                        description=f"{interaction.user.mention} scanned for regex pattern in {channel.mention}.",
+                        color=discord.Color.blue() if action == "report" else discord.Color.red(),
+                        timestamp=datetime.datetime.now(UTC)
+                    )
+                    log_embed.add_field(name="Pattern", value=f"`{pattern}`", inline=True)
+                    log_embed.add_field(name="Action", value=action.capitalize(), inline=True)
+                    log_embed.add_field(name="User Filter", value=user.mention if user else "None", inline=True)
+                    log_embed.add_field(name="Messages Scanned", value=str(scanned_count), inline=True)
+                    log_embed.add_field(name="Matches Found", value=str(matched_count), inline=True)
+                    if action == "delete":
+                        log_embed.add_field(name="Messages Deleted", value=str(deleted_count), inline=True)
+                    
+                    # Add sample of matched messages if not too many
+                    if 0 < matched_count <= 15:
+                        samples = "\n".join(matched_messages)
+                        if len(samples) > 1024:
+                            samples = samples[:1020] + "..."
+                        log_embed.add_field(name="Sample Matched Messages", value=samples, inline=False)
+                    
+                    await log_channel.send(embed=log_embed)
+            except Exception as e:
+                print(f"Error sending regex scan log: {e}")
+            
+            # Send final report to user
+            await reporter.finish(content=report)
+            
+        except discord.Forbidden:
+            await interaction.followup.send("I don't have permission to read or delete messages in that channel.", ephemeral=True)
+        except Exception as e:
+            await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
+
+    @bot.tree.command(name="archivethreads", description="Archive all inactive threads in a channel or category")
+    @app_commands.describe(
+        channel="Channel to archive threads in (use None for all channels in category)",
+        category="Category to archive threads in (ignored if channel is specified)",
+        inactive_hours="Hours of inactivity before archiving (0 to archive all)"
+    )
+    @app_commands.default_permissions(manage_threads=True)
+    async def archivethreads(interaction: discord.Interaction, channel: Optional[discord.TextChannel] = None,
+                             category: Optional[discord.CategoryChannel] = None, inactive_hours: int = 24):
+        try:
+            await interaction.response.defer(ephemeral=True)
+            
+            # Determine target channels
+            if channel:
+                target_channels = [channel]
+            elif category:
+                target_channels = category.text_channels
+            else:
+                await interaction.followup.send("Please specify either a channel or a category.", ephemeral=True)
+                return
+                
+            if not target_channels:
+                await interaction.followup.send("No valid text channels found in the specified category.", ephemeral=True)
+                return
+                
+            # Define inactive threshold
+            if inactive_hours > 0:
+                inactive_threshold = discord.utils.utcnow() - datetime.timedelta(hours=inactive_hours)
+            else:
+                inactive_threshold = None
+            
+            def is_inactive(thread):
+                return inactive_threshold is None or thread.last_message_id is None or \
+                    discord.utils.snowflake_time(thread.last_message_id) < inactive_threshold
+            
+            # Active threads are listed per guild, so one call covers every target channel
+            parent_ids = {ch.id for ch in target_channels}
+            active_threads = [t for t in await interaction.guild.active_threads() if t.parent_id in parent_ids]
+            if not active_threads:
+                await interaction.followup.send("No active threads found in the specified channels.", ephemeral=True)
+                return
+            
+            # Archive them concurrently, within the guild's rate limits
+            to_archive = [thread for thread in active_threads if is_inactive(thread)]
+            progress_msg = await interaction.followup.send(f"⏳ Archiving {len(to_archive)} threads...", ephemeral=True)
+            reporter = ProgressReporter(progress_msg)
+            results = await rest_executor.run(
+                [
+                    lambda thread=thread: thread.edit(archived=True, reason=f"Bulk archive by {interaction.user.display_name}")
+                    for thread in to_archive
+                ],
+                bucket=f"threads:{interaction.guild.id}",
+                progress=reporter.callback(bulk_progress("Archiving"))
+            )
+            
+            for thread, result in zip(to_archive, results):
+                if isinstance(result, Exception):
+                    print(f"Error archiving thread {thread.name}: {result}")
+            archived_threads = sum(1 for result in results if not isinstance(result, Exception))
+            
+            await reporter.finish(content=f"Archived {archived_threads} out of {len(active_threads)} threads.")
+            
+        except Exception as e:
+            await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
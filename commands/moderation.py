@@ -4,8 +4,9 @@ from discord import app_commands
 from discord.ext import commands
 from typing import Optional
 
-from config import UTC
-from data_manager import warnings_data, save_warnings
+from config import UTC, BAD_WORDS
+from data_manager import warnings_data, add_warning, set_user_warnings, job_scheduler, profanity_filter, set_guild_bad_words
+from utils.jobs import make_job_id
 
 async def setup_moderation_commands(bot):
     """Setup basic moderation commands"""
@@ -42,6 +43,50 @@ async def setup_moderation_commands(bot):
         except Exception as e:
             await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
 
+    @bot.tree.command(name="tempban", description="Temporarily ban a user")
+    @app_commands.describe(
+        member="The member to temporarily ban",
+        days="Days until automatic unban",
+        hours="Hours until automatic unban",
+        reason="Reason for the temporary ban",
+        delete_days="Number of days of messages to delete"
+    )
+    @app_commands.default_permissions(ban_members=True)
+    async def tempban(interaction: discord.Interaction, member: discord.Member, days: int = 0, hours: int = 0,
+                      reason: str = "No reason provided", delete_days: int = 0):
+        if member.top_role >= interaction.user.top_role:
+            await interaction.response.send_message("You cannot ban someone with a higher or equal role!", ephemeral=True)
+            return
+        
+        if days < 0 or hours < 0 or (days == 0 and hours == 0):
+            await interaction.response.send_message("Please specify a valid time for the temporary ban.", ephemeral=True)
+            return
+        
+        try:
+            unban_time = datetime.datetime.now(UTC) + datetime.timedelta(days=days, hours=hours)
+            
+            full_reason = f"Temporary ban ({days}d {hours}h): {reason}"
+            await member.ban(reason=full_reason, delete_message_days=delete_days)
+            
+            # One unban job per user - banning them again moves it instead of adding another
+            guild_id = str(interaction.guild.id)
+            job_scheduler.schedule(
+                make_job_id("unban", guild_id, member.id), "unban", unban_time,
+                guild_id=guild_id, user_id=str(member.id), reason=f"Temporary ban expired: {reason}"
+            )
+            
+            time_str = ""
+            if days > 0:
+                time_str += f"{days} day{'s' if days != 1 else ''} "
+            if hours > 0:
+                time_str += f"{hours} hour{'s' if hours != 1 else ''}"
+            
+            await interaction.response.send_message(f"🔨 {member.mention} has been temporarily banned for {time_str.strip()}. Reason: {reason}")
+        except discord.Forbidden:
+            await interaction.response.send_message("I don't have permission to ban this member.", ephemeral=True)
+        except Exception as e:
+            await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
+
     @bot.tree.command(name="purge", description="Delete a specified number of messages")
     @app_commands.describe(amount="Number of messages to delete (max 100)")
     @app_commands.default_permissions(manage_messages=True)
@@ -92,20 +137,13 @@ async def setup_moderation_commands(bot):
             guild_id = str(interaction.guild.id)
             user_id = str(member.id)
             
-            # Initialize guild and user in warnings_data if they don't exist
-            if guild_id not in warnings_data:
-                warnings_data[guild_id] = {}
-            if user_id not in warnings_data[guild_id]:
-                warnings_data[guild_id][user_id] = []
-            
-            # Add the warning
+            # Add the warning (creates the guild and user entries if needed)
             warning = {
                 "reason": reason,
                 "timestamp": str(datetime.datetime.now(UTC)),
                 "moderator": str(interaction.user.id)
             }
-            warnings_data[guild_id][user_id].append(warning)
-            save_warnings(warnings_data)
+            add_warning(guild_id, user_id, warning)
             
             # Create warning count message
             warning_count = len(warnings_data[guild_id][user_id])
@@ -215,14 +253,72 @@ async def setup_moderation_commands(bot):
             
             # Clear warnings
             if amount <= 0 or amount >= current_count:
-                warnings_data[guild_id][user_id] = []
+                set_user_warnings(guild_id, user_id, [])
                 cleared_count = current_count
             else:
-                warnings_data[guild_id][user_id] = warnings_data[guild_id][user_id][:-amount]
+                set_user_warnings(guild_id, user_id, warnings_data[guild_id][user_id][:-amount])
                 cleared_count = amount
             
-            save_warnings(warnings_data)
-            
             await interaction.response.send_message(f"Cleared {cleared_count} warnings for {member.display_name}.", ephemeral=True)
         except Exception as e:
-            await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True) 
\ No newline at end of file
+            await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True) 
+
+    @bot.tree.command(name="badwords", description="Manage the words the auto-moderation filter removes")
+    @app_commands.describe(
+        action="What to do with the word list",
+        words="Comma-separated words to add or remove"
+    )
+    @app_commands.choices(action=[
+        app_commands.Choice(name="List", value="list"),
+        app_commands.Choice(name="Add", value="add"),
+        app_commands.Choice(name="Remove", value="remove"),
+        app_commands.Choice(name="Reset to default", value="reset")
+    ])
+    @app_commands.default_permissions(administrator=True)
+    async def badwords(interaction: discord.Interaction, action: str, words: Optional[str] = None):
+        try:
+            guild_id = interaction.guild.id
+            current = profanity_filter.words(guild_id)
+            using_default = current is None
+            if using_default:
+                current = BAD_WORDS
+            
+            if action == "list":
+                source = "default list" if using_default else "custom list"
+                words_sorted = sorted(current)
+                text = f"**Bad words ({source}, {len(current)}):**\n"
+                listed = []
+                for word in words_sorted:
+                    entry = f"||{word}||"
+                    # Whole entries only, so a spoiler is never cut in half; leave room for "…and N more"
+                    if len(text) + len(entry) + 2 > 2000 - 32:
+                        break
+                    listed.append(entry)
+                    text += entry + ", "
+                text = text[:-2] if listed else text + "None"
+                if len(listed) < len(words_sorted):
+                    text += f"\n…and {len(words_sorted) - len(listed)} more"
+                await interaction.response.send_message(text, ephemeral=True)
+                return
+            
+            if action == "reset":
+                set_guild_bad_words(guild_id, None)
+                await interaction.response.send_message("Bad word list reset to the default list.", ephemeral=True)
+                return
+            
+            # Add or remove - the guild gets its own list, starting from the one in use
+            changed = {word.strip().lower() for word in (words or "").split(",") if word.strip()}
+            if not changed:
+                await interaction.response.send_message("Please give one or more comma-separated words.", ephemeral=True)
+                return
+            
+            if action == "add":
+                new_words = set(current) | changed
+            else:
+                new_words = set(current) - changed
+            set_guild_bad_words(guild_id, new_words)
+            
+            verb = "Added" if action == "add" else "Removed"
+            await interaction.response.send_message(f"{verb} {len(changed)} word(s). The list now has {len(new_words)} words.", ephemeral=True)
+        except Exception as e:
+            await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
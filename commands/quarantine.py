@@ -3,11 +3,13 @@ import datetime
 import random
 import asyncio
 from discord import app_commands
-from discord.ext import tasks
 from typing import Optional
 
-from config import UTC, QUARANTINE_CHANNEL_NAME, JAIL_CAM_CHANNEL_NAME, PRISON_BREAK_STAGES, PRISON_BREAK_REWARDS, PRISON_BREAK_FAILURES, HELP_EMOJIS, SABOTAGE_EMOJIS
-from data_manager import quarantine_data, save_quarantine_data, fresh_account_settings, save_fresh_account_settings, prison_break_data, save_prison_break_data
+from config import UTC, QUARANTINE_CHANNEL_NAME, JAIL_CAM_CHANNEL_NAME, QUARANTINE_MODE, QUARANTINE_ROLE_NAME, PRISON_BREAK_STAGES, PRISON_BREAK_REWARDS, PRISON_BREAK_FAILURES, HELP_EMOJIS, SABOTAGE_EMOJIS
+from data_manager import quarantine_data, save_quarantine_data, add_quarantine_record, remove_quarantine_record, set_jail_cam_channel, fresh_account_settings, save_fresh_account_settings, prison_break_data, save_prison_break_data, job_scheduler
+from utils.records import QuarantineRecord
+from utils.jobs import make_job_id
+from utils.rest import rest_executor, failures
 
 async def setup_quarantine_commands(bot):
     """Setup quarantine system commands"""
@@ -83,60 +85,41 @@ async def setup_quarantine_commands(bot):
             
             # Store quarantine data
             current_time = datetime.datetime.now(UTC)
-            quarantine_data[guild_id][user_id] = {
-                "reason": reason,
-                "moderator": str(interaction.user.id),
-                "roles": user_roles,  # Store user's roles for restoration
-                "timestamp": str(current_time),
-                "channel_id": str(quarantine_channel.id),
-                "public_view": public,
-                "jail_cam_channel_id": jail_cam_channel_id
-            }
+            record = QuarantineRecord(
+                user_id=user.id,
+                reason=reason,
+                moderator_id=interaction.user.id,
+                roles=user_roles,  # Store user's roles for restoration
+                timestamp=current_time,
+                channel_id=quarantine_channel.id,
+                public_view=public,
+                jail_cam_channel_id=int(jail_cam_channel_id) if jail_cam_channel_id else None
+            )
             
             # Add expiry time if minutes is specified
             if minutes > 0:
-                end_time = current_time + datetime.timedelta(minutes=minutes)
-                quarantine_data[guild_id][user_id]["end_time"] = str(end_time)
-                quarantine_data[guild_id][user_id]["original_duration_minutes"] = minutes
+                record.end_time = current_time + datetime.timedelta(minutes=minutes)
+                record.original_duration_minutes = minutes
+            
+            # Store and save it
+            add_quarantine_record(guild_id, record)
             
-            # Save data
-            save_quarantine_data(quarantine_data)
+            # Start the release timer
+            if record.end_time is not None:
+                schedule_quarantine_release(guild_id, user_id, record.end_time)
             
             # Send response to confirm
             await interaction.response.send_message(f"Processing quarantine for {user.mention}...", ephemeral=True)
             
-            # Hide all channels from user except quarantine channel
-            for channel in interaction.guild.channels:
-                if channel.id != quarantine_channel.id:
-                    try:
-                        await channel.set_permissions(user, view_channel=False, reason=f"Quarantine: {reason}")
-                    except:
-                        pass
-                        
-            # Allow access to quarantine channel
-            await quarantine_channel.set_permissions(user, view_channel=True, read_messages=True, send_messages=True,
-                                                  reason=f"Quarantine: {reason}")
-            
-            # Remove all roles - handle permission errors gracefully
-            roles_removed = 0
-            roles_failed = 0
+            # Lock the user out of every channel but the quarantine channel and take their roles
             try:
-                for role in user.roles:
-                    if not role.is_default():
-                        try:
-                            await user.remove_roles(role, reason=f"Quarantine: {reason}")
-                            roles_removed += 1
-                        except discord.Forbidden:
-                            roles_failed += 1
-                        except Exception as e:
-                            print(f"Error removing role {role.name}: {e}")
-                            roles_failed += 1
-                            
-                if roles_failed > 0:
-                    print(f"Warning: Could not remove {roles_failed} roles due to permissions. Successfully removed {roles_removed} roles.")
-                    await interaction.followup.send(f"Warning: Could not remove all roles due to missing permissions.", ephemeral=True)
+                record.role_id = await apply_quarantine(interaction.guild, user, quarantine_channel, f"Quarantine: {reason}")
+                save_quarantine_data(quarantine_data)
+            except discord.Forbidden:
+                print(f"Warning: Could not fully quarantine {user} due to missing permissions.")
+                await interaction.followup.send(f"Warning: Could not remove all roles due to missing permissions.", ephemeral=True)
             except Exception as e:
-                print(f"Error removing roles: {e}")
+                print(f"Error quarantining {user}: {e}")
                 await interaction.followup.send(f"Warning: Could not remove all roles: {str(e)}", ephemeral=True)
             
             # Send stylish message in original channel
@@ -260,30 +243,18 @@ async def setup_quarantine_commands(bot):
                 
             # Get quarantine data
             user_data = quarantine_data[guild_id][user_id]
-            saved_roles = user_data.get("roles", [])
             
             await interaction.response.send_message(f"Processing release from quarantine for {user.mention}...", ephemeral=True)
             
-            # Reset permissions for all channels
-            for channel in interaction.guild.channels:
-                try:
-                    # Remove any specific overrides for this user
-                    await channel.set_permissions(user, overwrite=None, reason="Released from quarantine")
-                except:
-                    pass
-                    
-            # Restore roles
+            # Give back the user's access and roles
             try:
-                for role_id in saved_roles:
-                    role = interaction.guild.get_role(int(role_id))
-                    if role:
-                        await user.add_roles(role, reason="Released from quarantine")
+                await lift_quarantine(interaction.guild, user, user_data, "Released from quarantine")
             except Exception as e:
                 await interaction.followup.send(f"Warning: Could not restore all roles: {str(e)}", ephemeral=True)
                 
             # Remove from quarantine data
-            del quarantine_data[guild_id][user_id]
-            save_quarantine_data(quarantine_data)
+            remove_quarantine_record(guild_id, user_id)
+            cancel_quarantine_release(guild_id, user_id)
             
             # Send stylish unquarantine message
             embed = discord.Embed(
@@ -330,7 +301,7 @@ async def setup_quarantine_commands(bot):
             # Check if there are any quarantined users (filter out server_settings)
             quarantined_users = {}
             if guild_id in quarantine_data:
-                quarantined_users = {k: v for k, v in quarantine_data[guild_id].items() if k != "server_settings"}
+                quarantined_users = {k: v for k, v in quarantine_data[guild_id].items() if isinstance(v, QuarantineRecord)}
             
             if not quarantined_users:
                 await interaction.response.send_message("There are no users currently in quarantine.", ephemeral=True)
@@ -351,19 +322,20 @@ async def setup_quarantine_commands(bot):
                 except:
                     user_mention = f"User ID: {user_id} (left server)"
                     
-                mod_id = data.get("moderator")
+                mod_id = data.moderator_id
                 try:
-                    mod = await interaction.guild.fetch_member(int(mod_id))
+                    mod = await interaction.guild.fetch_member(mod_id)
                     mod_mention = mod.mention
                 except:
                     mod_mention = f"Mod ID: {mod_id}"
                     
-                timestamp = data.get("timestamp", "Unknown")
-                reason = data.get("reason", "No reason provided")
+                timestamp = f"<t:{int(data.timestamp.timestamp())}:f>" if data.timestamp else "Unknown"
+                if data.end_time is not None:
+                    timestamp += f" (ends <t:{int(data.end_time.timestamp())}:R>)"
                 
                 embed.add_field(
                     name=f"User: {user_mention}", 
-                    value=f"**Quarantined by:** {mod_mention}\n**Reason:** {reason}\n**When:** {timestamp}", 
+                    value=f"**Quarantined by:** {mod_mention}\n**Reason:** {data.reason}\n**When:** {timestamp}", 
                     inline=False
                 )
                 
@@ -393,7 +365,7 @@ async def setup_quarantine_commands(bot):
             # Check if there are quarantined users (filter out server_settings)
             quarantined_users = {}
             if guild_id in quarantine_data:
-                quarantined_users = {k: v for k, v in quarantine_data[guild_id].items() if k != "server_settings"}
+                quarantined_users = {k: v for k, v in quarantine_data[guild_id].items() if isinstance(v, QuarantineRecord)}
             
             if not quarantined_users:
                 await interaction.response.send_message("There's nobody in quarantine to throw things at!", ephemeral=True)
@@ -405,13 +377,13 @@ async def setup_quarantine_commands(bot):
                     await interaction.response.send_message(f"{user.mention} is not in quarantine!", ephemeral=True)
                     return
                 target_user = user
-                quarantine_channel_id = quarantined_users[str(user.id)].get("channel_id")
+                quarantine_channel_id = quarantined_users[str(user.id)].channel_id
             else:
                 # Pick a random quarantined user (excluding server_settings)
                 quarantined_user_id = random.choice(list(quarantined_users.keys()))
                 try:
                     target_user = await interaction.guild.fetch_member(int(quarantined_user_id))
-                    quarantine_channel_id = quarantined_users[quarantined_user_id].get("channel_id")
+                    quarantine_channel_id = quarantined_users[quarantined_user_id].channel_id
                 except:
                     await interaction.response.send_message("Couldn't find a valid quarantined user.", ephemeral=True)
                     return
@@ -421,7 +393,7 @@ async def setup_quarantine_commands(bot):
                 await interaction.response.send_message("Couldn't find the quarantine channel.", ephemeral=True)
                 return
                 
-            quarantine_channel = interaction.guild.get_channel(int(quarantine_channel_id))
+            quarantine_channel = interaction.guild.get_channel(quarantine_channel_id)
             if not quarantine_channel:
                 await interaction.response.send_message("Couldn't find the quarantine channel.", ephemeral=True)
                 return
@@ -555,7 +527,7 @@ async def setup_quarantine_commands(bot):
             # Check if anyone is quarantined (filter out server_settings)
             quarantined_users = {}
             if guild_id in quarantine_data:
-                quarantined_users = {k: v for k, v in quarantine_data[guild_id].items() if k != "server_settings"}
+                quarantined_users = {k: v for k, v in quarantine_data[guild_id].items() if isinstance(v, QuarantineRecord)}
             
             if not quarantined_users:
                 await interaction.followup.send("❌ No one is currently quarantined! Prison break needs prisoners!", ephemeral=True)
@@ -719,18 +691,9 @@ async def setup_quarantine_commands(bot):
         try:
             guild_id = str(interaction.guild.id)
             
-            # Initialize guild settings if not exists
-            if guild_id not in quarantine_data:
-                quarantine_data[guild_id] = {}
-            
-            # Special key for server settings
-            if "server_settings" not in quarantine_data[guild_id]:
-                quarantine_data[guild_id]["server_settings"] = {}
-            
             if channel:
                 # Set the jail-cam channel
-                quarantine_data[guild_id]["server_settings"]["jail_cam_channel_id"] = str(channel.id)
-                save_quarantine_data(quarantine_data)
+                set_jail_cam_channel(guild_id, channel.id)
                 
                 embed = discord.Embed(
                     title="🔧 Jail-Cam Channel Configured",
@@ -755,9 +718,7 @@ async def setup_quarantine_commands(bot):
                 
             else:
                 # Remove jail-cam channel (disable public viewing)
-                if "jail_cam_channel_id" in quarantine_data[guild_id]["server_settings"]:
-                    del quarantine_data[guild_id]["server_settings"]["jail_cam_channel_id"]
-                    save_quarantine_data(quarantine_data)
+                set_jail_cam_channel(guild_id, None)
                 
                 embed = discord.Embed(
                     title="🔧 Jail-Cam Disabled",
@@ -857,7 +818,7 @@ async def setup_quarantine_commands(bot):
                 return
             
             # Count quarantined users (excluding server_settings)
-            quarantined_users = {k: v for k, v in quarantine_data[guild_id].items() if k != "server_settings"}
+            quarantined_users = {k: v for k, v in quarantine_data[guild_id].items() if isinstance(v, QuarantineRecord)}
             embed.add_field(name="Total Quarantined", value=str(len(quarantined_users)), inline=True)
             
             # Check users with timers
@@ -866,15 +827,13 @@ async def setup_quarantine_commands(bot):
             timer_details = []
             
             for user_id, data in quarantined_users.items():
-                if "end_time" in data:
+                if data.end_time is not None:
                     timed_users += 1
                     try:
-                        end_time_str = data["end_time"]
-                        # Parse the end time string
-                        end_time = datetime.datetime.fromisoformat(end_time_str.replace('Z', '+00:00'))
-                        time_remaining = end_time - current_time
+                        end_time = data.end_time
+                        time_remaining = data.remaining(current_time)
                         
-                        if current_time >= end_time:
+                        if data.is_expired(current_time):
                             expired_users += 1
                             status = "🔴 EXPIRED"
                         else:
@@ -892,21 +851,26 @@ async def setup_quarantine_commands(bot):
                         # Add detailed time info for first 3 users
                         if len(timer_details) <= 3:
                             timer_details[-1] += f"\n  End: {end_time.strftime('%H:%M:%S')}"
-                            timer_details[-1] += f"\n  Raw: {end_time_str[:19]}"
+                            timer_details[-1] += f"\n  Raw: {str(end_time)[:19]}"
                         
                     except Exception as e:
-                        timer_details.append(f"**User {user_id}:** ❌ Error parsing time: {str(e)}")
+                        timer_details.append(f"**User {user_id}:** ❌ Error reading timer: {str(e)}")
             
             embed.add_field(name="With Timers", value=str(timed_users), inline=True)
             embed.add_field(name="Should be Released", value=str(expired_users), inline=True)
             
-            # Check if we can access the bot instance to see if the task is running
-            try:
-                # Try to check if the task exists in the bot's tasks
-                running_tasks = [task for task in asyncio.all_tasks() if 'check_quarantine_expirations' in str(task)]
-                task_status = f"✅ Found {len(running_tasks)} timer task(s)" if running_tasks else "❌ No timer tasks found"
-            except:
-                task_status = "❓ Cannot determine task status"
+            # Report the release jobs of this guild
+            release_times = [
+                job_scheduler.due_time(make_job_id(QUARANTINE_RELEASE_JOB, guild_id, user_id))
+                for user_id in quarantined_users
+            ]
+            release_times = [when for when in release_times if when is not None]
+            if job_scheduler.timers.is_running:
+                task_status = f"✅ Job scheduler running with {len(release_times)} pending release(s)"
+                if release_times:
+                    task_status += f", next <t:{int(min(release_times).timestamp())}:R>"
+            else:
+                task_status = "❌ Job scheduler is not running"
             
             embed.add_field(name="Timer Task Status", value=task_status, inline=False)
             
@@ -949,7 +913,7 @@ async def setup_quarantine_commands(bot):
                 return
             
             # Get quarantined users (excluding server_settings)
-            quarantined_users = {k: v for k, v in quarantine_data[guild_id].items() if k != "server_settings"}
+            quarantined_users = {k: v for k, v in quarantine_data[guild_id].items() if isinstance(v, QuarantineRecord)}
             
             if not quarantined_users:
                 await interaction.followup.send("❌ No quarantined users found.", ephemeral=True)
@@ -960,17 +924,13 @@ async def setup_quarantine_commands(bot):
             results = []
             
             for user_id, data in quarantined_users.items():
-                if "end_time" in data:
-                    try:
-                        end_time = datetime.datetime.fromisoformat(data["end_time"].replace('Z', '+00:00'))
-                        if current_time >= end_time:
-                            users_to_unquarantine.append(user_id)
-                            results.append(f"✅ Will release: User {user_id}")
-                        else:
-                            time_remaining = int((end_time - current_time).total_seconds())
-                            results.append(f"⏰ User {user_id}: {time_remaining}s remaining")
-                    except Exception as e:
-                        results.append(f"❌ User {user_id}: Error parsing time - {str(e)}")
+                if data.end_time is not None:
+                    if data.is_expired(current_time):
+                        users_to_unquarantine.append(user_id)
+                        results.append(f"✅ Will release: User {user_id}")
+                    else:
+                        time_remaining = int(data.remaining(current_time).total_seconds())
+                        results.append(f"⏰ User {user_id}: {time_remaining}s remaining")
                 else:
                     results.append(f"🔒 User {user_id}: No timer (indefinite)")
             
@@ -988,29 +948,18 @@ async def setup_quarantine_commands(bot):
                     # Get the user and their data
                     member = await interaction.guild.fetch_member(int(user_id))
                     user_data = quarantine_data[guild_id][user_id]
-                    saved_roles = user_data.get("roles", [])
                     
                     print(f"Manually unquarantining {member.display_name} in {interaction.guild.name}")
                     
-                    # Reset channel permissions
-                    for channel in interaction.guild.channels:
-                        try:
-                            await channel.set_permissions(member, overwrite=None, reason="Manual release from expired quarantine")
-                        except:
-                            pass
-                    
-                    # Restore roles
-                    for role_id in saved_roles:
-                        role = interaction.guild.get_role(int(role_id))
-                        if role:
-                            try:
-                                await member.add_roles(role, reason="Manual release from expired quarantine")
-                            except:
-                                pass
+                    # Give back the user's access and roles
+                    try:
+                        await lift_quarantine(interaction.guild, member, user_data, "Manual release from expired quarantine")
+                    except Exception as e:
+                        print(f"Error restoring {member.display_name}: {e}")
                     
                     # Remove from quarantine data
-                    del quarantine_data[guild_id][user_id]
-                    save_quarantine_data(quarantine_data)
+                    remove_quarantine_record(guild_id, user_id)
+                    cancel_quarantine_release(guild_id, user_id)
                     
                     released_count += 1
                     
@@ -1056,119 +1005,199 @@ async def setup_quarantine_commands(bot):
 
     # ===== AUTOMATIC QUARANTINE TIMER SYSTEM =====
     
-    @tasks.loop(minutes=1)
-    async def check_quarantine_expirations():
-        """Background task that automatically releases users when their quarantine time expires"""
+    # Timed quarantines are released by scheduled jobs that run at their end time
+    job_scheduler.register(QUARANTINE_RELEASE_JOB, lambda job: release_expired_quarantine(bot, job["guild_id"], job["user_id"]))
+    schedule_missing_quarantine_releases()
+
+# Quarantine Timer Functions
+
+# Job action of automatic quarantine releases
+QUARANTINE_RELEASE_JOB = "quarantine_release"
+
+def schedule_quarantine_release(guild_id, user_id, end_time):
+    """Set (or move) the automatic release time of a quarantined user"""
+    job_scheduler.schedule(
+        make_job_id(QUARANTINE_RELEASE_JOB, guild_id, user_id), QUARANTINE_RELEASE_JOB, end_time,
+        guild_id=guild_id, user_id=user_id
+    )
+
+def cancel_quarantine_release(guild_id, user_id):
+    """Drop the automatic release of a user who was released some other way"""
+    job_scheduler.cancel(make_job_id(QUARANTINE_RELEASE_JOB, guild_id, user_id))
+
+def schedule_missing_quarantine_releases():
+    """Create release jobs for timed quarantines that don't have one (e.g. made before jobs existed)"""
+    for guild_id in list(quarantine_data):
+        for user_id, data in quarantine_data[guild_id].items():
+            if isinstance(data, QuarantineRecord) and data.end_time is not None:
+                if job_scheduler.get(make_job_id(QUARANTINE_RELEASE_JOB, guild_id, user_id)) is None:
+                    schedule_quarantine_release(guild_id, user_id, data.end_time)
+
+async def release_expired_quarantine(bot, guild_id, user_id):
+    """Release a user whose quarantine release job is due - raises if it should be retried"""
+    guild = bot.get_guild(int(guild_id))
+    if not guild:
+        return
+    
+    user_data = quarantine_data.get(guild_id, {}).get(user_id)
+    if not isinstance(user_data, QuarantineRecord) or user_data.end_time is None:
+        return
+    
+    current_time = datetime.datetime.now(UTC)
+    if not user_data.is_expired(current_time):
+        # The sentence was extended without the timer being moved
+        schedule_quarantine_release(guild_id, user_id, user_data.end_time)
+        return
+    
+    try:
+        # Get the user and their data
+        member = await guild.fetch_member(int(user_id))
+        
+        print(f"Auto-releasing {member.display_name} from quarantine in {guild.name}")
+        
+        # Give back the user's access and roles
+        await lift_quarantine(guild, member, user_data, "Auto-released from timed quarantine")
+        
+        # Remove from quarantine data
+        remove_quarantine_record(guild_id, user_id)
+        
+        # DM the user
         try:
-            current_time = datetime.datetime.now(UTC)
-            guilds_to_check = list(quarantine_data.keys())
+            await member.send(f"You have been automatically released from quarantine in **{guild.name}**. Your access has been restored.")
+        except:
+            pass
+        
+        # Log to mod-logs
+        log_channel = discord.utils.get(guild.text_channels, name="mod-logs")
+        if log_channel:
+            embed = discord.Embed(
+                title="🔓 User Auto-Released from Quarantine",
+                description=f"<@{user_id}> has been automatically released from quarantine (timer expired).",
+                color=discord.Color.green(),
+                timestamp=current_time
+            )
+            embed.add_field(name="User", value=f"<@{user_id}> ({user_id})", inline=True)
+            embed.set_footer(text="Automatic timed release")
+            await log_channel.send(embed=embed)
+        
+        # Also announce it in the jail-cam channel
+        jail_cam_channel = get_jail_cam_channel(guild)
+        if jail_cam_channel:
+            freedom_messages = [
+                f"🔓 **FREEDOM!** {member.mention} has served their time and been released!",
+                f"🕊️ {member.mention} has been set free! Their sentence is complete.",
+                f"⏱️ Time's up! {member.mention} has been released from quarantine.",
+                f"🎉 Congratulations {member.mention}! You're free to go!",
+                f"🚪 The cell door opens... {member.mention} walks free once more!"
+            ]
+            freedom_message = random.choice(freedom_messages)
+            
+            # Create a fancy embed for the jail-cam
+            embed = discord.Embed(
+                title="🔓 Prisoner Released",
+                description=freedom_message,
+                color=discord.Color.green(),
+                timestamp=current_time
+            )
+            embed.set_thumbnail(url=member.display_avatar.url)
+            embed.set_footer(text="They've done their time! Back to normal server access.")
             
-            for guild_id in guilds_to_check:
-                guild = bot.get_guild(int(guild_id))
-                if not guild:
-                    continue
-                    
-                users_to_unquarantine = []
-                
-                # Get quarantined users (excluding server_settings)
-                quarantined_users = {k: v for k, v in quarantine_data[guild_id].items() if k != "server_settings"}
-                
-                # Find users whose quarantine has expired
-                for user_id, data in quarantined_users.items():
-                    if "end_time" in data:
-                        try:
-                            end_time = datetime.datetime.fromisoformat(data["end_time"].replace('Z', '+00:00'))
-                            if current_time >= end_time:
-                                users_to_unquarantine.append(user_id)
-                        except Exception as e:
-                            print(f"Error parsing end time for user {user_id}: {e}")
-                
-                # Unquarantine expired users
-                for user_id in users_to_unquarantine:
-                    try:
-                        # Get the user and their data
-                        member = await guild.fetch_member(int(user_id))
-                        user_data = quarantine_data[guild_id][user_id]
-                        saved_roles = user_data.get("roles", [])
-                        
-                        print(f"Auto-releasing {member.display_name} from quarantine in {guild.name}")
-                        
-                        # Reset channel permissions
-                        for channel in guild.channels:
-                            try:
-                                await channel.set_permissions(member, overwrite=None, reason="Auto-released from timed quarantine")
-                            except:
-                                pass
-                        
-                        # Restore roles
-                        for role_id in saved_roles:
-                            role = guild.get_role(int(role_id))
-                            if role:
-                                try:
-                                    await member.add_roles(role, reason="Auto-released from timed quarantine")
-                                except:
-                                    pass
-                        
-                        # Remove from quarantine data
-                        del quarantine_data[guild_id][user_id]
-                        save_quarantine_data(quarantine_data)
-                        
-                        # DM the user
-                        try:
-                            await member.send(f"You have been automatically released from quarantine in **{guild.name}**. Your access has been restored.")
-                        except:
-                            pass
-                        
-                        # Log to mod-logs
-                        log_channel = discord.utils.get(guild.text_channels, name="mod-logs")
-                        if log_channel:
-                            embed = discord.Embed(
-                                title="🔓 User Auto-Released from Quarantine",
-                                description=f"<@{user_id}> has been automatically released from quarantine (timer expired).",
-                                color=discord.Color.green(),
-                                timestamp=current_time
-                            )
-                            embed.add_field(name="User", value=f"<@{user_id}> ({user_id})", inline=True)
-                            embed.set_footer(text="Automatic timed release")
-                            await log_channel.send(embed=embed)
-                        
-                        # Also announce it in the jail-cam channel
-                        jail_cam_channel = get_jail_cam_channel(guild)
-                        if jail_cam_channel:
-                            freedom_messages = [
-                                f"🔓 **FREEDOM!** {member.mention} has served their time and been released!",
-                                f"🕊️ {member.mention} has been set free! Their sentence is complete.",
-                                f"⏱️ Time's up! {member.mention} has been released from quarantine.",
-                                f"🎉 Congratulations {member.mention}! You're free to go!",
-                                f"🚪 The cell door opens... {member.mention} walks free once more!"
-                            ]
-                            freedom_message = random.choice(freedom_messages)
-                            
-                            # Create a fancy embed for the jail-cam
-                            embed = discord.Embed(
-                                title="🔓 Prisoner Released",
-                                description=freedom_message,
-                                color=discord.Color.green(),
-                                timestamp=current_time
-                            )
-                            embed.set_thumbnail(url=member.display_avatar.url)
-                            embed.set_footer(text="They've done their time! Back to normal server access.")
-                            
-                            await jail_cam_channel.send(embed=embed)
-                            
-                    except Exception as e:
-                        print(f"Error auto-unquarantining user {user_id} in guild {guild.name}: {e}")
-        except Exception as e:
-            print(f"Error in quarantine expiration checker: {e}")
+            await jail_cam_channel.send(embed=embed)
+            
+    except Exception as e:
+        print(f"Error auto-unquarantining user {user_id} in guild {guild.name}: {e}")
+        # The job scheduler tries again later
+        raise
+
+# Quarantine Permission Functions
 
-    @check_quarantine_expirations.before_loop
-    async def before_quarantine_check():
-        await bot.wait_until_ready()
+# Overwrites of the quarantine channel and of every other channel
+QUARANTINE_CHANNEL_OVERWRITE = discord.PermissionOverwrite(view_channel=True, send_messages=True)
+HIDDEN_CHANNEL_OVERWRITE = discord.PermissionOverwrite(view_channel=False)
 
-    # Start the background task
-    if not check_quarantine_expirations.is_running():
-        check_quarantine_expirations.start()
-        print("✅ Quarantine expiration checker started!")
+async def run_channel_edits(guild, edits, label):
+    """Run a guild's permission edits through the shared executor and log the ones that failed"""
+    if not edits:
+        return
+    errors = failures(await rest_executor.run(edits, bucket=f"channels:{guild.id}"))
+    if errors:
+        print(f"Warning: {len(errors)} of {len(edits)} channel edits failed for {label}: {errors[0]}")
+
+async def ensure_quarantine_role(guild, quarantine_channel):
+    """Get or create the quarantine role and give it its overwrite on every channel
+
+    Only channels without an overwrite for the role are edited (or that let
+    it in but aren't the quarantine channel), so once a guild is set up this
+    makes no API calls at all.
+    """
+    role = discord.utils.get(guild.roles, name=QUARANTINE_ROLE_NAME)
+    if not role:
+        role = await guild.create_role(name=QUARANTINE_ROLE_NAME, permissions=discord.Permissions.none(),
+                                       reason="Quarantine role")
+    
+    edits = []
+    for channel in guild.channels:
+        overwrite = channel.overwrites_for(role)
+        if channel.id == quarantine_channel.id:
+            if overwrite != QUARANTINE_CHANNEL_OVERWRITE:
+                edits.append(lambda channel=channel: channel.set_permissions(role, overwrite=QUARANTINE_CHANNEL_OVERWRITE, reason="Quarantine role setup"))
+        elif overwrite.is_empty() or overwrite == QUARANTINE_CHANNEL_OVERWRITE:
+            # An allow on another channel is left over from a fresh-account quarantine
+            # that used the role - hide it again
+            edits.append(lambda channel=channel: channel.set_permissions(role, overwrite=HIDDEN_CHANNEL_OVERWRITE, reason="Quarantine role setup"))
+    
+    if edits:
+        print(f"Setting up the {QUARANTINE_ROLE_NAME} role on {len(edits)} channel(s) in {guild.name}")
+    await run_channel_edits(guild, edits, f"the {QUARANTINE_ROLE_NAME} role in {guild.name}")
+    return role
+
+async def hide_channel_from_quarantine(channel):
+    """Give a new channel the quarantine role's overwrite, if the guild has the role"""
+    role = discord.utils.get(channel.guild.roles, name=QUARANTINE_ROLE_NAME)
+    if role and channel.overwrites_for(role).is_empty():
+        await channel.set_permissions(role, overwrite=HIDDEN_CHANNEL_OVERWRITE, reason="Quarantine role setup")
+
+async def apply_quarantine(guild, member, quarantine_channel, reason, mode=None):
+    """Restrict a member to the quarantine channel and take their roles
+
+    mode is "role" or "channels" (QUARANTINE_MODE by default). The shared
+    quarantine role only opens the guild's quarantine room, so a different
+    channel has to use "channels". Returns the ID of the quarantine role
+    given to them, or None in "channels" mode. Roles the bot can't manage
+    (managed or above its own role) are left alone.
+    """
+    kept_roles = [role for role in member.roles if not role.is_default() and not role.is_assignable()]
+    
+    if (mode or QUARANTINE_MODE) == "role":
+        role = await ensure_quarantine_role(guild, quarantine_channel)
+        # One edit swaps all their roles for the quarantine role
+        await member.edit(roles=kept_roles + [role], reason=reason)
+        return role.id
+    
+    edits = [
+        lambda channel=channel: channel.set_permissions(member, view_channel=False, reason=reason)
+        for channel in guild.channels if channel.id != quarantine_channel.id
+    ]
+    edits.append(lambda: quarantine_channel.set_permissions(member, overwrite=QUARANTINE_CHANNEL_OVERWRITE, reason=reason))
+    await run_channel_edits(guild, edits, str(member))
+    await member.edit(roles=kept_roles, reason=reason)
+    return None
+
+async def lift_quarantine(guild, member, record, reason):
+    """Undo apply_quarantine - remove the quarantine role or member overwrites and give back the saved roles"""
+    if record.role_id is None:
+        # Quarantined in "channels" mode - only channels that have an overwrite for them need an edit
+        edits = [
+            lambda channel=channel: channel.set_permissions(member, overwrite=None, reason=reason)
+            for channel in guild.channels if not channel.overwrites_for(member).is_empty()
+        ]
+        await run_channel_edits(guild, edits, str(member))
+    
+    saved_roles = [guild.get_role(role_id) for role_id in record.roles]
+    restored = [role for role in saved_roles if role and role.is_assignable() and role not in member.roles]
+    roles = [role for role in member.roles if not role.is_default() and role.id != record.role_id] + restored
+    # One edit removes the quarantine role and restores the others
+    await member.edit(roles=roles, reason=reason)
 
 # Prison Break Game Helper Functions
 
@@ -1321,17 +1350,17 @@ async def start_stage_challenge(guild, game_id, stage):
     # Get quarantined users (excluding server_settings)
     quarantined_users = {}
     if guild_id in quarantine_data:
-        quarantined_users = {k: v for k, v in quarantine_data[guild_id].items() if k != "server_settings"}
+        quarantined_users = {k: v for k, v in quarantine_data[guild_id].items() if isinstance(v, QuarantineRecord)}
     
     # Send challenge to each prisoner's quarantine channel
     for player_id in game_data["players"]:
         player_user_id = str(player_id)
         if player_user_id in quarantined_users:
             prisoner_data = quarantined_users[player_user_id]
-            quarantine_channel_id = prisoner_data.get("channel_id")
+            quarantine_channel_id = prisoner_data.channel_id
             
             if quarantine_channel_id:
-                quarantine_channel = guild.get_channel(int(quarantine_channel_id))
+                quarantine_channel = guild.get_channel(quarantine_channel_id)
                 if quarantine_channel:
                     # Create a prisoner-specific embed
                     prisoner_embed = discord.Embed(
@@ -1422,26 +1451,24 @@ async def reduce_quarantine_sentence(guild, user, percentage):
         user_data = quarantine_data[guild_id][user_id]
         
         # Check if user has a timed sentence
-        if "end_time" not in user_data or "original_duration_minutes" not in user_data:
+        if not user_data.is_timed:
             return False
             
         # Calculate reduction based on percentage of original sentence
-        original_duration = user_data["original_duration_minutes"]
+        original_duration = user_data.original_duration_minutes
         reduction_minutes = int((percentage / 100) * original_duration)
         
-        # Parse current end time
-        end_time = datetime.datetime.fromisoformat(user_data["end_time"].replace('Z', '+00:00'))
-        
         # Reduce sentence
-        new_end_time = end_time - datetime.timedelta(minutes=reduction_minutes)
+        new_end_time = user_data.end_time - datetime.timedelta(minutes=reduction_minutes)
         
         # Don't go below current time
         current_time = datetime.datetime.now(UTC)
         if new_end_time < current_time:
             new_end_time = current_time
             
-        # Update end time
-        user_data["end_time"] = str(new_end_time)
+        # Update end time and move the release timer
+        user_data.end_time = new_end_time
+        schedule_quarantine_release(guild_id, user_id, new_end_time)
         
         # Save changes
         save_quarantine_data(quarantine_data)
@@ -1465,21 +1492,19 @@ async def extend_quarantine_sentence(guild, user, percentage):
         user_data = quarantine_data[guild_id][user_id]
         
         # Check if user has a timed sentence
-        if "end_time" not in user_data or "original_duration_minutes" not in user_data:
+        if not user_data.is_timed:
             return False
             
         # Calculate extension based on percentage of original sentence
-        original_duration = user_data["original_duration_minutes"]
+        original_duration = user_data.original_duration_minutes
         extension_minutes = int((percentage / 100) * original_duration)
         
-        # Parse current end time
-        end_time = datetime.datetime.fromisoformat(user_data["end_time"].replace('Z', '+00:00'))
-        
         # Extend sentence
-        new_end_time = end_time + datetime.timedelta(minutes=extension_minutes)
+        new_end_time = user_data.end_time + datetime.timedelta(minutes=extension_minutes)
         
-        # Update end time
-        user_data["end_time"] = str(new_end_time)
+        # Update end time and move the release timer
+        user_data.end_time = new_end_time
+        schedule_quarantine_release(guild_id, user_id, new_end_time)
         
         # Save changes
         save_quarantine_data(quarantine_data)
@@ -1504,9 +1529,9 @@ async def handle_prison_break_attempt(message, guild_id, game_id, game_data, cur
         prisoner_quarantine_channel = None
         user_id = str(message.author.id)
         if guild_id in quarantine_data and user_id in quarantine_data[guild_id]:
-            quarantine_channel_id = quarantine_data[guild_id][user_id].get("channel_id")
+            quarantine_channel_id = quarantine_data[guild_id][user_id].channel_id
             if quarantine_channel_id:
-                prisoner_quarantine_channel = message.guild.get_channel(int(quarantine_channel_id))
+                prisoner_quarantine_channel = message.guild.get_channel(quarantine_channel_id)
         
         success = False
         
@@ -4,7 +4,8 @@ from discord import app_commands
 from typing import Optional
 
 from config import UTC
-from data_manager import warnings_data, notes_data, save_notes
+from data_manager import warnings_data, notes_data, add_mod_note, backup_status, job_scheduler
+from utils.jobs import make_job_id
 
 async def setup_utility_commands(bot):
     """Setup utility commands"""
@@ -120,16 +121,9 @@ async def setup_utility_commands(bot):
     @app_commands.default_permissions(moderate_members=True)
     async def add_note(interaction: discord.Interaction, user: discord.Member, note: str):
         try:
-            # Initialize data structure if needed
             guild_id = str(interaction.guild.id)
             user_id = str(user.id)
             
-            if guild_id not in notes_data:
-                notes_data[guild_id] = {}
-                
-            if user_id not in notes_data[guild_id]:
-                notes_data[guild_id][user_id] = []
-                
             # Add the note
             note_entry = {
                 "content": note,
@@ -138,8 +132,7 @@ async def setup_utility_commands(bot):
                 "timestamp": str(datetime.datetime.now(UTC))
             }
             
-            notes_data[guild_id][user_id].append(note_entry)
-            save_notes(notes_data)
+            add_mod_note(guild_id, user_id, note_entry)
             
             # Get total notes count
             note_count = len(notes_data[guild_id][user_id])
@@ -147,4 +140,82 @@ async def setup_utility_commands(bot):
             await interaction.response.send_message(f"Added note about {user.mention}. They now have {note_count} notes.", ephemeral=True)
                 
         except Exception as e:
-            await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True) 
\ No newline at end of file
+            await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True) 
+
+    @bot.tree.command(name="remindme", description="Schedule a reminder")
+    @app_commands.describe(message="The reminder message", hours="Hours from now", minutes="Minutes from now")
+    async def remindme(interaction: discord.Interaction, message: str, hours: int = 0, minutes: int = 0):
+        if hours < 0 or minutes < 0 or (hours == 0 and minutes == 0):
+            await interaction.response.send_message("Please specify a valid time in the future.", ephemeral=True)
+            return
+        
+        try:
+            reminder_time = datetime.datetime.now(UTC) + datetime.timedelta(hours=hours, minutes=minutes)
+            
+            # Keyed by the interaction, so each /remindme is exactly one job
+            job_scheduler.schedule(
+                make_job_id("reminder", interaction.id), "reminder", reminder_time,
+                guild_id=str(interaction.guild.id),
+                channel_id=str(interaction.channel.id),
+                user_id=str(interaction.user.id),
+                message=message
+            )
+            
+            time_str = ""
+            if hours > 0:
+                time_str += f"{hours} hour{'s' if hours != 1 else ''} "
+            if minutes > 0:
+                time_str += f"{minutes} minute{'s' if minutes != 1 else ''}"
+            
+            await interaction.response.send_message(f"✅ Reminder set for {time_str.strip()} from now (<t:{int(reminder_time.timestamp())}:t>).", ephemeral=True)
+        except Exception as e:
+            await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
+
+    @bot.tree.command(name="backupstatus", description="Show the status of the last data backup")
+    @app_commands.default_permissions(administrator=True)
+    async def backup_status_command(interaction: discord.Interaction):
+        try:
+            status = backup_status
+            if status["running"]:
+                state = f"⏳ Running (started <t:{int(status['last_started'].timestamp())}:R>)"
+            elif status["last_finished"] is None:
+                state = "No backup has run since the bot started"
+            elif status["last_error"]:
+                state = f"❌ Failed: {status['last_error']}"
+            else:
+                state = "✅ Succeeded"
+
+            embed = discord.Embed(title="Backup Status", description=state, color=discord.Color.blue())
+            if status["last_finished"] is not None:
+                embed.add_field(name="Last Finished", value=f"<t:{int(status['last_finished'].timestamp())}:R>", inline=True)
+                embed.add_field(name="Duration", value=f"{status['duration']:.2f}s", inline=True)
+            if status["last_path"]:
+                embed.add_field(name="Files", value=f"{status['files']} ({status['new_blobs']} changed)", inline=True)
+                embed.add_field(name="Bytes Written", value=f"{status['bytes_written']:,}", inline=True)
+                embed.add_field(name="Location", value=f"`{status['last_path']}`", inline=False)
+            embed.set_footer(text=f"{status['total_backups']} backups since startup")
+
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
+        except Exception as e:
+            await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
+
+    @bot.tree.command(name="messagestats", description="Show how long each message handling stage takes")
+    @app_commands.default_permissions(administrator=True)
+    async def message_stats_command(interaction: discord.Interaction):
+        try:
+            from events import message_pipeline
+            
+            lines = []
+            for name, stats in message_pipeline.stats():
+                lines.append(
+                    f"`{name}` - ran {stats.runs}, skipped {stats.skipped}, errors {stats.errors}, "
+                    f"avg {stats.average_time * 1000:.2f}ms, max {stats.max_time * 1000:.2f}ms"
+                )
+            
+            embed = discord.Embed(title="Message Pipeline", description="\n".join(lines) or "No stages registered", color=discord.Color.blue())
+            embed.set_footer(text="Since the bot started")
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            
+        except Exception as e:
+            await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
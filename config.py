@@ -12,26 +12,72 @@ UTC = datetime.timezone.utc
 TOKEN = os.getenv('DISCORD_TOKEN')
 PREFIX = os.getenv('COMMAND_PREFIX', '!')
 
-# Data file paths
+# Database holding all data stores (SQLite, WAL mode)
+DATA_DB_FILE = 'orion_data.db'
+
+# Minimum time between two writes of the same store - saves made in the
+# meantime are coalesced into one write
+SAVE_INTERVAL_MS = 500
+
+# Warnings and mod notes are stored as an append-only journal; once it holds
+# this many lines it is compacted into the snapshot rows
+JOURNAL_COMPACT_THRESHOLD = 1000
+
+# Scheduled jobs (unbans, reminders, quarantine releases) whose handler fails
+# are retried after JOB_RETRY_SECONDS, doubling each time up to
+# JOB_RETRY_MAX_SECONDS, and dropped after JOB_MAX_ATTEMPTS tries
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_SECONDS = 30
+JOB_RETRY_MAX_SECONDS = 3600
+
+# Row format of each store: "json" (readable), "orjson" or "msgpack" (faster
+# and smaller, need the optional package), optionally with "+zlib" compression.
+# Rows already written in another format are still read, so this can be changed
+# at any time. Stores not listed use DEFAULT_STORE_FORMAT.
+DEFAULT_STORE_FORMAT = 'json'
+STORE_FORMATS = {
+    # 'quarantine': 'orjson',
+    # 'prison_break': 'orjson',
+}
+
+# Legacy JSON data files - imported into DATA_DB_FILE on first boot
+# and used as file names for the JSON exports in backups
 WARNING_FILE = 'warnings.json'
 REACTION_ROLES_FILE = 'reaction_roles.json'
 CUSTOM_COMMANDS_FILE = 'custom_commands.json'
 SCHEDULED_TASKS_FILE = 'scheduled_tasks.json'
+JOBS_FILE = 'jobs.json'
 TEMP_VOICE_FILE = 'temp_voice.json'
 FRESH_ACCOUNT_FILE = 'fresh_accounts.json'
 QUARANTINE_FILE = 'quarantine.json'
 NICKNAME_FILTER_FILE = 'nickname_filters.json'
 NOTES_FILE = 'mod_notes.json'
+BAD_WORDS_FILE = 'bad_words.json'
 PRISON_BREAK_FILE = 'prison_break_games.json'
 
-# Backup directory
+# Backup directory and how many backup snapshots to keep
 BACKUP_DIR = 'backups'
+BACKUP_KEEP = 7
 
 # Quarantine channel names
 QUARANTINE_CHANNEL_NAME = 'quarantine-room'
 JAIL_CAM_CHANNEL_NAME = 'jail-cam'
 
-# Bad words filter (can be expanded)
+# Seconds quarantined users' messages are collected before they are mirrored
+# to jail-cam together, so a chatty user doesn't get the channel rate limited
+JAIL_CAM_MIRROR_SECONDS = 1.5
+
+# How quarantined users are locked out: "role" gives them QUARANTINE_ROLE_NAME,
+# whose channel overwrites are set up once per guild, so quarantining is a
+# single role change. "channels" adds a member overwrite to every channel.
+QUARANTINE_MODE = 'role'
+QUARANTINE_ROLE_NAME = 'Quarantined'
+
+# Most Discord API calls a bulk operation (mass bans, editing every channel)
+# has in flight per rate limit bucket (e.g. the bans of one guild)
+REST_CONCURRENCY = 5
+
+# Bad words filter - used by guilds that haven't set their own list with /badwords
 BAD_WORDS = ['badword1', 'badword2', 'badword3']
 
 # Prison Break Game Constants
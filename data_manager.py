@@ -1,263 +1,447 @@
 import os
 import json
+import atexit
+import time
+import asyncio
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from config import *
+from utils.storage import StorageBackend, StoreWriter, WriteBehindScheduler, DictStore, ListStore, JournaledStore
+from utils.backups import BackupRepository
+from utils.serialization import Serializer
+from utils.records import QuarantineCodec, QuarantineIndex
+from utils.profanity import ProfanityFilter
+from utils.jobs import JobScheduler, make_job_id
 
-# Data stores
-warnings_data = {}
-reaction_roles_data = {}
-custom_commands_data = {}
-scheduled_tasks_data = []
-temp_voice_data = {}
-nickname_filters_data = {}
-fresh_account_settings = {}
-quarantine_data = {}
-notes_data = {}
-prison_break_data = {}
-
-# Function to load warnings from file
-def load_warnings():
+# Storage backend and its writer thread (started on first load)
+storage = None
+writer = None
+
+# Write-behind scheduler - saves mark a store dirty and it is written at
+# most once per SAVE_INTERVAL_MS
+save_scheduler = WriteBehindScheduler(SAVE_INTERVAL_MS / 1000)
+
+# Function to get the row serializer configured for a store in STORE_FORMATS
+def _serializer(name):
+    return Serializer.from_spec(STORE_FORMATS.get(name, DEFAULT_STORE_FORMAT))
+
+# Data stores - these objects are never rebound, so modules that imported
+# them keep seeing the loaded data
+warnings_data = JournaledStore("warnings", WARNING_FILE, JOURNAL_COMPACT_THRESHOLD, _serializer("warnings"))
+reaction_roles_data = DictStore("reaction_roles", REACTION_ROLES_FILE, _serializer("reaction_roles"))
+custom_commands_data = DictStore("custom_commands", CUSTOM_COMMANDS_FILE, _serializer("custom_commands"))
+# Only read to migrate old tasks into jobs_data
+scheduled_tasks_data = ListStore("scheduled_tasks", SCHEDULED_TASKS_FILE, _serializer("scheduled_tasks"))
+# Scheduled jobs keyed by job ID (see utils.jobs)
+jobs_data = DictStore("jobs", JOBS_FILE, _serializer("jobs"))
+temp_voice_data = DictStore("temp_voice", TEMP_VOICE_FILE, _serializer("temp_voice"))
+nickname_filters_data = DictStore("nickname_filters", NICKNAME_FILTER_FILE, _serializer("nickname_filters"))
+fresh_account_settings = DictStore("fresh_accounts", FRESH_ACCOUNT_FILE, _serializer("fresh_accounts"))
+# Quarantine rows hold utils.records.QuarantineRecord objects in memory
+quarantine_data = DictStore("quarantine", QUARANTINE_FILE, _serializer("quarantine"), QuarantineCodec())
+# quarantine_data by int guild and user IDs, for the checks made on every message
+quarantine_index = QuarantineIndex(quarantine_data)
+notes_data = JournaledStore("notes", NOTES_FILE, JOURNAL_COMPACT_THRESHOLD, _serializer("notes"))
+prison_break_data = DictStore("prison_break", PRISON_BREAK_FILE, _serializer("prison_break"))
+# Each guild's own bad word list (guilds without one use BAD_WORDS)
+bad_words_data = DictStore("bad_words", BAD_WORDS_FILE, _serializer("bad_words"))
+# Compiled bad word lists, rebuilt when a guild's list changes
+profanity_filter = ProfanityFilter(bad_words_data, BAD_WORDS)
+
+# Content-addressed backup snapshots in BACKUP_DIR
+backups = BackupRepository(BACKUP_DIR)
+# Backup disk work runs here, one job at a time, so it never blocks the event loop
+backup_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="orion-backup")
+# Metrics for the last backup (shown by /backupstatus)
+backup_status = {
+    "running": False,
+    "last_started": None,
+    "last_finished": None,
+    "last_path": None,
+    "last_error": None,
+    "duration": None,
+    "files": 0,
+    "new_blobs": 0,
+    "bytes_written": 0,
+    "total_backups": 0,
+}
+
+# Stores paired with the file name used for them in backups
+ALL_STORES = [
+    (warnings_data, WARNING_FILE),
+    (reaction_roles_data, REACTION_ROLES_FILE),
+    (custom_commands_data, CUSTOM_COMMANDS_FILE),
+    (scheduled_tasks_data, SCHEDULED_TASKS_FILE),
+    (jobs_data, JOBS_FILE),
+    (temp_voice_data, TEMP_VOICE_FILE),
+    (fresh_account_settings, FRESH_ACCOUNT_FILE),
+    (quarantine_data, QUARANTINE_FILE),
+    (nickname_filters_data, NICKNAME_FILTER_FILE),
+    (notes_data, NOTES_FILE),
+    (prison_break_data, PRISON_BREAK_FILE),
+    (bad_words_data, BAD_WORDS_FILE)
+]
+
+# Stores whose top-level keys are guild IDs (one row per guild)
+GUILD_STORES = [
+    warnings_data,
+    custom_commands_data,
+    temp_voice_data,
+    fresh_account_settings,
+    quarantine_data,
+    nickname_filters_data,
+    notes_data,
+    prison_break_data,
+    bad_words_data
+]
+
+# Function to open the storage backend and start the writer thread
+def get_storage():
+    global storage, writer
+    if storage is None:
+        storage = StorageBackend(DATA_DB_FILE)
+        writer = StoreWriter()
+        # Pending writes must reach the disk even if shutdown_data isn't called
+        atexit.register(shutdown_data)
+    return storage
+
+# Function to find the newest valid copy of a data file in BACKUP_DIR
+def load_backup_copy(file):
+    return backups.load_file(file)
+
+# Function to load a store from the database
+def _load_store(store, label):
     try:
-        if os.path.exists(WARNING_FILE):
-            with open(WARNING_FILE, 'r') as f:
-                return json.load(f)
-        return {}
+        store.load(get_storage(), writer, fallback=lambda: load_backup_copy(store.legacy_file))
     except Exception as e:
-        print(f"Error loading warnings: {e}")
-        return {}
+        print(f"Error loading {label}: {e}")
+    return store
 
-# Function to save warnings to file
-def save_warnings(warnings):
+# Function to mark a store dirty - its changed keys are written shortly after
+# by the write-behind scheduler and the writer thread
+def _save_store(store, data, label):
     try:
-        with open(WARNING_FILE, 'w') as f:
-            json.dump(warnings, f, indent=4)
+        if data is not store:
+            store.replace(data)
+        save_scheduler.mark_dirty(store)
     except Exception as e:
-        print(f"Error saving warnings: {e}")
+        print(f"Error saving {label}: {e}")
 
-# Function to load reaction roles from file
-def load_reaction_roles():
+# Function to load warnings
+def load_warnings():
+    return _load_store(warnings_data, "warnings")
+
+# Function to save warnings
+def save_warnings(warnings):
+    _save_store(warnings_data, warnings, "warnings")
+
+# Function to add a warning - appends one journal line instead of rewriting the store
+def add_warning(guild_id, user_id, warning):
     try:
-        if os.path.exists(REACTION_ROLES_FILE):
-            with open(REACTION_ROLES_FILE, 'r') as f:
-                return json.load(f)
-        return {}
+        warnings_data.append_entry(guild_id, user_id, warning)
     except Exception as e:
-        print(f"Error loading reaction roles: {e}")
-        return {}
+        print(f"Error saving warning: {e}")
 
-# Function to save reaction roles to file
-def save_reaction_roles(data):
+# Function to replace a user's warnings, e.g. when clearing them (one journal line)
+def set_user_warnings(guild_id, user_id, warnings):
     try:
-        with open(REACTION_ROLES_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
+        warnings_data.set_entries(guild_id, user_id, warnings)
     except Exception as e:
-        print(f"Error saving reaction roles: {e}")
+        print(f"Error saving warnings: {e}")
 
-# Function to load custom commands from file
+# Function to load reaction roles
+def load_reaction_roles():
+    return _load_store(reaction_roles_data, "reaction roles")
+
+# Function to save reaction roles
+def save_reaction_roles(data):
+    _save_store(reaction_roles_data, data, "reaction roles")
+
+# Function to load custom commands
 def load_custom_commands():
-    try:
-        if os.path.exists(CUSTOM_COMMANDS_FILE):
-            with open(CUSTOM_COMMANDS_FILE, 'r') as f:
-                return json.load(f)
-        return {}
-    except Exception as e:
-        print(f"Error loading custom commands: {e}")
-        return {}
+    return _load_store(custom_commands_data, "custom commands")
 
-# Function to save custom commands to file
+# Function to save custom commands
 def save_custom_commands(data):
-    try:
-        with open(CUSTOM_COMMANDS_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
-    except Exception as e:
-        print(f"Error saving custom commands: {e}")
+    _save_store(custom_commands_data, data, "custom commands")
 
 # Function to load scheduled tasks
 def load_scheduled_tasks():
-    try:
-        if os.path.exists(SCHEDULED_TASKS_FILE):
-            with open(SCHEDULED_TASKS_FILE, 'r') as f:
-                return json.load(f)
-        return []
-    except Exception as e:
-        print(f"Error loading scheduled tasks: {e}")
-        return []
+    return _load_store(scheduled_tasks_data, "scheduled tasks")
 
 # Function to save scheduled tasks
 def save_scheduled_tasks(data):
-    try:
-        with open(SCHEDULED_TASKS_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
-    except Exception as e:
-        print(f"Error saving scheduled tasks: {e}")
+    _save_store(scheduled_tasks_data, data, "scheduled tasks")
+
+# Function to load scheduled jobs
+def load_jobs():
+    return _load_store(jobs_data, "jobs")
+
+# Function to save scheduled jobs
+def save_jobs(data):
+    _save_store(jobs_data, data, "jobs")
+
+# Runs jobs_data - handlers are registered by the modules that schedule jobs
+job_scheduler = JobScheduler(jobs_data, save_jobs, JOB_MAX_ATTEMPTS, JOB_RETRY_SECONDS, JOB_RETRY_MAX_SECONDS)
+
+# Function to move tasks from the old scheduled_tasks list into jobs
+# The IDs are derived from the task, so running it twice can't duplicate a job
+def migrate_scheduled_tasks():
+    if not len(scheduled_tasks_data):
+        return
+    for task in list(scheduled_tasks_data):
+        try:
+            action = task["action"]
+            if action == "reminder":
+                job_id = make_job_id(action, task["guild_id"], task["channel_id"], task["time"])
+            else:
+                job_id = make_job_id(action, task["guild_id"], task["user_id"])
+            payload = {key: value for key, value in task.items() if key not in ("action", "time")}
+            job_scheduler.schedule(job_id, action, datetime.datetime.fromisoformat(task["time"]), **payload)
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"⚠️ Skipping invalid scheduled task {task}: {e}")
+    print(f"✅ Moved {len(scheduled_tasks_data)} scheduled task(s) into jobs")
+    save_scheduled_tasks([])
 
 # Function to load temp voice channels
 def load_temp_voice():
-    try:
-        if os.path.exists(TEMP_VOICE_FILE):
-            with open(TEMP_VOICE_FILE, 'r') as f:
-                return json.load(f)
-        return {}
-    except Exception as e:
-        print(f"Error loading temp voice channels: {e}")
-        return {}
+    return _load_store(temp_voice_data, "temp voice channels")
 
 # Function to save temp voice channels
 def save_temp_voice(data):
-    try:
-        with open(TEMP_VOICE_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
-    except Exception as e:
-        print(f"Error saving temp voice channels: {e}")
+    _save_store(temp_voice_data, data, "temp voice channels")
 
 # Function to load fresh account settings
 def load_fresh_account_settings():
-    try:
-        if os.path.exists(FRESH_ACCOUNT_FILE):
-            with open(FRESH_ACCOUNT_FILE, 'r') as f:
-                return json.load(f)
-        return {}
-    except Exception as e:
-        print(f"Error loading fresh account settings: {e}")
-        return {}
+    return _load_store(fresh_account_settings, "fresh account settings")
 
 # Function to save fresh account settings
 def save_fresh_account_settings(data):
-    try:
-        with open(FRESH_ACCOUNT_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
-    except Exception as e:
-        print(f"Error saving fresh account settings: {e}")
+    _save_store(fresh_account_settings, data, "fresh account settings")
 
 # Function to load quarantined users
 def load_quarantine_data():
-    try:
-        if os.path.exists(QUARANTINE_FILE):
-            with open(QUARANTINE_FILE, 'r') as f:
-                return json.load(f)
-        return {}
-    except Exception as e:
-        print(f"Error loading quarantine data: {e}")
-        return {}
-        
+    quarantine_index.invalidate()
+    return _load_store(quarantine_data, "quarantine data")
+
 # Function to save quarantined users
 def save_quarantine_data(data):
-    try:
-        with open(QUARANTINE_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
-    except Exception as e:
-        print(f"Error saving quarantine data: {e}")
+    if data is not quarantine_data:
+        quarantine_index.invalidate()
+    _save_store(quarantine_data, data, "quarantine data")
+
+# Function to store a user's quarantine record and add it to quarantine_index
+def add_quarantine_record(guild_id, record):
+    guild_id = str(guild_id)
+    if guild_id not in quarantine_data:
+        quarantine_data[guild_id] = {}
+    quarantine_data[guild_id][str(record.user_id)] = record
+    quarantine_index.guild(guild_id).add(record)
+    save_quarantine_data(quarantine_data)
+
+# Function to delete a user's quarantine record and drop it from quarantine_index
+def remove_quarantine_record(guild_id, user_id):
+    guild_data = quarantine_data.get(str(guild_id))
+    if guild_data is not None:
+        guild_data.pop(str(user_id), None)
+    quarantine_index.guild(guild_id).remove(int(user_id))
+    save_quarantine_data(quarantine_data)
+
+# Function to set a guild's jail-cam channel (None to clear it)
+def set_jail_cam_channel(guild_id, channel_id):
+    guild_id = str(guild_id)
+    if guild_id not in quarantine_data:
+        quarantine_data[guild_id] = {}
+    settings = quarantine_data[guild_id].setdefault("server_settings", {})
+    if channel_id is None:
+        settings.pop("jail_cam_channel_id", None)
+    else:
+        settings["jail_cam_channel_id"] = str(channel_id)
+    quarantine_index.guild(guild_id).jail_cam_channel_id = int(channel_id) if channel_id is not None else None
+    save_quarantine_data(quarantine_data)
 
 # Function to load nickname filters
 def load_nickname_filters():
-    try:
-        if os.path.exists(NICKNAME_FILTER_FILE):
-            with open(NICKNAME_FILTER_FILE, 'r') as f:
-                return json.load(f)
-        return {}
-    except Exception as e:
-        print(f"Error loading nickname filters: {e}")
-        return {}
+    return _load_store(nickname_filters_data, "nickname filters")
 
 # Function to save nickname filters
 def save_nickname_filters(data):
-    try:
-        with open(NICKNAME_FILTER_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
-    except Exception as e:
-        print(f"Error saving nickname filters: {e}")
+    _save_store(nickname_filters_data, data, "nickname filters")
 
 # Function to load notes
 def load_notes():
-    try:
-        if os.path.exists(NOTES_FILE):
-            with open(NOTES_FILE, 'r') as f:
-                return json.load(f)
-        return {}
-    except Exception as e:
-        print(f"Error loading notes: {e}")
-        return {}
+    return _load_store(notes_data, "notes")
 
 # Function to save notes
 def save_notes(data):
+    _save_store(notes_data, data, "notes")
+
+# Function to add a mod note - appends one journal line instead of rewriting the store
+def add_mod_note(guild_id, user_id, note):
     try:
-        with open(NOTES_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
+        notes_data.append_entry(guild_id, user_id, note)
     except Exception as e:
-        print(f"Error saving notes: {e}")
+        print(f"Error saving note: {e}")
 
 # Function to load prison break game data
 def load_prison_break_data():
-    try:
-        if os.path.exists(PRISON_BREAK_FILE):
-            with open(PRISON_BREAK_FILE, 'r') as f:
-                return json.load(f)
-        return {}
-    except Exception as e:
-        print(f"Error loading prison break data: {e}")
-        return {}
+    return _load_store(prison_break_data, "prison break data")
 
 # Function to save prison break game data
 def save_prison_break_data(data):
+    _save_store(prison_break_data, data, "prison break data")
+
+# Function to load bad word lists
+def load_bad_words():
+    profanity_filter.invalidate()
+    return _load_store(bad_words_data, "bad words")
+
+# Function to save bad word lists
+def save_bad_words(data):
+    if data is not bad_words_data:
+        profanity_filter.invalidate()
+    _save_store(bad_words_data, data, "bad words")
+
+# Function to set a guild's bad word list (None to go back to BAD_WORDS)
+def set_guild_bad_words(guild_id, words):
+    guild_id = str(guild_id)
+    if words is None:
+        bad_words_data.pop(guild_id, None)
+    else:
+        bad_words_data[guild_id] = sorted(set(words))
+    profanity_filter.invalidate(guild_id)
+    save_bad_words(bad_words_data)
+
+# Function to drop a guild's rows from memory once the bot has left it
+# Its data stays in the database and is read again if the bot rejoins
+def evict_guild(guild_id):
+    for store in GUILD_STORES:
+        try:
+            store.evict(str(guild_id))
+        except Exception as e:
+            print(f"Error evicting guild {guild_id} from the {store.name} store: {e}")
+    quarantine_index.invalidate(guild_id)
+    profanity_filter.invalidate(guild_id)
+
+# Durability barrier - write every dirty store now and wait until it has
+# reached the database
+async def flush_data():
+    save_scheduler.flush()
+    if writer is not None:
+        await asyncio.wrap_future(writer.flush())
+
+# Flush all pending writes and close the database (call on shutdown)
+def shutdown_data():
+    global storage, writer
+    save_scheduler.flush()
+    if writer is not None:
+        writer.stop()
+        writer = None
+    if storage is not None:
+        storage.close()
+        storage = None
+        print("💾 All data stores flushed to disk")
+
+# Function to create a backup of all data stores
+# Each store is exported to a blob named by its hash, written only if that
+# content isn't backed up yet; the snapshot itself is a small manifest.
+# Changed stores have their rows captured on the event loop, everything else runs in backup_executor
+async def create_backup():
+    if backup_status["running"]:
+        print("⏳ A backup is already running, skipping this one")
+        return None
+
+    backup_status["running"] = True
+    backup_status["last_started"] = datetime.datetime.now(UTC)
+    started = time.monotonic()
     try:
-        with open(PRISON_BREAK_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
+        prepared = backups.prepare_snapshot(ALL_STORES)
+        loop = asyncio.get_running_loop()
+        backup_path, stats = await loop.run_in_executor(backup_executor, backups.write_snapshot, prepared)
     except Exception as e:
-        print(f"Error saving prison break data: {e}")
+        backup_status["last_error"] = str(e)
+        raise
+    finally:
+        backup_status["running"] = False
+        backup_status["last_finished"] = datetime.datetime.now(UTC)
+        backup_status["duration"] = time.monotonic() - started
 
-# Function to create a backup of all data files
-async def create_backup():
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_path = os.path.join(BACKUP_DIR, f"backup_{timestamp}")
-    os.makedirs(backup_path, exist_ok=True)
-    
-    # List of files to backup
-    files_to_backup = [
-        WARNING_FILE, 
-        REACTION_ROLES_FILE,
-        CUSTOM_COMMANDS_FILE,
-        SCHEDULED_TASKS_FILE,
-        TEMP_VOICE_FILE,
-        FRESH_ACCOUNT_FILE,
-        QUARANTINE_FILE,
-        NICKNAME_FILTER_FILE,
-        NOTES_FILE,
-        PRISON_BREAK_FILE
-    ]
-    
-    for file in files_to_backup:
-        if os.path.exists(file):
-            try:
-                with open(file, 'r') as src:
-                    content = src.read()
-                    
-                with open(os.path.join(backup_path, file), 'w') as dest:
-                    dest.write(content)
-            except Exception as e:
-                print(f"Error backing up {file}: {e}")
-    
-    print(f"Backup created at {backup_path}")
+    backup_status.update(stats)
+    backup_status["last_path"] = backup_path
+    backup_status["last_error"] = None
+    backup_status["total_backups"] += 1
+    print(f"Backup created at {backup_path} in {backup_status['duration']:.2f}s "
+          f"({stats['new_blobs']}/{stats['files']} files changed, {stats['bytes_written']} bytes written)")
     return backup_path
 
+# Function to delete old backups, keeping the newest BACKUP_KEEP snapshots
+async def prune_backups(keep=BACKUP_KEEP):
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(backup_executor, backups.prune, keep)
+
+# Function to pack a backup snapshot into a single archive file (for off-site copies)
+def pack_backup(name):
+    archive_path = backups.pack(backups.resolve(name))
+    print(f"📦 Backup packed into {archive_path}")
+    return archive_path
+
+# Function to restore every data store from a backup snapshot folder or packed archive
+# All files are verified against their checksums before any store is touched
+async def restore_backup(name):
+    path = backups.resolve(name)
+    stores = {file: store for store, file in ALL_STORES}
+    restored = []
+    for file, data in backups.iter_restore(path):
+        store = stores.get(file)
+        if store is None:
+            print(f"⚠️ Backup {path} contains unknown file {file}, skipping")
+            continue
+        _save_store(store, data, file)
+        restored.append(file)
+    quarantine_index.invalidate()
+    profanity_filter.invalidate()
+    await flush_data()
+    print(f"♻️ Restored {len(restored)} data files from {path}")
+    return restored
+
+# Function to load every store and the rows of the given guilds ahead of first use
+# Rows are read in a worker thread; call it once the bot is connected
+async def prefetch_data(guild_ids):
+    started = time.monotonic()
+    guild_keys = [str(guild_id) for guild_id in guild_ids]
+    guild_store_names = {store.name for store in GUILD_STORES}
+    for store, file in ALL_STORES:
+        try:
+            if store.name in guild_store_names:
+                await store.prefetch(guild_keys)
+            elif store.lazy:
+                await store.prefetch(list(store))
+            else:
+                store.load_all()
+        except Exception as e:
+            print(f"Error prefetching {file}: {e}")
+        # Let other tasks run between stores
+        await asyncio.sleep(0)
+    print(f"✅ Data for {len(guild_keys)} guild(s) prefetched in {time.monotonic() - started:.2f}s")
+
 # Initialize all data stores
+# Nothing is read here - each store loads itself on first access (or in
+# prefetch_data), so the bot can connect to the gateway straight away
 def initialize_data():
-    global warnings_data, reaction_roles_data, custom_commands_data
-    global scheduled_tasks_data, temp_voice_data, nickname_filters_data
-    global fresh_account_settings, quarantine_data, notes_data, prison_break_data
-    
     # Create backup directory if it doesn't exist
     os.makedirs(BACKUP_DIR, exist_ok=True)
     
-    # Load all data
-    warnings_data = load_warnings()
-    reaction_roles_data = load_reaction_roles()
-    custom_commands_data = load_custom_commands()
-    scheduled_tasks_data = load_scheduled_tasks()
-    temp_voice_data = load_temp_voice()
-    nickname_filters_data = load_nickname_filters()
-    fresh_account_settings = load_fresh_account_settings()
-    quarantine_data = load_quarantine_data()
-    notes_data = load_notes()
-    prison_break_data = load_prison_break_data()
+    warnings_data.bind_loader(load_warnings)
+    reaction_roles_data.bind_loader(load_reaction_roles)
+    custom_commands_data.bind_loader(load_custom_commands)
+    scheduled_tasks_data.bind_loader(load_scheduled_tasks)
+    jobs_data.bind_loader(load_jobs)
+    temp_voice_data.bind_loader(load_temp_voice)
+    nickname_filters_data.bind_loader(load_nickname_filters)
+    fresh_account_settings.bind_loader(load_fresh_account_settings)
+    quarantine_data.bind_loader(load_quarantine_data)
+    notes_data.bind_loader(load_notes)
+    prison_break_data.bind_loader(load_prison_break_data)
+    bad_words_data.bind_loader(load_bad_words)
     
-    print("✅ All data files loaded successfully") 
\ No newline at end of file
+    print("✅ Data stores ready (loaded on first use)")
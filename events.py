@@ -5,16 +5,34 @@ import re
 import random
 from config import *
 from data_manager import *
+from utils.pipeline import MessagePipeline, STOP
+from utils.rest import rest_executor
+from utils.mirror import MirrorBuffer
+from utils.records import QuarantineRecord
+
+# Stages run for every guild message, in order - see register_message_stages
+message_pipeline = MessagePipeline()
+
+# Quarantined users' messages on their way to jail-cam, sent in batches
+jail_cam_mirror = MirrorBuffer(JAIL_CAM_MIRROR_SECONDS)
 
 def setup_events(bot):
     """Setup all Discord event handlers"""
     
+    job_scheduler.register("unban", lambda job: run_unban_job(bot, job))
+    job_scheduler.register("unmute", lambda job: run_unmute_job(bot, job))
+    job_scheduler.register("reminder", lambda job: run_reminder_job(bot, job))
+    register_message_stages()
+    
     @bot.event
     async def on_ready():
         print(f'{bot.user.name} has connected to Discord!')
         print(f'Bot ID: {bot.user.id}')
         print(f'Bot is in {len(bot.guilds)} guild(s)')
         
+        # Load the data of the guilds we're in before it's first needed
+        bot.loop.create_task(prefetch_data([guild.id for guild in bot.guilds]))
+        
         # Setup command modules
         print("🔧 Setting up command modules...")
         try:
@@ -46,13 +64,13 @@ def setup_events(bot):
         # Setup recurring scheduled tasks
         # Start the background tasks
         bot.loop.create_task(scheduled_backup())
-        bot.loop.create_task(check_scheduled_tasks())
         
-        if not check_quarantine_expirations.is_running():
-            check_quarantine_expirations.start()
+        # Run scheduled jobs (unbans, reminders, quarantine releases) at their due time
+        migrate_scheduled_tasks()
+        job_scheduler.start()
         
-        # Create backup on startup
-        await create_backup()
+        # Create backup on startup (in the background, so it doesn't hold up readiness)
+        bot.loop.create_task(create_backup())
         
         # DIAGNOSTIC: Print all commands registered in the command tree
         print("\nDIAGNOSTIC - Commands registered in tree:")
@@ -83,203 +101,11 @@ def setup_events(bot):
 
     @bot.event
     async def on_message(message):
-        # Skip if message is from bot
-        if message.author.bot:
-            return
-        
-        # Skip DMs
-        if not message.guild:
+        # Skip bot messages and DMs
+        if message.author.bot or not message.guild:
             return
-            
-        # Always process commands AFTER checking quarantine status
-        # This ensures we mirror messages before processing them as commands
-        
-        # Check if message is from a quarantined user
-        guild_id = str(message.guild.id)
-        user_id = str(message.author.id)
         
-        # Mirror messages from quarantined users to jail-cam channel if public viewing is enabled
-        if guild_id in quarantine_data and user_id in quarantine_data[guild_id]:
-            # Check if public viewing is enabled for this user
-            user_data = quarantine_data[guild_id][user_id]
-            
-            # Only mirror if public_view is True
-            if user_data.get("public_view", False):
-                # Get the jail-cam channel ID from user data or server settings
-                jail_cam_channel_id = user_data.get("jail_cam_channel_id")
-                
-                # If no specific channel is set for this user, check server settings
-                if not jail_cam_channel_id and "server_settings" in quarantine_data[guild_id]:
-                    jail_cam_channel_id = quarantine_data[guild_id]["server_settings"].get("jail_cam_channel_id")
-                
-                # If still no channel, try to find the default one
-                if not jail_cam_channel_id:
-                    jail_cam_channel = discord.utils.get(message.guild.text_channels, name=JAIL_CAM_CHANNEL_NAME)
-                    if jail_cam_channel:
-                        jail_cam_channel_id = str(jail_cam_channel.id)
-                
-                # Get the actual channel object
-                jail_cam_channel = None
-                if jail_cam_channel_id:
-                    jail_cam_channel = message.guild.get_channel(int(jail_cam_channel_id))
-                
-                if jail_cam_channel:
-                    # Format the message in a simple text format
-                    content = message.content if message.content else "(No message content)"
-                    
-                    # Add info about attachments if any
-                    attachments_text = ""
-                    if message.attachments:
-                        attachment_list = ", ".join([attachment.filename for attachment in message.attachments])
-                        attachments_text = f" [Attached: {attachment_list}]"
-                    
-                    # Create the simple mirror message
-                    mirror_message = f"**{message.author.display_name}** in #{message.channel.name} said: {content}{attachments_text}"
-                    
-                    # Send to jail-cam with better error handling
-                    try:
-                        await jail_cam_channel.send(mirror_message)
-                        print(f"Successfully mirrored message from {message.author.name} to jail-cam")
-                    except Exception as e:
-                        print(f"Failed to mirror message to jail-cam: {e}")
-                        # Try to log more details about why mirroring failed
-                        print(f"jail-cam channel: {jail_cam_channel}, public_view: {user_data.get('public_view')}, user: {message.author.name}")
-                        
-                    # Debug log
-                    print(f"Quarantined user {message.author.name} said: {content} in #{message.channel.name}") 
-
-        # NEW: Check if message is FROM jail-cam channel to quarantined users (reverse mirroring)
-        elif message.channel.name == JAIL_CAM_CHANNEL_NAME:
-            # This is a message sent in jail-cam by a normal user, forward it to quarantined users
-            # Only process if there are actually quarantined users in this guild
-            if guild_id in quarantine_data and quarantine_data[guild_id]:
-                # Check if this channel is configured as the jail-cam channel
-                is_jail_cam_channel = False
-                
-                # Check if this is the server-configured jail-cam channel
-                if "server_settings" in quarantine_data[guild_id]:
-                    configured_jail_cam_id = quarantine_data[guild_id]["server_settings"].get("jail_cam_channel_id")
-                    if configured_jail_cam_id and message.channel.id == int(configured_jail_cam_id):
-                        is_jail_cam_channel = True
-                
-                # If not configured channel, check if it's the default jail-cam channel
-                if not is_jail_cam_channel and message.channel.name == JAIL_CAM_CHANNEL_NAME:
-                    is_jail_cam_channel = True
-                
-                if is_jail_cam_channel:
-                    content = message.content if message.content else "(No message content)"
-                    
-                    # Add info about attachments if any
-                    attachments_text = ""
-                    if message.attachments:
-                        attachment_list = ", ".join([attachment.filename for attachment in message.attachments])
-                        attachments_text = f" [Attached: {attachment_list}]"
-                    
-                    # Create message to send to quarantined users
-                    jail_cam_message = f"📺 **{message.author.display_name}** from jail-cam says: {content}{attachments_text}"
-                    
-                    # Find all quarantined users in this guild and send message to their quarantine channels
-                    quarantined_users = quarantine_data[guild_id]
-                    messages_sent = 0
-                    
-                    for user_id, user_data in quarantined_users.items():
-                        if user_data.get("public_view", False):  # Only if public viewing is enabled
-                            quarantine_channel_id = user_data.get("channel_id")
-                            if quarantine_channel_id:
-                                quarantine_channel = message.guild.get_channel(int(quarantine_channel_id))
-                                if quarantine_channel:
-                                    try:
-                                        await quarantine_channel.send(jail_cam_message)
-                                        messages_sent += 1
-                                    except Exception as e:
-                                        print(f"Failed to forward jail-cam message to quarantine channel: {e}")
-                    
-                    if messages_sent > 0:
-                        print(f"Successfully forwarded jail-cam message from {message.author.name} to {messages_sent} quarantine channel(s)")
-                        # Add a reaction to show the message was forwarded
-                        try:
-                            await message.add_reaction("📨")  # Envelope emoji to show it was delivered
-                        except:
-                            pass
-                    else:
-                        print(f"No active quarantined users to forward jail-cam message to")
-            # If no quarantined users, silently ignore the message (don't forward anything)
-
-        # Process commands AFTER checking quarantine status
-        await bot.process_commands(message)
-        
-        # Auto-moderate content
-        content = message.content.lower()
-        
-        # Check for bad words
-        if any(word in content for word in BAD_WORDS):
-            await message.delete()
-            await message.channel.send(f"{message.author.mention}, please watch your language!", delete_after=5)
-            
-            # Auto-warn for bad language
-            guild_id = str(message.guild.id)
-            user_id = str(message.author.id)
-            
-            # Initialize guild and user in warnings_data if they don't exist
-            if guild_id not in warnings_data:
-                warnings_data[guild_id] = {}
-            if user_id not in warnings_data[guild_id]:
-                warnings_data[guild_id][user_id] = []
-            
-            # Add the warning
-            warning = {
-                "reason": "Automatic warning for inappropriate language",
-                "timestamp": str(datetime.datetime.now(UTC)),
-                "moderator": str(bot.user.id)
-            }
-            warnings_data[guild_id][user_id].append(warning)
-            save_warnings(warnings_data)
-            
-            # DM the user about the warning
-            try:
-                await message.author.send(f"You have been automatically warned in **{message.guild.name}** for inappropriate language.")
-            except:
-                pass  # Silently fail if DM cannot be sent
-                
-        # Check for custom commands
-        guild_id = str(message.guild.id)
-        if guild_id in custom_commands_data and message.content.startswith(PREFIX):
-            cmd = message.content[len(PREFIX):].lower().strip()
-            if cmd in custom_commands_data[guild_id]:
-                # Execute custom command
-                cmd_data = custom_commands_data[guild_id][cmd]
-                response = cmd_data["response"]
-                
-                # Check if this is an embed command
-                if cmd_data.get("is_embed", False):
-                    embed = discord.Embed(
-                        title=cmd_data.get("title", "Custom Command"),
-                        description=response,
-                        color=discord.Color.blue()
-                    )
-                    
-                    if "image" in cmd_data and cmd_data["image"]:
-                        embed.set_image(url=cmd_data["image"])
-                        
-                    if "footer" in cmd_data and cmd_data["footer"]:
-                        embed.set_footer(text=cmd_data["footer"])
-                        
-                    await message.channel.send(embed=embed)
-                else:
-                    await message.channel.send(response)
-
-        # NEW: Prison Break Game Challenge Handling
-        # Check if user is in a quarantine room and participating in a prison break game
-        if guild_id in quarantine_data and user_id in quarantine_data[guild_id]:
-            if guild_id in prison_break_data:
-                for game_id, game_data in prison_break_data[guild_id].items():
-                    if game_data.get("active", False) and int(user_id) in game_data["players"]:
-                        current_challenge = game_data.get("current_challenge")
-                        if current_challenge:
-                            # Import the handler function from quarantine module
-                            from commands.quarantine import handle_prison_break_attempt
-                            await handle_prison_break_attempt(message, guild_id, game_id, game_data, current_challenge)
-                            break
+        await message_pipeline.run(MessageContext(bot, message))
 
     @bot.event
     async def on_member_join(member):
@@ -339,18 +165,21 @@ def setup_events(bot):
                         if quarantine_channel_id:
                             quarantine_channel = member.guild.get_channel(int(quarantine_channel_id))
                             if quarantine_channel:
-                                # Set permissions for all channels to deny access
-                                for channel in member.guild.channels:
-                                    if channel.id != int(quarantine_channel_id) and isinstance(channel, discord.TextChannel):
-                                        try:
-                                            await channel.set_permissions(member, read_messages=False, send_messages=False,
-                                                                        reason="Fresh account quarantine")
-                                        except:
-                                            pass
+                                # Record it like any other quarantine, so /unquarantine can release them
+                                record = QuarantineRecord(
+                                    user_id=member.id,
+                                    reason=f"Fresh account: account age {account_age_days} days",
+                                    moderator_id=bot.user.id,
+                                    roles=[role.id for role in member.roles if not role.is_default()],
+                                    timestamp=join_time,
+                                    channel_id=quarantine_channel.id
+                                )
+                                add_quarantine_record(guild_id, record)
                                 
-                                # Allow access to quarantine channel
-                                await quarantine_channel.set_permissions(member, read_messages=True, send_messages=True,
-                                                                      reason="Fresh account quarantine")
+                                # Restrict them to the quarantine channel - it isn't the quarantine
+                                # room the shared role opens, so this uses member overwrites
+                                from commands.quarantine import apply_quarantine
+                                await apply_quarantine(member.guild, member, quarantine_channel, "Fresh account quarantine", mode="channels")
                                 
                                 # Send message to quarantine channel
                                 quarantine_message = settings.get("quarantine_message", "Your account is new, so you've been placed in quarantine. Please wait for staff to verify your account.")
@@ -373,6 +202,26 @@ def setup_events(bot):
             embed.set_footer(text=f"Member #{len(member.guild.members)}")
             await welcome_channel.send(embed=embed)
 
+    @bot.event
+    async def on_guild_channel_create(channel):
+        # Keep quarantined users out of channels made after the quarantine role was set up
+        try:
+            from commands.quarantine import hide_channel_from_quarantine
+            await hide_channel_from_quarantine(channel)
+        except Exception as e:
+            print(f"Error hiding new channel {channel.name} from quarantine: {e}")
+
+    @bot.event
+    async def on_guild_join(guild):
+        # Read the new guild's rows in the background instead of on its first message
+        bot.loop.create_task(prefetch_data([guild.id]))
+
+    @bot.event
+    async def on_guild_remove(guild):
+        # The bot left or was removed - free the guild's data from memory (it stays on disk)
+        evict_guild(guild.id)
+        print(f"Left guild {guild.name} ({guild.id}), evicted its data from memory")
+
     @bot.event
     async def on_message_delete(message):
         # Skip bot messages and DMs
@@ -561,7 +410,7 @@ def setup_events(bot):
             return
             
         # Check if user is quarantined (quarantined users can't help from outside)
-        is_quarantined = guild_id in quarantine_data and user_id in quarantine_data[guild_id]
+        is_quarantined = user.id in quarantine_index.guild(guild_id)
         
         if is_quarantined:
             # Remove the reaction and notify
@@ -638,6 +487,190 @@ def setup_events(bot):
             await reaction.message.channel.send(f"😈 **SABOTAGE DETECTED!**\n{sabotage_message}\n🔥 The escape just got harder!")
 
 
+# Message pipeline
+class MessageContext:
+    """A guild message and the lookups its stages share, done once per message"""
+
+    __slots__ = ("bot", "message", "guild_id", "user_id", "quarantine", "record")
+
+    def __init__(self, bot, message):
+        self.bot = bot
+        self.message = message
+        self.guild_id = str(message.guild.id)
+        self.user_id = str(message.author.id)
+        # The guild's quarantine index, and the author's record if quarantined
+        self.quarantine = quarantine_index.guild(message.guild.id)
+        self.record = self.quarantine.records.get(message.author.id)
+
+def register_message_stages():
+    """Register the on_message stages, in the order they run"""
+    # Mirror messages from quarantined users to jail-cam channel if public viewing is enabled
+    message_pipeline.register(
+        "quarantine_mirror", mirror_quarantined_message,
+        when=lambda ctx: ctx.record is not None and ctx.record.public_view
+    )
+    # Messages sent in jail-cam by normal users are forwarded to the quarantined users
+    message_pipeline.register(
+        "jail_cam_forward", forward_jail_cam_message,
+        when=lambda ctx: ctx.record is None and ctx.quarantine.public_channel_ids and is_jail_cam_channel(ctx)
+    )
+    # Commands run after the quarantine stages, so messages are mirrored before they're processed
+    message_pipeline.register(
+        "commands", lambda ctx: ctx.bot.process_commands(ctx.message),
+        when=lambda ctx: ctx.message.content.startswith(PREFIX)
+    )
+    message_pipeline.register(
+        "bad_words", filter_bad_words,
+        when=lambda ctx: ctx.message.content
+    )
+    message_pipeline.register(
+        "custom_commands", run_custom_command,
+        when=lambda ctx: ctx.message.content.startswith(PREFIX) and ctx.guild_id in custom_commands_data
+    )
+    message_pipeline.register(
+        "prison_break", check_prison_break_attempt,
+        when=lambda ctx: ctx.record is not None and ctx.guild_id in prison_break_data
+    )
+
+def is_jail_cam_channel(ctx):
+    channel = ctx.message.channel
+    return channel.id == ctx.quarantine.jail_cam_channel_id or channel.name == JAIL_CAM_CHANNEL_NAME
+
+async def mirror_quarantined_message(ctx):
+    message = ctx.message
+    user_data = ctx.record
+    
+    # Get the jail-cam channel from user data or server settings
+    jail_cam_channel_id = user_data.jail_cam_channel_id or ctx.quarantine.jail_cam_channel_id
+    if jail_cam_channel_id:
+        jail_cam_channel = message.guild.get_channel(jail_cam_channel_id)
+    else:
+        # If no channel is set, try to find the default one
+        jail_cam_channel = discord.utils.get(message.guild.text_channels, name=JAIL_CAM_CHANNEL_NAME)
+    
+    if jail_cam_channel:
+        # Format the message in a simple text format
+        content = message.content if message.content else "(No message content)"
+        
+        # Add info about attachments if any
+        attachments_text = ""
+        if message.attachments:
+            attachment_list = ", ".join([attachment.filename for attachment in message.attachments])
+            attachments_text = f" [Attached: {attachment_list}]"
+        
+        # Create the simple mirror message
+        mirror_message = f"**{message.author.display_name}** in #{message.channel.name} said: {content}{attachments_text}"
+        
+        # Queue it for jail-cam - messages arriving close together are sent as one
+        jail_cam_mirror.add(jail_cam_channel, mirror_message)
+        
+        # Debug log
+        print(f"Quarantined user {message.author.name} said: {content} in #{message.channel.name}")
+
+async def forward_jail_cam_message(ctx):
+    message = ctx.message
+    content = message.content if message.content else "(No message content)"
+    
+    # Add info about attachments if any
+    attachments_text = ""
+    if message.attachments:
+        attachment_list = ", ".join([attachment.filename for attachment in message.attachments])
+        attachments_text = f" [Attached: {attachment_list}]"
+    
+    # Create message to send to quarantined users
+    jail_cam_message = f"📺 **{message.author.display_name}** from jail-cam says: {content}{attachments_text}"
+    
+    # Send it to the quarantine channels of the users with public viewing enabled,
+    # concurrently - each channel once, however many prisoners share it
+    channels = [channel for channel in map(message.guild.get_channel, ctx.quarantine.public_channel_ids) if channel]
+    results = await rest_executor.run(
+        [lambda channel=channel: channel.send(jail_cam_message) for channel in channels],
+        bucket=f"jail_cam:{message.guild.id}"
+    )
+    messages_sent = 0
+    for channel, result in zip(channels, results):
+        if isinstance(result, Exception):
+            print(f"Failed to forward jail-cam message to {channel.name}: {result}")
+        else:
+            messages_sent += 1
+    
+    if messages_sent > 0:
+        print(f"Successfully forwarded jail-cam message from {message.author.name} to {messages_sent} quarantine channel(s)")
+        # Add a reaction to show the message was forwarded
+        try:
+            await message.add_reaction("📨")  # Envelope emoji to show it was delivered
+        except:
+            pass
+    else:
+        print(f"No active quarantined users to forward jail-cam message to")
+
+async def filter_bad_words(ctx):
+    message = ctx.message
+    # The guild's own word list (or BAD_WORDS), compiled once per change
+    if profanity_filter.find(ctx.guild_id, message.content) is None:
+        return
+    
+    await message.delete()
+    await message.channel.send(f"{message.author.mention}, please watch your language!", delete_after=5)
+    
+    # Add the warning (one journal append)
+    warning = {
+        "reason": "Automatic warning for inappropriate language",
+        "timestamp": str(datetime.datetime.now(UTC)),
+        "moderator": str(ctx.bot.user.id)
+    }
+    add_warning(ctx.guild_id, ctx.user_id, warning)
+    
+    # DM the user about the warning
+    try:
+        await message.author.send(f"You have been automatically warned in **{message.guild.name}** for inappropriate language.")
+    except:
+        pass  # Silently fail if DM cannot be sent
+    
+    # The message is gone - don't run custom commands or games for it
+    return STOP
+
+async def run_custom_command(ctx):
+    message = ctx.message
+    cmd = message.content[len(PREFIX):].lower().strip()
+    guild_commands = custom_commands_data[ctx.guild_id]
+    if cmd not in guild_commands:
+        return
+    
+    # Execute custom command
+    cmd_data = guild_commands[cmd]
+    response = cmd_data["response"]
+    
+    # Check if this is an embed command
+    if cmd_data.get("is_embed", False):
+        embed = discord.Embed(
+            title=cmd_data.get("title", "Custom Command"),
+            description=response,
+            color=discord.Color.blue()
+        )
+        
+        if "image" in cmd_data and cmd_data["image"]:
+            embed.set_image(url=cmd_data["image"])
+            
+        if "footer" in cmd_data and cmd_data["footer"]:
+            embed.set_footer(text=cmd_data["footer"])
+            
+        await message.channel.send(embed=embed)
+    else:
+        await message.channel.send(response)
+
+async def check_prison_break_attempt(ctx):
+    # Check if the quarantined user is participating in a prison break game
+    user_id = int(ctx.user_id)
+    for game_id, game_data in prison_break_data[ctx.guild_id].items():
+        if game_data.get("active", False) and user_id in game_data["players"]:
+            current_challenge = game_data.get("current_challenge")
+            if current_challenge:
+                # Imported here - commands.quarantine is set up after the events
+                from commands.quarantine import handle_prison_break_attempt
+                await handle_prison_break_attempt(ctx.message, ctx.guild_id, game_id, game_data, current_challenge)
+                break
+
 # Scheduled tasks functions
 async def scheduled_backup():
     while True:
@@ -647,253 +680,51 @@ async def scheduled_backup():
             backup_path = await create_backup()
             print(f"Scheduled backup created at {backup_path}")
             
-            # Clean up old backups (keep last 7)
-            backup_folders = sorted([os.path.join(BACKUP_DIR, d) for d in os.listdir(BACKUP_DIR) 
-                                   if os.path.isdir(os.path.join(BACKUP_DIR, d))])
-            if len(backup_folders) > 7:
-                for old_folder in backup_folders[:-7]:
-                    try:
-                        for file in os.listdir(old_folder):
-                            os.remove(os.path.join(old_folder, file))
-                        os.rmdir(old_folder)
-                        print(f"Removed old backup: {old_folder}")
-                    except Exception as e:
-                        print(f"Error removing old backup {old_folder}: {e}")
+            # Clean up old backups (keep last BACKUP_KEEP) and blobs no longer used
+            await prune_backups()
         except Exception as e:
             print(f"Error in scheduled backup: {e}")
             await asyncio.sleep(60)  # Wait a minute before retrying if there's an error
 
-async def check_scheduled_tasks():
-    while True:
-        try:
-            await asyncio.sleep(60)  # Check every minute
-            current_time = datetime.datetime.now(UTC)
-            tasks_to_remove = []
-            
-            for i, task in enumerate(scheduled_tasks_data):
-                try:
-                    execute_time = datetime.datetime.fromisoformat(task["time"])
-                    if current_time >= execute_time:
-                        # Time to execute this task
-                        guild_id = int(task["guild_id"])
-                        guild = bot.get_guild(guild_id)
-                        
-                        if guild:
-                            action_type = task["action"]
-                            
-                            if action_type == "unban":
-                                user_id = int(task["user_id"])
-                                reason = task.get("reason", "Scheduled unban")
-                                try:
-                                    await guild.unban(discord.Object(id=user_id), reason=reason)
-                                    print(f"Scheduled unban for user {user_id} in {guild.name}")
-                                except:
-                                    print(f"Failed scheduled unban for user {user_id} in {guild.name}")
-                                    
-                            elif action_type == "unmute":
-                                user_id = int(task["user_id"])
-                                reason = task.get("reason", "Scheduled unmute")
-                                try:
-                                    member = guild.get_member(user_id)
-                                    if member:
-                                        await member.timeout(None, reason=reason)
-                                        print(f"Scheduled unmute for user {member.display_name} in {guild.name}")
-                                except:
-                                    print(f"Failed scheduled unmute for user {user_id} in {guild.name}")
-                                    
-                            elif action_type == "reminder":
-                                channel_id = int(task["channel_id"])
-                                message = task["message"]
-                                channel = guild.get_channel(channel_id)
-                                if channel:
-                                    try:
-                                        await channel.send(f"⏰ **Scheduled Reminder:** {message}")
-                                        print(f"Sent reminder in {channel.name}")
-                                    except:
-                                        print(f"Failed to send reminder in channel {channel_id}")
-                        
-                        # Mark task for removal
-                        tasks_to_remove.append(i)
-                except Exception as e:
-                    print(f"Error processing scheduled task: {e}")
-                    tasks_to_remove.append(i)
-                    
-            # Remove completed tasks (in reverse order to avoid index issues)
-            for index in sorted(tasks_to_remove, reverse=True):
-                scheduled_tasks_data.pop(index)
-            
-            if tasks_to_remove:
-                save_scheduled_tasks(scheduled_tasks_data)
-                
-        except Exception as e:
-            print(f"Error in scheduled tasks checker: {e}")
-            await asyncio.sleep(60)  # Wait a minute before retrying if there's an error
-
-# Import the quarantine task
-from discord.ext import tasks
-
-@tasks.loop(minutes=1)
-async def check_quarantine_expirations():
+# Scheduled job handlers - a handler that raises is retried with backoff
+async def run_unban_job(bot, job):
+    guild = bot.get_guild(int(job["guild_id"]))
+    if not guild:
+        return
+    
+    user_id = int(job["user_id"])
     try:
-        print(f"🔍 Checking quarantine expirations at {datetime.datetime.now(UTC).strftime('%H:%M:%S')}")
-        current_time = datetime.datetime.now(UTC)
-        guilds_to_check = list(quarantine_data.keys())
-        
-        total_checked = 0
-        total_released = 0
-        
-        for guild_id in guilds_to_check:
-            guild = bot.get_guild(int(guild_id))
-            if not guild:
-                print(f"⚠️ Skipping guild {guild_id} - not found")
-                continue
-                
-            users_to_unquarantine = []
-            
-            # Find users whose quarantine has expired (filter out server_settings)
-            for user_id, data in quarantine_data[guild_id].items():
-                # Skip server settings - only process actual user quarantine records
-                if user_id == "server_settings":
-                    continue
-                    
-                total_checked += 1
-                
-                if "end_time" in data:
-                    try:
-                        end_time_str = data["end_time"]
-                        end_time = datetime.datetime.fromisoformat(end_time_str.replace('Z', '+00:00'))
-                        
-                        if current_time >= end_time:
-                            users_to_unquarantine.append(user_id)
-                            print(f"✅ Quarantine expired for user {user_id} in guild {guild.name} (expired {int((current_time - end_time).total_seconds())}s ago)")
-                        else:
-                            remaining = int((end_time - current_time).total_seconds())
-                            print(f"⏰ User {user_id} in {guild.name}: {remaining}s remaining")
-                            
-                    except Exception as e:
-                        print(f"❌ Error parsing end time for user {user_id} in guild {guild.name}: {e}")
-                        print(f"   Raw end_time data: {data.get('end_time', 'None')}")
-            
-            # Unquarantine expired users
-            for user_id in users_to_unquarantine:
-                try:
-                    # Get the user and their data
-                    member = await guild.fetch_member(int(user_id))
-                    user_data = quarantine_data[guild_id][user_id]
-                    saved_roles = user_data.get("roles", [])
-                    
-                    print(f"🔓 Auto-unquarantining {member.display_name} ({user_id}) in {guild.name}")
-                    
-                    # Reset channel permissions
-                    permissions_reset = 0
-                    for channel in guild.channels:
-                        try:
-                            await channel.set_permissions(member, overwrite=None, reason="Auto-released from timed quarantine")
-                            permissions_reset += 1
-                        except Exception as e:
-                            print(f"   ⚠️ Failed to reset permissions for channel {channel.name}: {e}")
-                    
-                    print(f"   📝 Reset permissions for {permissions_reset} channels")
-                    
-                    # Restore roles
-                    roles_restored = 0
-                    roles_failed = 0
-                    for role_id in saved_roles:
-                        role = guild.get_role(int(role_id))
-                        if role:
-                            try:
-                                await member.add_roles(role, reason="Auto-released from timed quarantine")
-                                roles_restored += 1
-                            except Exception as e:
-                                print(f"   ⚠️ Failed to restore role {role.name}: {e}")
-                                roles_failed += 1
-                        else:
-                            print(f"   ⚠️ Role with ID {role_id} no longer exists")
-                            roles_failed += 1
-                    
-                    print(f"   🎭 Restored {roles_restored} roles, failed {roles_failed}")
-                    
-                    # Remove from quarantine data
-                    del quarantine_data[guild_id][user_id]
-                    save_quarantine_data(quarantine_data)
-                    total_released += 1
-                    
-                    # DM the user
-                    try:
-                        await member.send(f"You have been automatically released from quarantine in **{guild.name}**. Your access has been restored.")
-                        print(f"   📧 DM sent to user")
-                    except Exception as e:
-                        print(f"   ⚠️ Failed to DM user: {e}")
-                    
-                    # Log to mod-logs
-                    try:
-                        log_channel = discord.utils.get(guild.text_channels, name="mod-logs")
-                        if log_channel:
-                            embed = discord.Embed(
-                                title="🔓 User Auto-Released from Quarantine",
-                                description=f"<@{user_id}> has been automatically released from quarantine (timer expired).",
-                                color=discord.Color.green(),
-                                timestamp=current_time
-                            )
-                            embed.add_field(name="User", value=f"<@{user_id}> ({user_id})", inline=True)
-                            embed.set_footer(text="Automatic timed release")
-                            await log_channel.send(embed=embed)
-                            print(f"   📝 Logged to mod-logs")
-                        else:
-                            print(f"   ⚠️ No mod-logs channel found")
-                    except Exception as e:
-                        print(f"   ⚠️ Failed to log to mod-logs: {e}")
-                    
-                    # Also announce it in the jail-cam channel
-                    try:
-                        jail_cam_channel = discord.utils.get(guild.text_channels, name=JAIL_CAM_CHANNEL_NAME)
-                        if jail_cam_channel:
-                            freedom_messages = [
-                                f"🔓 **FREEDOM!** {member.mention} has served their time and been released!",
-                                f"🕊️ {member.mention} has been set free! Their sentence is complete.",
-                                f"⏱️ Time's up! {member.mention} has been released from quarantine.",
-                                f"🎉 Congratulations {member.mention}! You're free to go!",
-                                f"🚪 The cell door opens... {member.mention} walks free once more!"
-                            ]
-                            freedom_message = random.choice(freedom_messages)
-                            
-                            # Create a fancy embed for the jail-cam
-                            embed = discord.Embed(
-                                title="Prisoner Released",
-                                description=freedom_message,
-                                color=discord.Color.green(),
-                                timestamp=current_time
-                            )
-                            embed.set_thumbnail(url=member.display_avatar.url)
-                            embed.set_footer(text="They've done their time! Back to normal server access.")
-                            
-                            await jail_cam_channel.send(embed=embed)
-                            print(f"   📺 Announced release in jail-cam")
-                        else:
-                            print(f"   ⚠️ No jail-cam channel found")
-                    except Exception as e:
-                        print(f"   ⚠️ Failed to announce in jail-cam: {e}")
-                        
-                except Exception as e:
-                    print(f"❌ Error auto-unquarantining user {user_id} in guild {guild.name}: {e}")
-                    import traceback
-                    traceback.print_exc()
-        
-        # Summary logging
-        if total_checked > 0:
-            print(f"📊 Quarantine check complete: {total_checked} users checked, {total_released} released")
-        else:
-            print(f"📊 Quarantine check complete: No users with timers found")
-            
-    except Exception as e:
-        print(f"💥 Critical error in quarantine expiration task: {e}")
-        import traceback
-        traceback.print_exc()
+        await guild.unban(discord.Object(id=user_id), reason=job.get("reason", "Scheduled unban"))
+        print(f"Scheduled unban for user {user_id} in {guild.name}")
+    except (discord.NotFound, discord.Forbidden) as e:
+        # Already unbanned, or we can't - retrying won't help
+        print(f"Failed scheduled unban for user {user_id} in {guild.name}: {e}")
 
-@check_quarantine_expirations.before_loop
-async def before_quarantine_check():
-    await bot.wait_until_ready()
+async def run_unmute_job(bot, job):
+    guild = bot.get_guild(int(job["guild_id"]))
+    if not guild:
+        return
+    
+    user_id = int(job["user_id"])
+    member = guild.get_member(user_id)
+    if not member:
+        return
+    try:
+        await member.timeout(None, reason=job.get("reason", "Scheduled unmute"))
+        print(f"Scheduled unmute for user {member.display_name} in {guild.name}")
+    except (discord.NotFound, discord.Forbidden) as e:
+        print(f"Failed scheduled unmute for user {user_id} in {guild.name}: {e}")
 
-async def handle_prison_break_attempt(message, guild_id, game_id, game_data, current_challenge):
-    """Handle a prison break challenge attempt - this is a placeholder for now"""
-    pass  # This will be implemented in the quarantine module 
\ No newline at end of file
+async def run_reminder_job(bot, job):
+    guild = bot.get_guild(int(job["guild_id"]))
+    if not guild:
+        return
+    
+    channel = guild.get_channel(int(job["channel_id"]))
+    if not channel:
+        return
+    try:
+        await channel.send(f"⏰ **Scheduled Reminder:** {job['message']}")
+        print(f"Sent reminder in {channel.name}")
+    except (discord.NotFound, discord.Forbidden) as e:
+        print(f"Failed to send reminder in channel {channel.id}: {e}")
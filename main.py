@@ -6,11 +6,12 @@ Main entry point for the bot
 import discord
 import sys
 import os
+import asyncio
 from discord.ext import commands
 
 # Import configuration and data management
 from config import TOKEN, PREFIX
-from data_manager import initialize_data
+from data_manager import initialize_data, shutdown_data, restore_backup
 
 # Import event handlers
 from events import setup_events
@@ -45,9 +46,23 @@ def create_bot():
     
     return bot
 
+def restore(name):
+    """Restore the data stores from a backup and exit (python main.py --restore <backup>)"""
+    initialize_data()
+    try:
+        asyncio.run(restore_backup(name))
+    except Exception as e:
+        print(f"❌ Restore failed, no data was changed: {e}")
+    finally:
+        shutdown_data()
+
 def main():
     """Main function to run the bot"""
     
+    if len(sys.argv) == 3 and sys.argv[1] == "--restore":
+        restore(sys.argv[2])
+        return
+    
     # Check if token is available
     if not TOKEN:
         print("❌ Error: No Discord token found!")
@@ -77,6 +92,9 @@ def main():
         print("❌ Invalid Discord token! Please check your bot.env file")
     except Exception as e:
         print(f"❌ Error running bot: {e}")
+    finally:
+        # Make sure every queued data write reaches the disk
+        shutdown_data()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
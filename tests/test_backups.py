@@ -0,0 +1,137 @@
+import os
+import gzip
+
+import pytest
+
+from utils.backups import BackupRepository
+from utils.storage import StorageBackend, DictStore, ListStore
+
+
+def open_store(path, name="custom_commands"):
+    store = DictStore(name)
+    store.load(StorageBackend(str(path)))
+    return store
+
+
+def test_store_dirty_at_backup_time_is_skipped_next_time(tmp_path):
+    store = open_store(tmp_path / "data.db")
+    repository = BackupRepository(str(tmp_path / "backups"))
+    store["1"] = {"hello": {"response": "hi"}}
+
+    # Not saved yet - the backup saves it
+    _, stats = repository.write_snapshot(repository.prepare_snapshot([(store, "custom_commands.json")]))
+    assert stats["new_blobs"] == 1
+
+    [(_, _, _, export)] = repository.prepare_snapshot([(store, "custom_commands.json")])
+    # The cached (sha256, size), not a snapshot of the rows to export again
+    assert isinstance(export[0], str)
+
+
+def test_backups_in_the_same_second_get_their_own_folders(tmp_path):
+    store = open_store(tmp_path / "data.db")
+    repository = BackupRepository(str(tmp_path / "backups"))
+    store["1"] = {"a": 1}
+    first, _ = repository.create_snapshot([(store, "custom_commands.json")])
+    store["1"] = {"a": 2}
+    second, _ = repository.create_snapshot([(store, "custom_commands.json")])
+
+    assert first != second
+    assert repository.snapshot_folders() == [first, second]
+    assert dict(repository.iter_restore(first)) == {"custom_commands.json": {"1": {"a": 1}}}
+    assert dict(repository.iter_restore(second)) == {"custom_commands.json": {"1": {"a": 2}}}
+
+
+def test_unchanged_stores_share_their_blob(tmp_path):
+    store = open_store(tmp_path / "data.db")
+    other = open_store(tmp_path / "data.db", "reaction_roles")
+    repository = BackupRepository(str(tmp_path / "backups"))
+    store["1"] = {"a": 1}
+    other["1"] = {"b": 2}
+    stores = [(store, "custom_commands.json"), (other, "reaction_roles.json")]
+
+    first, stats = repository.create_snapshot(stores)
+    assert (stats["files"], stats["new_blobs"]) == (2, 2)
+    other["1"] = {"b": 3}
+    second, stats = repository.create_snapshot(stores)
+    assert (stats["files"], stats["new_blobs"]) == (2, 1)
+
+    first_files = repository.read_manifest(first)["files"]
+    second_files = repository.read_manifest(second)["files"]
+    assert first_files["custom_commands.json"] == second_files["custom_commands.json"]
+    assert len(os.listdir(repository.blob_dir)) == 3
+
+
+def test_prune_removes_old_snapshots_and_unused_blobs(tmp_path):
+    store = open_store(tmp_path / "data.db")
+    repository = BackupRepository(str(tmp_path / "backups"))
+    for value in range(3):
+        store["1"] = {"a": value}
+        repository.create_snapshot([(store, "custom_commands.json")])
+
+    repository.prune(keep=1)
+    [latest] = repository.snapshot_folders()
+    assert len(os.listdir(repository.blob_dir)) == 1
+    assert dict(repository.iter_restore(latest)) == {"custom_commands.json": {"1": {"a": 2}}}
+
+
+def test_unloaded_rows_are_backed_up(tmp_path):
+    db = tmp_path / "data.db"
+    store = open_store(db)
+    store["1"] = {"a": 1}
+    store["2"] = {"b": 2}
+    store.save()
+    # Reopened, so both rows are only in the database
+    store = open_store(db)
+    repository = BackupRepository(str(tmp_path / "backups"))
+    path, _ = repository.create_snapshot([(store, "custom_commands.json")])
+    assert dict(repository.iter_restore(path)) == {"custom_commands.json": {"1": {"a": 1}, "2": {"b": 2}}}
+
+
+def test_packed_archive_restores(tmp_path):
+    store = open_store(tmp_path / "data.db")
+    tasks = ListStore("scheduled_tasks")
+    tasks.load(store.backend)
+    repository = BackupRepository(str(tmp_path / "backups"))
+    store["1"] = {"a": 1}
+    tasks.append({"action": "reminder"})
+
+    path, _ = repository.create_snapshot([(store, "custom_commands.json"), (tasks, "scheduled_tasks.json")])
+    archive = repository.pack(path)
+    assert archive.endswith(".tar")
+    assert dict(repository.iter_restore(archive)) == {
+        "custom_commands.json": {"1": {"a": 1}},
+        "scheduled_tasks.json": [{"action": "reminder"}]
+    }
+
+
+def test_damaged_blob_is_rejected_before_anything_is_restored(tmp_path):
+    store = open_store(tmp_path / "data.db")
+    other = open_store(tmp_path / "data.db", "reaction_roles")
+    repository = BackupRepository(str(tmp_path / "backups"))
+    store["1"] = {"a": 1}
+    other["1"] = {"b": 2}
+    path, _ = repository.create_snapshot([(store, "custom_commands.json"), (other, "reaction_roles.json")])
+
+    # Replace the second file's blob with different (validly compressed) content
+    digest = repository.read_manifest(path)["files"]["reaction_roles.json"]["sha256"]
+    with open(repository.blob_path(digest), "wb") as f:
+        f.write(gzip.compress(b'{"1": {"b": "tampered"}}'))
+
+    restored = repository.iter_restore(path)
+    with pytest.raises(ValueError, match="does not match its hash"):
+        next(restored)
+
+
+def test_load_file_skips_invalid_backups(tmp_path):
+    store = open_store(tmp_path / "data.db")
+    repository = BackupRepository(str(tmp_path / "backups"))
+    store["1"] = {"a": "old"}
+    repository.create_snapshot([(store, "custom_commands.json")])
+    store["1"] = {"a": "new"}
+    newest, _ = repository.create_snapshot([(store, "custom_commands.json")])
+
+    manifest = os.path.join(newest, "manifest.json")
+    with open(manifest, "ab") as f:
+        f.write(b"garbage")
+    assert repository.load_file("custom_commands.json") == {"1": {"a": "old"}}
+    assert repository.load_file("missing.json") is None
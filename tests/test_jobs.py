@@ -0,0 +1,123 @@
+import asyncio
+import datetime
+
+from utils.jobs import JobScheduler, make_job_id
+
+
+class JobStore(dict):
+    name = "jobs"
+
+
+def make_scheduler(**options):
+    store = JobStore()
+    saves = []
+    scheduler = JobScheduler(store, saves.append, **options)
+    return scheduler, store, saves
+
+
+def now():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def test_job_ids_name_the_action():
+    assert make_job_id("unban", 1, "2") == "unban:1:2"
+
+
+def test_scheduling_an_existing_id_replaces_the_job():
+    scheduler, store, saves = make_scheduler()
+    scheduler.schedule("unban:1:2", "unban", now(), reason="first")
+    scheduler.schedule("unban:1:2", "unban", now(), reason="second")
+    assert len(scheduler) == 1 and store["unban:1:2"]["reason"] == "second"
+    scheduler.cancel("unban:1:2")
+    scheduler.cancel("unban:1:2")
+    assert len(scheduler) == 0 and len(saves) == 3
+
+
+def test_successful_job_is_removed():
+    scheduler, store, _ = make_scheduler()
+    ran = []
+
+    async def handler(job):
+        ran.append(job["user_id"])
+
+    scheduler.register("unban", handler)
+    scheduler.schedule("unban:1:2", "unban", now(), user_id=2)
+    asyncio.run(scheduler._run_job("unban:1:2"))
+    assert ran == [2] and store == {}
+
+
+def test_failing_job_is_retried_with_backoff():
+    scheduler, store, _ = make_scheduler(max_attempts=5, retry_delay=30, max_retry_delay=100)
+
+    async def handler(job):
+        raise RuntimeError("Discord is down")
+
+    scheduler.register("unban", handler)
+    scheduler.schedule("unban:1:2", "unban", now())
+
+    delays = []
+    for attempt in range(1, 4):
+        started = now()
+        asyncio.run(scheduler._run_job("unban:1:2"))
+        job = store["unban:1:2"]
+        assert job["attempts"] == attempt
+        delay = (datetime.datetime.fromisoformat(job["time"]) - started).total_seconds()
+        delays.append(round(delay))
+        assert scheduler.timers.deadline("unban:1:2") == datetime.datetime.fromisoformat(job["time"])
+    # Doubles each time, capped at max_retry_delay
+    assert delays == [30, 60, 100]
+
+
+def test_job_is_dropped_after_max_attempts():
+    scheduler, store, _ = make_scheduler(max_attempts=3)
+    calls = []
+
+    async def handler(job):
+        calls.append(job["attempts"])
+        raise RuntimeError("still failing")
+
+    scheduler.register("unban", handler)
+    scheduler.schedule("unban:1:2", "unban", now())
+    for _ in range(3):
+        asyncio.run(scheduler._run_job("unban:1:2"))
+    assert calls == [0, 1, 2]
+    assert store == {}
+
+
+def test_job_without_a_handler_is_kept():
+    scheduler, store, _ = make_scheduler()
+    scheduler.schedule("reminder:1", "reminder", now())
+    asyncio.run(scheduler._run_job("reminder:1"))
+    assert "reminder:1" in store
+
+
+def test_handler_can_reschedule_its_own_job():
+    scheduler, store, _ = make_scheduler()
+    later = now() + datetime.timedelta(hours=1)
+
+    async def handler(job):
+        scheduler.schedule("reminder:1", "reminder", later)
+
+    scheduler.register("reminder", handler)
+    scheduler.schedule("reminder:1", "reminder", now())
+    asyncio.run(scheduler._run_job("reminder:1"))
+    assert scheduler.due_time("reminder:1") == later
+
+
+def test_start_drops_invalid_jobs_and_runs_overdue_ones():
+    async def scenario():
+        scheduler, store, _ = make_scheduler()
+        ran = []
+
+        async def handler(job):
+            ran.append(job["user_id"])
+
+        scheduler.register("unban", handler)
+        store["unban:1:2"] = {"action": "unban", "time": (now() - datetime.timedelta(days=1)).isoformat(), "user_id": 2}
+        store["broken"] = {"action": "unban", "time": "not a time"}
+        scheduler.start()
+        await asyncio.sleep(0.05)
+        scheduler.stop()
+        return ran, store
+
+    assert asyncio.run(scenario()) == ([2], {})
@@ -0,0 +1,52 @@
+import re
+
+import pytest
+
+from utils.matching import Matcher
+
+
+def test_words_match_case_insensitively():
+    matcher = Matcher.for_words(["bad", "badge", "bar"])
+    assert matcher.matches("That is BAD")
+    assert matcher.search("a Badge here").group(0) == "badge"
+    assert not matcher.matches("nothing to see")
+
+
+def test_longest_word_wins_at_a_position():
+    matcher = Matcher.for_words(["bad", "badge"])
+    assert matcher.find_all("badge bad") == ["badge", "bad"]
+
+
+def test_whole_words_ignore_parts_of_longer_words():
+    matcher = Matcher.for_words(["ass"], whole_words=True)
+    assert not matcher.matches("class")
+    assert matcher.matches("you ass!")
+    assert Matcher.for_words(["ass"]).matches("class")
+
+
+def test_words_are_escaped():
+    matcher = Matcher.for_words(["a.b", "c+"])
+    assert matcher.matches("x a.b y")
+    assert not matcher.matches("axb")
+    assert matcher.matches("c+")
+
+
+def test_empty_word_list_matches_nothing():
+    matcher = Matcher.for_words([])
+    assert not matcher.matches("anything")
+    assert not Matcher.for_patterns([]).matches("anything")
+
+
+def test_patterns_are_combined():
+    matcher = Matcher.for_patterns([r"\d{3}", r"foo+"])
+    assert matcher.find_all("a 123 fooo b") == ["123", "fooo"]
+
+
+def test_patterns_keep_their_case_unless_flagged():
+    assert not Matcher.for_patterns(["Foo"]).matches("foo")
+    assert Matcher.for_patterns(["Foo"], re.IGNORECASE).matches("foo")
+
+
+def test_invalid_pattern_raises():
+    with pytest.raises(re.error):
+        Matcher.for_patterns(["ok", "(unclosed"])
@@ -0,0 +1,81 @@
+import asyncio
+
+from utils.mirror import MirrorBuffer, _chunks
+
+
+class FakeChannel:
+    def __init__(self, channel_id=1, fail_on=()):
+        self.id = channel_id
+        self.name = f"channel-{channel_id}"
+        self.sent = []
+        # Indexes of the send calls that raise
+        self.fail_on = set(fail_on)
+        self.calls = 0
+
+    async def send(self, content):
+        index = self.calls
+        self.calls += 1
+        if index in self.fail_on:
+            raise RuntimeError("send failed")
+        self.sent.append(content)
+
+
+def test_chunks_join_lines_under_the_limit():
+    assert list(_chunks(["a", "b", "c"], 2000)) == [("a\nb\nc", 3)]
+
+
+def test_chunks_split_at_the_limit():
+    lines = ["x" * 6, "y" * 6, "z" * 6]
+    assert list(_chunks(lines, 13)) == [("xxxxxx\nyyyyyy", 2), ("zzzzzz", 1)]
+
+
+def test_long_lines_are_cut():
+    [(chunk, count)] = _chunks(["x" * 20], 10)
+    assert chunk == "xxxxxxx..." and count == 1
+
+
+def test_lines_in_a_window_are_sent_together():
+    async def scenario():
+        channel = FakeChannel()
+        buffer = MirrorBuffer(window=0.01)
+        for line in ("one", "two", "three"):
+            buffer.add(channel, line)
+        await asyncio.sleep(0.05)
+        return channel, buffer
+
+    channel, buffer = asyncio.run(scenario())
+    assert channel.sent == ["one\ntwo\nthree"]
+    assert not buffer._pending and not buffer._tasks
+
+
+def test_channels_are_batched_separately():
+    async def scenario():
+        first, second = FakeChannel(1), FakeChannel(2)
+        buffer = MirrorBuffer(window=0.01)
+        buffer.add(first, "a")
+        buffer.add(second, "b")
+        buffer.add(first, "c")
+        await asyncio.sleep(0.05)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first.sent == ["a\nc"]
+    assert second.sent == ["b"]
+
+
+def test_failed_chunk_does_not_drop_the_rest(capsys):
+    async def scenario():
+        channel = FakeChannel(fail_on={0})
+        buffer = MirrorBuffer(window=60, limit=13)
+        for line in ("x" * 6, "y" * 6, "z" * 6):
+            buffer._pending.setdefault(channel.id, (channel, []))[1].append(line)
+        await buffer.flush(channel.id)
+        return channel
+
+    channel = asyncio.run(scenario())
+    assert channel.sent == ["zzzzzz"]
+    assert "Failed to mirror 2 of 3 message(s)" in capsys.readouterr().out
+
+
+def test_flush_without_pending_lines_does_nothing():
+    asyncio.run(MirrorBuffer().flush(1))
@@ -0,0 +1,90 @@
+import asyncio
+
+from utils.pipeline import MessagePipeline, STOP
+
+
+def run(pipeline, ctx):
+    asyncio.run(pipeline.run(ctx))
+
+
+def recording_stage(calls, name, result=None):
+    async def handler(ctx):
+        calls.append(name)
+        return result
+    return handler
+
+
+def test_stages_run_in_order():
+    calls = []
+    pipeline = MessagePipeline()
+    pipeline.register("first", recording_stage(calls, "first"))
+    pipeline.register("second", recording_stage(calls, "second"))
+    run(pipeline, {})
+    assert calls == ["first", "second"]
+
+
+def test_stop_skips_the_remaining_stages():
+    calls = []
+    pipeline = MessagePipeline()
+    pipeline.register("first", recording_stage(calls, "first", STOP))
+    pipeline.register("second", recording_stage(calls, "second"))
+    run(pipeline, {})
+    assert calls == ["first"]
+    stats = dict(pipeline.stats())
+    assert stats["first"].runs == 1
+    assert stats["second"].runs == 0 and stats["second"].skipped == 0
+
+
+def test_precondition_skips_the_handler():
+    calls = []
+    pipeline = MessagePipeline()
+    pipeline.register("quarantined", recording_stage(calls, "quarantined"), when=lambda ctx: ctx["quarantined"])
+    pipeline.register("always", recording_stage(calls, "always"))
+    run(pipeline, {"quarantined": False})
+    run(pipeline, {"quarantined": True})
+    assert calls == ["always", "quarantined", "always"]
+    stats = dict(pipeline.stats())
+    assert (stats["quarantined"].runs, stats["quarantined"].skipped) == (1, 1)
+
+
+def test_skipped_stage_cannot_stop_the_pipeline():
+    calls = []
+    pipeline = MessagePipeline()
+    pipeline.register("filter", recording_stage(calls, "filter", STOP), when=lambda ctx: False)
+    pipeline.register("commands", recording_stage(calls, "commands"))
+    run(pipeline, {})
+    assert calls == ["commands"]
+
+
+def test_failing_stage_does_not_stop_the_others():
+    calls = []
+
+    async def broken(ctx):
+        raise RuntimeError("boom")
+
+    pipeline = MessagePipeline()
+    pipeline.register("broken", broken)
+    pipeline.register("after", recording_stage(calls, "after"))
+    run(pipeline, {})
+    assert calls == ["after"]
+    assert dict(pipeline.stats())["broken"].errors == 1
+
+
+def test_decorator_registers_and_returns_the_handler():
+    pipeline = MessagePipeline()
+
+    @pipeline.stage("decorated", when=lambda ctx: True)
+    async def handler(ctx):
+        return None
+
+    assert [name for name, _ in pipeline.stats()] == ["decorated"]
+    assert handler.__name__ == "handler"
+
+
+def test_reset_stats():
+    pipeline = MessagePipeline()
+    pipeline.register("stage", recording_stage([], "stage"))
+    run(pipeline, {})
+    pipeline.reset_stats()
+    stats = dict(pipeline.stats())["stage"]
+    assert stats.runs == 0 and stats.average_time == 0.0
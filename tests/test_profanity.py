@@ -0,0 +1,56 @@
+from utils.profanity import ProfanityFilter, normalize
+
+
+def test_normalize_folds_case_zero_width_and_leetspeak():
+    assert normalize("B4DW0RD") == "badword"
+    assert normalize("bad\u200bword") == "badword"
+    assert normalize("\uff22\uff21\uff24") == "bad"  # fullwidth letters
+    assert normalize("$h!t") == "shit"
+
+
+def test_default_list_is_used_without_a_guild_list():
+    words = ProfanityFilter({}, ["badword"])
+    assert words.words(1) is None
+    assert words.find(1, "what a B4DW0RD") == "badword"
+    assert words.find(1, "all clean") is None
+
+
+def test_guild_list_replaces_the_default():
+    store = {"1": ["meanie"]}
+    words = ProfanityFilter(store, ["badword"])
+    assert words.find(1, "you meanie") == "meanie"
+    assert words.find(1, "badword") is None
+    assert words.find(2, "badword") == "badword"
+
+
+def test_empty_guild_list_matches_nothing():
+    words = ProfanityFilter({"1": []}, ["badword"])
+    assert words.find(1, "badword") is None
+
+
+def test_leetspeak_in_the_word_list_is_normalized_too():
+    words = ProfanityFilter({"1": ["b4d"]}, [])
+    assert words.find(1, "BAD") == "bad"
+
+
+def test_matcher_is_cached_until_invalidated():
+    store = {"1": ["first"]}
+    words = ProfanityFilter(store, [])
+    matcher = words.matcher(1)
+    assert words.matcher("1") is matcher
+
+    store["1"] = ["second"]
+    assert words.find(1, "second") is None
+    words.invalidate(1)
+    assert words.find(1, "second") == "second"
+    assert words.find(1, "first") is None
+
+
+def test_invalidate_all_guilds():
+    store = {"1": ["one"], "2": ["two"]}
+    words = ProfanityFilter(store, [])
+    words.matcher(1), words.matcher(2)
+    store["1"], store["2"] = ["uno"], ["dos"]
+    words.invalidate()
+    assert words.find(1, "uno") == "uno"
+    assert words.find(2, "dos") == "dos"
@@ -0,0 +1,90 @@
+import datetime
+
+from utils.records import QuarantineRecord, QuarantineCodec, QuarantineIndex, SERVER_SETTINGS_KEY
+
+STORED = {
+    "reason": "spam",
+    "moderator": "42",
+    "roles": ["7", "8"],
+    "timestamp": "2026-01-01 12:00:00+00:00",
+    "channel_id": "100",
+    "public_view": True,
+    "jail_cam_channel_id": None,
+    "end_time": "2026-01-01T13:00:00Z",
+    "original_duration_minutes": 60,
+    "quarantine_role_id": "9",
+    "custom_field": "kept"
+}
+
+
+def test_record_is_parsed_from_its_stored_dict():
+    record = QuarantineRecord.from_dict("5", STORED)
+    assert record.user_id == 5 and record.moderator_id == 42
+    assert record.roles == [7, 8] and record.role_id == 9
+    assert record.end_time == datetime.datetime(2026, 1, 1, 13, tzinfo=datetime.timezone.utc)
+    assert record.is_timed
+    assert record.is_expired(record.end_time) and not record.is_expired(record.timestamp)
+
+
+def test_record_round_trips_with_unknown_fields():
+    data = QuarantineRecord.from_dict("5", STORED).to_dict()
+    assert data["custom_field"] == "kept"
+    assert data["moderator"] == "42" and data["quarantine_role_id"] == "9"
+    assert QuarantineRecord.from_dict("5", data).to_dict() == data
+
+
+def test_invalid_end_time_makes_the_quarantine_indefinite():
+    record = QuarantineRecord.from_dict("5", dict(STORED, end_time="not a time"))
+    assert record.end_time is None
+    assert record.to_dict()["end_time"] == "not a time"
+
+
+def test_codec_keeps_server_settings_as_a_dict():
+    row = {"5": STORED, SERVER_SETTINGS_KEY: {"jail_cam_channel_id": "200"}}
+    decoded = QuarantineCodec.decode(row)
+    assert isinstance(decoded["5"], QuarantineRecord)
+    assert decoded[SERVER_SETTINGS_KEY] == {"jail_cam_channel_id": "200"}
+    assert QuarantineCodec.decode(QuarantineCodec.encode(decoded))["5"].to_dict() == decoded["5"].to_dict()
+
+
+def make_record(user_id, channel_id=100, public_view=True):
+    return QuarantineRecord(user_id=user_id, reason="test", moderator_id=1, roles=[],
+                            timestamp=None, channel_id=channel_id, public_view=public_view)
+
+
+def test_guild_index_is_built_from_the_store():
+    store = {"10": {
+        "5": make_record(5),
+        "6": make_record(6, channel_id=101, public_view=False),
+        SERVER_SETTINGS_KEY: {"jail_cam_channel_id": "200"}
+    }}
+    index = QuarantineIndex(store).guild(10)
+    assert 5 in index and 6 in index and len(index) == 2
+    assert index.jail_cam_channel_id == 200
+    # Only public records forward to their channel
+    assert index.public_channel_ids == (100,)
+
+
+def test_guild_index_tracks_added_and_removed_records():
+    index = QuarantineIndex({}).guild("10")
+    index.add(make_record(5))
+    index.add(make_record(6))
+    assert index.public_channel_ids == (100,)
+    index.add(make_record(7, channel_id=101))
+    index.remove(5)
+    index.remove(5)
+    assert set(index.user_ids) == {6, 7}
+    assert index.public_channel_ids == (100, 101)
+
+
+def test_index_is_cached_until_invalidated():
+    store = {"10": {"5": make_record(5)}}
+    quarantine = QuarantineIndex(store)
+    index = quarantine.guild(10)
+    assert quarantine.guild("10") is index
+
+    store["10"] = {}
+    assert 5 in quarantine.guild(10)
+    quarantine.invalidate(10)
+    assert 5 not in quarantine.guild(10)
+    assert 5 not in QuarantineIndex({}).guild(11)
@@ -0,0 +1,90 @@
+import asyncio
+import datetime
+
+from utils.scheduler import DeadlineScheduler
+
+
+def now():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def in_seconds(seconds):
+    return now() + datetime.timedelta(seconds=seconds)
+
+
+def test_timers_fire_in_deadline_order():
+    async def scenario():
+        fired = []
+
+        async def callback(key):
+            fired.append(key)
+
+        scheduler = DeadlineScheduler(callback)
+        scheduler.start()
+        scheduler.schedule("late", in_seconds(0.06))
+        scheduler.schedule("early", in_seconds(0.02))
+        scheduler.schedule("overdue", in_seconds(-10))
+        await asyncio.sleep(0.15)
+        scheduler.stop()
+        return fired, len(scheduler)
+
+    assert asyncio.run(scenario()) == (["overdue", "early", "late"], 0)
+
+
+def test_rescheduling_replaces_the_deadline():
+    async def scenario():
+        fired = []
+
+        async def callback(key):
+            fired.append(key)
+
+        scheduler = DeadlineScheduler(callback)
+        scheduler.start()
+        scheduler.schedule("job", in_seconds(60))
+        # An earlier deadline wakes the sleeping runner
+        scheduler.schedule("job", in_seconds(0.02))
+        scheduler.schedule("cancelled", in_seconds(0.02))
+        scheduler.cancel("cancelled")
+        await asyncio.sleep(0.1)
+        scheduler.stop()
+        return fired
+
+    assert asyncio.run(scenario()) == ["job"]
+
+
+def test_deadlines_and_stale_entries():
+    scheduler = DeadlineScheduler(None)
+    first = in_seconds(10)
+    scheduler.schedule("a", first)
+    scheduler.schedule("a", in_seconds(20))
+    scheduler.schedule("b", in_seconds(5))
+    assert "a" in scheduler and len(scheduler) == 2
+    assert scheduler.deadline("a") > first
+    scheduler.cancel("b")
+    assert scheduler.next_deadline() == scheduler.deadline("a")
+    assert scheduler.deadline("b") is None
+
+    # Stale heap entries don't pile up
+    for _ in range(100):
+        scheduler.schedule("a", in_seconds(30))
+    assert len(scheduler._heap) <= 2 * len(scheduler) + 16
+
+
+def test_failing_callback_does_not_stop_the_scheduler():
+    async def scenario():
+        fired = []
+
+        async def callback(key):
+            if key == "broken":
+                raise RuntimeError("boom")
+            fired.append(key)
+
+        scheduler = DeadlineScheduler(callback)
+        scheduler.start()
+        scheduler.schedule("broken", in_seconds(0))
+        scheduler.schedule("fine", in_seconds(0.02))
+        await asyncio.sleep(0.08)
+        scheduler.stop()
+        return fired
+
+    assert asyncio.run(scenario()) == ["fine"]
@@ -0,0 +1,60 @@
+import pytest
+
+from utils import serialization
+from utils.serialization import Serializer, JSON_SERIALIZER
+from utils.storage import StorageBackend, DictStore
+
+VALUE = {"1": {"user": [1, 2, 3], "name": "orion"}}
+
+
+def test_plain_json_rows_are_text():
+    raw = JSON_SERIALIZER.dumps(VALUE)
+    assert isinstance(raw, str)
+    assert Serializer.loads(raw) == VALUE
+
+
+def test_compressed_rows_are_tagged():
+    raw = Serializer.from_spec("json+zlib").dumps(VALUE)
+    assert raw[:2] == b"JZ"
+    assert Serializer.loads(raw) == VALUE
+
+
+@pytest.mark.parametrize("spec", ["orjson", "orjson+zlib", "msgpack", "msgpack+zlib"])
+def test_optional_formats_round_trip(spec):
+    pytest.importorskip(spec.partition("+")[0])
+    serializer = Serializer.from_spec(spec)
+    assert serializer.format == spec.partition("+")[0]
+    assert Serializer.loads(serializer.dumps(VALUE)) == VALUE
+
+
+def test_missing_package_falls_back_to_json(monkeypatch):
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert Serializer("orjson").format == "json"
+
+
+def test_invalid_specs_and_rows():
+    with pytest.raises(ValueError):
+        Serializer.from_spec("yaml")
+    with pytest.raises(ValueError):
+        Serializer.from_spec("json+lzma")
+    with pytest.raises(ValueError):
+        Serializer.loads(b"XX{}")
+    with pytest.raises(ValueError):
+        Serializer.loads(b"JZnot zlib")
+
+
+def test_store_reads_rows_written_in_another_format(tmp_path):
+    db = tmp_path / "data.db"
+    store = DictStore("custom_commands")
+    store.load(StorageBackend(str(db)))
+    store["1"] = {"a": 1}
+    store.save()
+
+    store = DictStore("custom_commands", serializer=Serializer.from_spec("json+zlib"))
+    store.load(StorageBackend(str(db)))
+    store["2"] = {"b": 2}
+    store.save()
+
+    rows, _ = StorageBackend(str(db)).read_rows("custom_commands")
+    assert isinstance(rows["1"], str) and rows["2"][:2] == b"JZ"
+    assert store["1"] == {"a": 1}
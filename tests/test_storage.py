@@ -0,0 +1,395 @@
+import json
+import asyncio
+import threading
+
+import pytest
+
+from utils.storage import atomic_write, read_checked, StorageBackend, StoreWriter, WriteBehindScheduler, DictStore, ListStore, JournaledStore
+
+
+def open_store(path, name="custom_commands", legacy_file=None, store_class=DictStore):
+    store = store_class(name, legacy_file)
+    store.load(StorageBackend(str(path)))
+    return store
+
+
+def stored_rows(path, name):
+    rows, corrupt = StorageBackend(str(path)).read_rows(name)
+    assert corrupt == []
+    return {key: json.loads(value) for key, value in rows.items()}
+
+
+def open_journaled(path, name="warnings"):
+    store = JournaledStore(name, compact_threshold=1000)
+    store.load(StorageBackend(str(path)))
+    return store
+
+
+def test_legacy_json_file_is_imported_once(tmp_path):
+    legacy = tmp_path / "custom_commands.json"
+    legacy.write_text(json.dumps({"1": {"hi": {"response": "hello"}}, "2": {}}))
+    db = tmp_path / "data.db"
+
+    store = open_store(db, legacy_file=str(legacy))
+    assert dict(store) == {"1": {"hi": {"response": "hello"}}, "2": {}}
+    assert stored_rows(db, "custom_commands") == {"1": {"hi": {"response": "hello"}}, "2": {}}
+
+    # Later changes to the file are ignored - the database is the source of truth now
+    legacy.write_text(json.dumps({"3": {}}))
+    del store["2"]
+    store.save()
+    assert dict(open_store(db, legacy_file=str(legacy))) == {"1": {"hi": {"response": "hello"}}}
+
+
+def test_save_writes_only_changed_keys(tmp_path):
+    db = tmp_path / "data.db"
+    store = open_store(db)
+    store["1"] = {"a": 1}
+    store["2"] = {"b": 2}
+    store.save()
+
+    written = []
+    write_rows = store.backend.write_rows
+
+    def recording_write_rows(name, upserts, deletes, *args):
+        written.append((list(upserts), list(deletes)))
+        return write_rows(name, upserts, deletes, *args)
+
+    store.backend.write_rows = recording_write_rows
+
+    store["1"]["a"] = 10
+    store.save()
+    del store["2"]
+    store.save()
+    assert store.save() is None
+    assert written == [(["1"], []), ([], ["2"])]
+    assert stored_rows(db, "custom_commands") == {"1": {"a": 10}}
+
+
+def test_list_store_keeps_its_order(tmp_path):
+    db = tmp_path / "data.db"
+    store = open_store(db, "scheduled_tasks", store_class=ListStore)
+    store.extend(["a", "b", "c"])
+    store.save()
+    del store[0]
+    store.save()
+    assert list(open_store(db, "scheduled_tasks", store_class=ListStore)) == ["b", "c"]
+
+
+def test_writer_thread_writes_in_order(tmp_path):
+    db = tmp_path / "data.db"
+    writer = StoreWriter()
+    store = DictStore("custom_commands")
+    store.load(StorageBackend(str(db)), writer)
+    for value in range(20):
+        store["1"] = value
+        store.save()
+    writer.flush().result()
+    writer.stop()
+    assert stored_rows(db, "custom_commands") == {"1": 19}
+
+
+def test_replace_drops_queued_journal_ops(tmp_path):
+    db = tmp_path / "data.db"
+    store = open_journaled(db)
+    store["1"] = {"u": []}
+    store.save()
+    store.append_entry("1", "u", {"r": "journal"})
+
+    # After a restart the row is unloaded and its journal line is queued for it
+    store = open_journaled(db)
+    store.replace({"1": {"u": [{"r": "fresh"}]}})
+    store.save()
+    store.evict("1")
+    assert store["1"] == {"u": [{"r": "fresh"}]}
+
+    # Nor is the journal line replayed after another restart
+    assert open_journaled(db)["1"] == {"u": [{"r": "fresh"}]}
+
+
+def test_replace_drops_journal_lines_of_loaded_rows(tmp_path):
+    db = tmp_path / "data.db"
+    store = open_journaled(db)
+    store["1"] = {"u": []}
+    store.save()
+    store.append_entry("1", "u", {"r": "journal"})
+    store.append_entry("2", "u", {"r": "journal only"})
+
+    # Back to the stored snapshot row, and without the row that only existed in the journal
+    store.replace({"1": {"u": []}})
+    store.save()
+
+    store = open_journaled(db)
+    assert dict(store) == {"1": {"u": []}}
+
+
+def test_compact_repairs_a_corrupt_unloaded_row(tmp_path):
+    db = tmp_path / "data.db"
+    store = open_journaled(db)
+    store["1"] = {"u": []}
+    store["2"] = {"u": []}
+    store.save()
+    store.append_entry("1", "u", {"r": "one"})
+    store.append_entry("2", "u", {"r": "two"})
+
+    backend = StorageBackend(str(db))
+    with backend.lock:
+        backend.conn.execute('UPDATE "store_warnings" SET value = ? WHERE key = ?', ('{"u": "corrupt"}', "1"))
+
+    store = JournaledStore("warnings", compact_threshold=1000)
+    store.load(StorageBackend(str(db)), fallback=lambda: {"1": {"u": [{"r": "backup"}]}})
+    store.compact()
+    assert store["1"] == {"u": [{"r": "backup"}]}
+    assert store["2"] == {"u": [{"r": "two"}]}
+
+
+def test_reloading_a_row_does_not_wait_for_its_write(tmp_path):
+    writer = StoreWriter()
+    store = DictStore("custom_commands")
+    store.load(StorageBackend(str(tmp_path / "data.db")), writer)
+    store["1"] = {"a": 1}
+    store.save().result()
+
+    # Hold the writer thread so the evicted row's write stays pending
+    release = threading.Event()
+    writer.submit(release.wait)
+    store["1"] = {"a": 2}
+    store.evict("1")
+    try:
+        assert store["1"] == {"a": 2}
+    finally:
+        release.set()
+        writer.stop()
+
+
+class CountingStore:
+    name = "counting"
+
+    def __init__(self):
+        self.saves = 0
+
+    def save(self):
+        self.saves += 1
+
+
+def test_write_behind_coalesces_saves():
+    async def scenario():
+        scheduler = WriteBehindScheduler(0.05)
+        store = CountingStore()
+        scheduler.mark_dirty(store)
+        await asyncio.sleep(0.01)
+        # The first save after a quiet period goes out on the next loop iteration
+        first = store.saves
+        for _ in range(10):
+            scheduler.mark_dirty(store)
+        await asyncio.sleep(0.01)
+        before_interval = store.saves
+        await asyncio.sleep(0.1)
+        return first, before_interval, store.saves
+
+    assert asyncio.run(scenario()) == (1, 1, 2)
+
+
+def test_write_behind_flush_writes_pending_stores():
+    async def scenario():
+        scheduler = WriteBehindScheduler(60)
+        store = CountingStore()
+        scheduler.mark_dirty(store)
+        await asyncio.sleep(0.01)
+        # Within the interval - waits for it, unless flushed
+        scheduler.mark_dirty(store)
+        scheduler.flush()
+        return store.saves, scheduler.pending
+
+    assert asyncio.run(scenario()) == (2, {})
+
+
+def test_write_behind_without_a_loop_writes_straight_away():
+    store = CountingStore()
+    WriteBehindScheduler(60).mark_dirty(store)
+    assert store.saves == 1
+
+
+def corrupt_row(path, name, key):
+    backend = StorageBackend(str(path))
+    with backend.lock:
+        backend.conn.execute(f'UPDATE "store_{name}" SET value = ? WHERE key = ?', ('{"corrupt": true}', key))
+    backend.close()
+
+
+def test_atomic_write_round_trip_and_corruption(tmp_path):
+    path = tmp_path / "file.json"
+    atomic_write(str(path), '{"a": 1}')
+    assert read_checked(str(path)) == '{"a": 1}'
+
+    path.write_bytes(path.read_bytes().replace(b"1", b"2", 1))
+    with pytest.raises(ValueError, match="checksum"):
+        read_checked(str(path))
+
+
+def test_corrupt_row_is_repaired_from_backup(tmp_path):
+    db = tmp_path / "data.db"
+    store = open_store(db)
+    store["1"] = {"a": 1}
+    store["2"] = {"b": 2}
+    store.save()
+    corrupt_row(db, "custom_commands", "1")
+
+    store = DictStore("custom_commands")
+    store.load(StorageBackend(str(db)), fallback=lambda: {"1": {"a": "backup"}})
+    assert store["1"] == {"a": "backup"}
+    assert store["2"] == {"b": 2}
+    # The repaired row is written back
+    assert stored_rows(db, "custom_commands") == {"1": {"a": "backup"}, "2": {"b": 2}}
+
+
+def test_corrupt_row_without_a_backup_is_dropped(tmp_path):
+    db = tmp_path / "data.db"
+    store = open_store(db)
+    store["1"] = {"a": 1}
+    store.save()
+    corrupt_row(db, "custom_commands", "1")
+
+    store = DictStore("custom_commands")
+    store.load(StorageBackend(str(db)), fallback=lambda: None)
+    with pytest.raises(KeyError):
+        store["1"]
+    assert stored_rows(db, "custom_commands") == {}
+
+
+def test_corrupt_database_is_rebuilt_from_backup(tmp_path):
+    db = tmp_path / "data.db"
+    store = open_store(db)
+    store["1"] = {"a": 1}
+    store.save()
+    store.backend.close()
+    db.write_bytes(b"not a database" * 100)
+
+    backend = StorageBackend(str(db))
+    assert backend.recovered
+    store = DictStore("custom_commands")
+    store.load(backend, fallback=lambda: {"1": {"a": "backup"}})
+    assert dict(store) == {"1": {"a": "backup"}}
+    assert list(tmp_path.glob("data.db.corrupt-*"))
+
+
+def journal_lines(path, name):
+    lines, corrupt = StorageBackend(str(path)).read_journal(name)
+    assert corrupt == 0
+    return lines
+
+
+def test_journal_is_replayed_after_a_restart(tmp_path):
+    db = tmp_path / "data.db"
+    store = open_journaled(db)
+    store.append_entry("1", "u", {"r": "first"})
+    store.append_entry("1", "u", {"r": "second"})
+    store.append_entry("2", "v", {"r": "other guild"})
+    store.set_entries("1", "w", [])
+
+    # Only journal lines were written, no snapshot rows
+    assert len(journal_lines(db, "warnings")) == 4
+    assert stored_rows(db, "warnings") == {}
+
+    store = open_journaled(db)
+    assert dict(store) == {
+        "1": {"u": [{"r": "first"}, {"r": "second"}], "w": []},
+        "2": {"v": [{"r": "other guild"}]}
+    }
+
+
+def test_journal_is_replayed_onto_unloaded_rows(tmp_path):
+    db = tmp_path / "data.db"
+    store = open_journaled(db)
+    store["1"] = {"u": [{"r": "snapshot"}]}
+    store.save()
+    store.append_entry("1", "u", {"r": "journal"})
+
+    store = open_journaled(db)
+    assert store["1"] == {"u": [{"r": "snapshot"}, {"r": "journal"}]}
+
+
+def test_journal_is_compacted_at_the_threshold(tmp_path):
+    db = tmp_path / "data.db"
+    store = JournaledStore("warnings", compact_threshold=3)
+    store.load(StorageBackend(str(db)))
+    store.append_entry("1", "u", {"r": 1})
+    store.append_entry("1", "u", {"r": 2})
+    assert len(journal_lines(db, "warnings")) == 2
+
+    store.append_entry("2", "u", {"r": 3})
+    assert journal_lines(db, "warnings") == []
+    assert stored_rows(db, "warnings") == {"1": {"u": [{"r": 1}, {"r": 2}]}, "2": {"u": [{"r": 3}]}}
+
+    # Nothing is applied twice after a restart
+    assert dict(open_journaled(db)) == {"1": {"u": [{"r": 1}, {"r": 2}]}, "2": {"u": [{"r": 3}]}}
+
+
+def test_evicting_a_journaled_row_folds_its_journal(tmp_path):
+    db = tmp_path / "data.db"
+    store = open_journaled(db)
+    store["1"] = {"u": []}
+    store.save()
+    store.append_entry("1", "u", {"r": "journal"})
+    store.evict("1")
+
+    assert journal_lines(db, "warnings") == []
+    assert store["1"] == {"u": [{"r": "journal"}]}
+
+
+def test_rows_are_read_on_first_access(tmp_path):
+    db = tmp_path / "data.db"
+    store = open_store(db)
+    store["1"] = {"a": 1}
+    store["2"] = {"b": 2}
+    store.save()
+
+    store = open_store(db)
+    assert len(store) == 2 and "1" in store
+    assert store._data == {}
+    assert store["1"] == {"a": 1}
+    assert list(store._data) == ["1"]
+
+
+def test_evicted_row_is_written_and_read_back(tmp_path):
+    db = tmp_path / "data.db"
+    store = open_store(db)
+    store["1"] = {"a": 1}
+    store.save()
+    store["1"]["a"] = 2
+    store.evict("1")
+
+    assert "1" not in store._data and "1" in store
+    assert stored_rows(db, "custom_commands") == {"1": {"a": 2}}
+    assert store["1"] == {"a": 2}
+    # An unloaded row is unchanged, so saving doesn't delete it
+    store.evict("1")
+    store.save()
+    assert stored_rows(db, "custom_commands") == {"1": {"a": 2}}
+
+
+def test_prefetch_loads_rows_in_the_background(tmp_path):
+    db = tmp_path / "data.db"
+    store = open_store(db)
+    store["1"] = {"a": 1}
+    store["2"] = {"b": 2}
+    store.save()
+
+    store = open_store(db)
+    asyncio.run(store.prefetch(["1", "missing"]))
+    assert list(store._data) == ["1"]
+    assert store._unloaded == {"2"}
+
+
+def test_bound_loader_runs_on_first_access(tmp_path):
+    db = tmp_path / "data.db"
+    store = open_store(db)
+    store["1"] = {"a": 1}
+    store.save()
+
+    calls = []
+    store = DictStore("custom_commands")
+    store.bind_loader(lambda: calls.append(store.load(StorageBackend(str(db)))))
+    assert calls == []
+    assert store["1"] == {"a": 1}
+    assert "1" in store and calls == [None]
@@ -0,0 +1,329 @@
+"""
+Backups for Orion Discord Bot
+Content-addressed backup snapshots: every exported data file is stored once
+as a blob named by its SHA-256 hash, and each snapshot is a small manifest
+pointing at the blobs it needs. Unchanged stores cost neither an export nor
+a write, so backup time and disk usage scale with churn.
+
+Blobs are gzip-compressed and streamed to disk while they are encoded, and a
+snapshot can be packed into a single archive for off-site copies. Restores
+stream blobs back out and verify every one against its hash.
+
+A snapshot is taken in two steps: prepare_snapshot() captures the serialized
+rows of the changed stores on the event loop thread (the only place they may
+be read), and write_snapshot() does all exporting, encoding, hashing,
+compression and disk I/O, so it can run in a worker thread.
+"""
+
+import os
+import io
+import gzip
+import json
+import shutil
+import hashlib
+import tarfile
+import datetime
+import tempfile
+
+from utils.storage import atomic_write, read_checked, verify_checked, fsync_directory
+
+MANIFEST_FILE = "manifest.json"
+BLOB_DIR_NAME = "blobs"
+BLOB_SUFFIX = ".json.gz"
+# Blobs written before compression was added
+PLAIN_BLOB_SUFFIX = ".json"
+CHUNK_SIZE = 64 * 1024
+
+
+def _gunzip_chunks(fileobj):
+    with gzip.GzipFile(fileobj=fileobj, mode='rb') as gz:
+        while True:
+            chunk = gz.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def verify_gzip(fileobj, digest):
+    """Check a blob stream against digest without keeping its contents in memory"""
+    hasher = hashlib.sha256()
+    for chunk in _gunzip_chunks(fileobj):
+        hasher.update(chunk)
+    if hasher.hexdigest() != digest:
+        raise ValueError(f"blob {digest} does not match its hash")
+
+
+def read_gzip_verified(fileobj, digest):
+    """Decompress a blob stream in chunks and return its text if it matches digest"""
+    hasher = hashlib.sha256()
+    chunks = []
+    for chunk in _gunzip_chunks(fileobj):
+        hasher.update(chunk)
+        chunks.append(chunk)
+    if hasher.hexdigest() != digest:
+        raise ValueError(f"blob {digest} does not match its hash")
+    return b"".join(chunks).decode('utf-8')
+
+
+class BackupRepository:
+    """Snapshot folders (backup_<timestamp>) plus a shared blob directory"""
+
+    def __init__(self, root):
+        self.root = root
+        self.blob_dir = os.path.join(root, BLOB_DIR_NAME)
+        # store name -> (store version, sha256, size) of its last backed-up export
+        self._exported = {}
+
+    def snapshot_folders(self):
+        """Return snapshot folder paths, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            os.path.join(self.root, d) for d in os.listdir(self.root)
+            if d.startswith("backup_") and os.path.isdir(os.path.join(self.root, d))
+        )
+
+    def blob_path(self, digest):
+        return os.path.join(self.blob_dir, f"{digest}{BLOB_SUFFIX}")
+
+    def _prepare_export(self, store):
+        """Return the store's cached (sha256, size) if unchanged since its last backup,
+        otherwise a snapshot of its serialized rows"""
+        snapshot = store.snapshot_rows()
+        cached = self._exported.get(store.name)
+        if cached and cached[0] == store.version and os.path.exists(self.blob_path(cached[1])):
+            return cached[1:]
+        return snapshot
+
+    def _write_blob(self, data):
+        """Return (sha256, size, bytes written) for plain store contents"""
+        # The blob's name is the hash of its uncompressed JSON, which is only known once
+        # encoding finishes, so it is streamed into a temp file and renamed afterwards
+        encoder = json.JSONEncoder(indent=4, sort_keys=True)
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.blob_dir, prefix=".tmp-", suffix=BLOB_SUFFIX)
+        try:
+            with os.fdopen(fd, 'wb') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as gz:
+                    buffer = io.BufferedWriter(gz, CHUNK_SIZE)
+                    for chunk in encoder.iterencode(data):
+                        chunk = chunk.encode('utf-8')
+                        hasher.update(chunk)
+                        size += len(chunk)
+                        buffer.write(chunk)
+                    buffer.flush()
+                raw.flush()
+                os.fsync(raw.fileno())
+
+            digest = hasher.hexdigest()
+            written = 0
+            if os.path.exists(self.blob_path(digest)):
+                os.remove(tmp_path)
+            else:
+                written = os.path.getsize(tmp_path)
+                os.replace(tmp_path, self.blob_path(digest))
+                fsync_directory(self.blob_dir)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return digest, size, written
+
+    def prepare_snapshot(self, stores):
+        """Capture [(store, file name)] for write_snapshot (call from the event loop thread)"""
+        prepared = []
+        for store, file in stores:
+            try:
+                # Exporting saves the store first, which may bump its version
+                export = self._prepare_export(store)
+                prepared.append((file, store, store.version, export))
+            except Exception as e:
+                print(f"Error backing up {file}: {e}")
+        return prepared
+
+    def write_snapshot(self, prepared):
+        """Write a prepared snapshot and return (snapshot path, stats); safe to run in a worker thread"""
+        os.makedirs(self.blob_dir, exist_ok=True)
+        # Microseconds keep two backups taken in the same second apart (and still sort
+        # after older backup_<date>_<time> folders); an existing folder is never reused
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        snapshot_path = os.path.join(self.root, f"backup_{timestamp}")
+        os.makedirs(snapshot_path)
+
+        manifest = {"created_at": str(datetime.datetime.now(datetime.timezone.utc)), "files": {}}
+        stats = {"files": 0, "new_blobs": 0, "bytes_written": 0}
+        for file, store, version, export in prepared:
+            try:
+                # A changed store has a (rows, last write) snapshot, an unchanged one (sha256, size)
+                if isinstance(export[0], dict):
+                    digest, size, written = self._write_blob(store.export_rows(export))
+                    self._exported[store.name] = (version, digest, size)
+                else:
+                    (digest, size), written = export, 0
+            except Exception as e:
+                print(f"Error backing up {file}: {e}")
+                continue
+            manifest["files"][file] = {"sha256": digest, "size": size}
+            stats["files"] += 1
+            if written:
+                stats["new_blobs"] += 1
+                stats["bytes_written"] += written
+
+        manifest_text = json.dumps(manifest, indent=4)
+        atomic_write(os.path.join(snapshot_path, MANIFEST_FILE), manifest_text)
+        stats["bytes_written"] += len(manifest_text)
+        return snapshot_path, stats
+
+    def create_snapshot(self, stores):
+        """Back up [(store, file name)] in the calling thread and return (snapshot path, stats)"""
+        return self.write_snapshot(self.prepare_snapshot(stores))
+
+    def read_manifest(self, snapshot_path):
+        return json.loads(read_checked(os.path.join(snapshot_path, MANIFEST_FILE)))
+
+    def verify_blob(self, digest):
+        """Check a blob against its content address without keeping it in memory"""
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                verify_gzip(f, digest)
+        else:
+            self.read_blob(digest)
+
+    def read_blob(self, digest):
+        """Read a blob, verifying its content address"""
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                return read_gzip_verified(f, digest)
+
+        content = read_checked(os.path.join(self.blob_dir, f"{digest}{PLAIN_BLOB_SUFFIX}"))
+        if hashlib.sha256(content.encode('utf-8')).hexdigest() != digest:
+            raise ValueError(f"blob {digest} does not match its hash")
+        return content
+
+    def resolve(self, name):
+        """Return the path of a snapshot folder or archive given its name or path"""
+        for candidate in (name, os.path.join(self.root, name)):
+            if os.path.exists(candidate):
+                return candidate
+        raise FileNotFoundError(f"No backup named {name}")
+
+    def pack(self, snapshot_path, archive_path=None):
+        """Bundle a snapshot and its blobs into one archive, streamed file by file"""
+        manifest = self.read_manifest(snapshot_path)
+        archive_path = archive_path or f"{snapshot_path.rstrip(os.sep)}.tar"
+        tmp_path = f"{archive_path}.tmp"
+        # Blobs are already gzip-compressed, so the tar itself stays uncompressed
+        with tarfile.open(tmp_path, "w") as tar:
+            tar.add(os.path.join(snapshot_path, MANIFEST_FILE), arcname=MANIFEST_FILE)
+            for digest in sorted({entry["sha256"] for entry in manifest["files"].values()}):
+                path = self.blob_path(digest)
+                if not os.path.exists(path):
+                    # Pre-compression blob - compress it on the way into the archive
+                    content = self.read_blob(digest).encode('utf-8')
+                    info = tarfile.TarInfo(f"{BLOB_DIR_NAME}/{digest}{BLOB_SUFFIX}")
+                    data = gzip.compress(content, mtime=0)
+                    info.size = len(data)
+                    tar.addfile(info, io.BytesIO(data))
+                    continue
+                tar.add(path, arcname=f"{BLOB_DIR_NAME}/{digest}{BLOB_SUFFIX}")
+        with open(tmp_path, 'rb+') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, archive_path)
+        return archive_path
+
+    def iter_restore(self, path):
+        """Yield (file name, parsed contents) for every file in a snapshot folder or archive
+
+        Every blob is verified against the manifest before the first file is yielded,
+        so a damaged backup is rejected without anything having been restored from it.
+        Blobs are then decompressed one at a time as they are yielded, so only one
+        file is held in memory at once.
+        """
+        if os.path.isdir(path):
+            manifest = self.read_manifest(path)
+            for entry in manifest["files"].values():
+                self.verify_blob(entry["sha256"])
+            for file, entry in manifest["files"].items():
+                yield file, json.loads(self.read_blob(entry["sha256"]))
+            return
+
+        with tarfile.open(path, "r") as tar:
+            manifest_member = tar.extractfile(MANIFEST_FILE)
+            if manifest_member is None:
+                raise ValueError(f"{path} has no manifest")
+            manifest = json.loads(verify_checked(manifest_member.read(), f"{path}:{MANIFEST_FILE}"))
+            members = {}
+            for file, entry in manifest["files"].items():
+                member_name = f"{BLOB_DIR_NAME}/{entry['sha256']}{BLOB_SUFFIX}"
+                member = tar.extractfile(member_name)
+                if member is None:
+                    raise ValueError(f"{path} is missing the blob for {file}")
+                verify_gzip(member, entry["sha256"])
+                members[file] = member_name
+            for file, entry in manifest["files"].items():
+                content = read_gzip_verified(tar.extractfile(members[file]), entry["sha256"])
+                yield file, json.loads(content)
+
+    def load_file(self, file):
+        """Return the parsed contents of the newest valid backup copy of a data file"""
+        for snapshot_path in reversed(self.snapshot_folders()):
+            try:
+                if os.path.exists(os.path.join(snapshot_path, MANIFEST_FILE)):
+                    entry = self.read_manifest(snapshot_path)["files"].get(file)
+                    if entry is None:
+                        continue
+                    content = self.read_blob(entry["sha256"])
+                else:
+                    # Snapshot from before manifests existed - one plain copy per file
+                    content = self._read_plain_copy(os.path.join(snapshot_path, file))
+                    if content is None:
+                        continue
+                return json.loads(content)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Skipping invalid backup of {file} in {snapshot_path}: {e}")
+        return None
+
+    @staticmethod
+    def _read_plain_copy(path):
+        if not os.path.exists(path):
+            return None
+        try:
+            return read_checked(path)
+        except ValueError as e:
+            # Copies made before checksum footers existed are accepted if they parse
+            if "no checksum footer" not in str(e):
+                raise
+            with open(path, 'r') as f:
+                return f.read()
+
+    def prune(self, keep):
+        """Keep the newest snapshots and delete blobs no remaining manifest uses"""
+        folders = self.snapshot_folders()
+        for old_folder in folders[:-keep] if len(folders) > keep else []:
+            try:
+                shutil.rmtree(old_folder)
+                print(f"Removed old backup: {old_folder}")
+            except Exception as e:
+                print(f"Error removing old backup {old_folder}: {e}")
+
+        if not os.path.isdir(self.blob_dir):
+            return
+
+        referenced = set()
+        for snapshot_path in self.snapshot_folders():
+            try:
+                referenced.update(entry["sha256"] for entry in self.read_manifest(snapshot_path)["files"].values())
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError, KeyError) as e:
+                # Can't tell what an unreadable manifest references, so keep every blob
+                print(f"⚠️ Not cleaning blobs - unreadable manifest in {snapshot_path}: {e}")
+                return
+
+        for blob in os.listdir(self.blob_dir):
+            digest = blob.split(".", 1)[0]
+            if blob.endswith((BLOB_SUFFIX, PLAIN_BLOB_SUFFIX)) and digest and digest not in referenced:
+                os.remove(os.path.join(self.blob_dir, blob))
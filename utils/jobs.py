@@ -0,0 +1,126 @@
+"""
+Job scheduler for Orion Discord Bot
+Runs delayed actions (unbans, reminders, quarantine releases) at their due
+time. Jobs are kept in a data store keyed by job ID, so they survive a
+restart, and their timers live in a DeadlineScheduler, so each one fires
+when it is due instead of on the next poll.
+
+Job IDs are chosen by the caller and identify the action, e.g.
+"unban:<guild>:<user>" - scheduling an ID that already exists replaces the
+old job instead of adding a second one. A handler that raises is retried
+with exponential backoff until it succeeds or runs out of attempts.
+"""
+
+import datetime
+
+from utils.scheduler import DeadlineScheduler
+
+
+def make_job_id(action, *parts):
+    """Build a job ID from an action name and the things it acts on"""
+    return ":".join([action, *(str(part) for part in parts)])
+
+
+def _due_time(job):
+    return datetime.datetime.fromisoformat(job["time"])
+
+
+class JobScheduler:
+    """Runs the jobs of a DictStore through handlers registered per action"""
+
+    def __init__(self, store, save, max_attempts=5, retry_delay=30, max_retry_delay=3600):
+        self.store = store
+        # Called with the store after every change
+        self.save = save
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        # action -> async handler(job); a handler raises to have the job retried
+        self.handlers = {}
+        self.timers = DeadlineScheduler(self._run_job, name=store.name)
+
+    def __len__(self):
+        return len(self.store)
+
+    def register(self, action, handler):
+        self.handlers[action] = handler
+
+    def schedule(self, job_id, action, when, **payload):
+        """Run the handler of action with payload at datetime when, replacing any job with the same ID"""
+        job = {"action": action, "time": when.isoformat(), "attempts": 0}
+        job.update(payload)
+        self.store[job_id] = job
+        self.save(self.store)
+        self.timers.schedule(job_id, when)
+        return job
+
+    def cancel(self, job_id):
+        """Remove a job (no-op if it doesn't exist)"""
+        if self.store.pop(job_id, None) is not None:
+            self.save(self.store)
+        self.timers.cancel(job_id)
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def due_time(self, job_id):
+        """Return when a job will run as a datetime, or None"""
+        job = self.store.get(job_id)
+        return _due_time(job) if job else None
+
+    def start(self):
+        """Start the timers of every stored job (jobs that are overdue run right away)"""
+        if self.timers.is_running:
+            return
+        for job_id in list(self.store):
+            job = self.store[job_id]
+            try:
+                self.timers.schedule(job_id, _due_time(job))
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"⚠️ Dropping invalid job {job_id}: {e}")
+                del self.store[job_id]
+                self.save(self.store)
+        self.timers.start()
+        print(f"✅ Job scheduler started ({len(self.store)} pending)")
+
+    def stop(self):
+        self.timers.stop()
+
+    async def _run_job(self, job_id):
+        job = self.store.get(job_id)
+        if job is None:
+            return
+
+        handler = self.handlers.get(job["action"])
+        if handler is None:
+            # Left in the store so it runs once its module is loaded again
+            print(f"⚠️ No handler for job {job_id} ({job['action']})")
+            return
+
+        try:
+            await handler(job)
+        except Exception as e:
+            self._retry(job_id, job, e)
+            return
+
+        # The handler may have scheduled a new job under the same ID
+        if self.store.get(job_id) is job:
+            del self.store[job_id]
+            self.save(self.store)
+
+    def _retry(self, job_id, job, error):
+        attempts = job.get("attempts", 0) + 1
+        if attempts >= self.max_attempts:
+            print(f"❌ Job {job_id} failed {attempts} times, giving up: {error}")
+            del self.store[job_id]
+            self.save(self.store)
+            return
+
+        delay = min(self.retry_delay * 2 ** (attempts - 1), self.max_retry_delay)
+        when = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=delay)
+        job["attempts"] = attempts
+        job["time"] = when.isoformat()
+        self.store[job_id] = job
+        self.save(self.store)
+        self.timers.schedule(job_id, when)
+        print(f"⚠️ Job {job_id} failed ({error}), retrying in {delay}s (attempt {attempts + 1}/{self.max_attempts})")
@@ -0,0 +1,84 @@
+"""
+Text matching for Orion Discord Bot
+Compiles a set of words or regex patterns into a single regular expression,
+so a message is checked against all of them in one pass.
+
+Word lists are compiled into a trie-shaped pattern ("bad", "badge", "bar"
+become "ba(?:d(?:ge)?|r)"): at each position of the text the regex engine
+follows one branch of the trie instead of trying every word in turn, so
+scanning stays about as fast with hundreds of words as with a few.
+"""
+
+import re
+
+# Matches nothing - used when a matcher has no words
+_NEVER = "(?!)"
+
+
+def _trie_pattern(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        # "" marks the end of a word
+        node[""] = {}
+    return _node_pattern(trie)
+
+
+def _node_pattern(node):
+    branches = [re.escape(char) + _node_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    if len(branches) == 1 and "" not in node:
+        return branches[0]
+    pattern = "(?:" + "|".join(branches) + ")"
+    # A word ends here, so the rest is optional
+    if "" in node:
+        pattern += "?"
+    return pattern
+
+
+class Matcher:
+    """A set of words or patterns compiled into one regex"""
+
+    def __init__(self, regex, lowercase=False):
+        self.regex = regex
+        # Lowercase the text before matching - much faster than re.IGNORECASE
+        self.lowercase = lowercase
+
+    def __repr__(self):
+        return f"Matcher({self.regex.pattern!r})"
+
+    @classmethod
+    def for_words(cls, words, whole_words=False):
+        """Match any of the words, ignoring case
+
+        With whole_words a word only matches when it isn't part of a longer
+        word ("ass" doesn't match "class"); otherwise it matches anywhere.
+        """
+        words = {word.lower() for word in words if word}
+        pattern = _trie_pattern(words) if words else _NEVER
+        if whole_words:
+            pattern = rf"(?<!\w){pattern}(?!\w)"
+        return cls(re.compile(pattern), lowercase=True)
+
+    @classmethod
+    def for_patterns(cls, patterns, flags=0):
+        """Match any of the regex patterns - raises re.error if one is invalid"""
+        for pattern in patterns:
+            # Compile each one on its own first, so the error names the bad pattern
+            re.compile(pattern, flags)
+        combined = "|".join(f"(?:{pattern})" for pattern in patterns) if patterns else _NEVER
+        return cls(re.compile(combined, flags))
+
+    def search(self, text):
+        """Return the first match in text (lowercased for word matchers), or None"""
+        return self.regex.search(text.lower() if self.lowercase else text)
+
+    def matches(self, text):
+        return self.search(text) is not None
+
+    def find_all(self, text):
+        """Return every matched piece of text, in order"""
+        return [match.group(0) for match in self.regex.finditer(text.lower() if self.lowercase else text)]
@@ -0,0 +1,78 @@
+"""
+Message mirroring for Orion Discord Bot
+Messages mirrored to a channel (quarantined users' messages shown in
+jail-cam) are held for a short window and sent together, one line each, in
+as few messages as fit under Discord's length limit. A chatty user then
+costs one send per window instead of one per message, so the channel stays
+clear of rate limits while mirroring is still near real time.
+"""
+
+import asyncio
+
+# Discord's limit on the length of a message
+MESSAGE_LIMIT = 2000
+
+
+def _chunks(lines, limit):
+    # Join lines into as few messages of at most limit characters as possible,
+    # yielding (message, number of lines in it)
+    chunk = ""
+    count = 0
+    for line in lines:
+        if len(line) > limit:
+            line = line[:limit - 3] + "..."
+        if chunk and len(chunk) + 1 + len(line) > limit:
+            yield chunk, count
+            chunk, count = line, 1
+        else:
+            chunk = f"{chunk}\n{line}" if chunk else line
+            count += 1
+    if chunk:
+        yield chunk, count
+
+
+class MirrorBuffer:
+    """Collects lines per channel and sends them window seconds after the first one"""
+
+    def __init__(self, window=1.5, limit=MESSAGE_LIMIT):
+        self.window = window
+        self.limit = limit
+        # channel ID -> (channel, lines waiting to be sent)
+        self._pending = {}
+        self._tasks = {}
+
+    def add(self, channel, line):
+        """Queue a line for channel - it is sent within window seconds"""
+        entry = self._pending.get(channel.id)
+        if entry is None:
+            entry = self._pending[channel.id] = (channel, [])
+        entry[1].append(line)
+
+        task = self._tasks.get(channel.id)
+        if task is None or task.done():
+            self._tasks[channel.id] = asyncio.get_running_loop().create_task(self._flush_later(channel.id))
+
+    async def _flush_later(self, channel_id):
+        # Lines added while a batch was being sent go out with the next one
+        while channel_id in self._pending:
+            await asyncio.sleep(self.window)
+            await self.flush(channel_id)
+        del self._tasks[channel_id]
+
+    async def flush(self, channel_id):
+        """Send the lines waiting for a channel right away"""
+        entry = self._pending.pop(channel_id, None)
+        if entry is None:
+            return
+        channel, lines = entry
+        lost = 0
+        error = None
+        for chunk, count in _chunks(lines, self.limit):
+            # A failed send only loses its own lines - the rest are still sent
+            try:
+                await channel.send(chunk)
+            except Exception as e:
+                lost += count
+                error = e
+        if lost:
+            print(f"Failed to mirror {lost} of {len(lines)} message(s) to {channel.name}: {error}")
@@ -0,0 +1,95 @@
+"""
+Message pipeline for Orion Discord Bot
+Runs the on_message handlers (quarantine mirroring, commands, auto-moderation,
+custom commands...) as a list of stages. Each stage has a cheap precondition
+that is checked first, so a normal message skips almost every stage without
+doing any work, and a stage can stop the stages after it from running.
+
+The time each stage takes is recorded, to find the ones that slow down
+message handling.
+"""
+
+import time
+
+# Returned by a stage handler to skip the remaining stages for this message
+STOP = object()
+
+
+class StageStats:
+    """Counters and timing for one pipeline stage"""
+
+    __slots__ = ("runs", "skipped", "errors", "total_time", "max_time")
+
+    def __init__(self):
+        self.runs = 0
+        self.skipped = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    @property
+    def average_time(self):
+        return self.total_time / self.runs if self.runs else 0.0
+
+
+class _Stage:
+    __slots__ = ("name", "handler", "when", "stats")
+
+    def __init__(self, name, handler, when):
+        self.name = name
+        self.handler = handler
+        self.when = when
+        self.stats = StageStats()
+
+
+class MessagePipeline:
+    """Runs registered stages in order for each message"""
+
+    def __init__(self):
+        self.stages = []
+
+    def register(self, name, handler, when=None):
+        """Add a stage that runs await handler(ctx) when when(ctx) is true (always if when is None)
+
+        The handler returns STOP to skip the stages after it.
+        """
+        self.stages.append(_Stage(name, handler, when))
+
+    def stage(self, name, when=None):
+        """Decorator form of register"""
+        def decorator(handler):
+            self.register(name, handler, when)
+            return handler
+        return decorator
+
+    async def run(self, ctx):
+        for stage in self.stages:
+            stats = stage.stats
+            if stage.when is not None and not stage.when(ctx):
+                stats.skipped += 1
+                continue
+
+            start = time.perf_counter()
+            try:
+                result = await stage.handler(ctx)
+            except Exception as e:
+                # One broken stage shouldn't stop the others
+                stats.errors += 1
+                result = None
+                print(f"Error in message stage {stage.name}: {e}")
+            elapsed = time.perf_counter() - start
+
+            stats.runs += 1
+            stats.total_time += elapsed
+            if elapsed > stats.max_time:
+                stats.max_time = elapsed
+            if result is STOP:
+                return
+
+    def stats(self):
+        """Return (name, StageStats) for every stage, in order"""
+        return [(stage.name, stage.stats) for stage in self.stages]
+
+    def reset_stats(self):
+        for stage in self.stages:
+            stage.stats = StageStats()
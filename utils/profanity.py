@@ -0,0 +1,75 @@
+"""
+Bad word filter for Orion Discord Bot
+Each guild can have its own list of bad words (guilds without one use
+BAD_WORDS from config). A guild's list is compiled into a single Matcher
+the first time it is needed and cached until the list changes, so checking
+a message is one regex pass whatever the size of the list.
+
+Words and messages are normalized the same way before matching: case is
+folded, zero-width characters are removed and common leetspeak is mapped
+back to letters, so "B4DW0RD" or a word split by a zero-width space
+still matches "badword".
+"""
+
+import unicodedata
+
+from utils.matching import Matcher
+
+# Invisible characters used to split words without changing how they look
+_ZERO_WIDTH = dict.fromkeys(map(ord, "\u00ad\u200b\u200c\u200d\u2060\ufeff"))
+
+# Digits and symbols that stand in for letters
+_LEETSPEAK = str.maketrans({
+    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "8": "b",
+    "@": "a", "$": "s", "!": "i", "|": "i", "+": "t"
+})
+
+
+def normalize(text):
+    """Return text as the filter sees it (lowercase, no zero-width characters, leetspeak undone)"""
+    text = unicodedata.normalize("NFKC", text).translate(_ZERO_WIDTH)
+    return text.casefold().translate(_LEETSPEAK)
+
+
+def compile_words(words):
+    """Compile a word list into a Matcher for normalized text"""
+    return Matcher.for_words(normalize(word) for word in words)
+
+
+class ProfanityFilter:
+    """Checks messages against the bad word list of their guild
+
+    store maps guild IDs to word lists. The matcher of a guild is cached;
+    call invalidate() after changing its list.
+    """
+
+    def __init__(self, store, default_words):
+        self.store = store
+        self.default_matcher = compile_words(default_words)
+        # guild ID -> compiled Matcher of its own list
+        self._matchers = {}
+
+    def words(self, guild_id):
+        """Return the guild's own word list, or None if it uses the default list"""
+        return self.store.get(str(guild_id))
+
+    def matcher(self, guild_id):
+        guild_id = str(guild_id)
+        matcher = self._matchers.get(guild_id)
+        if matcher is None:
+            words = self.store.get(guild_id)
+            matcher = compile_words(words) if words is not None else self.default_matcher
+            self._matchers[guild_id] = matcher
+        return matcher
+
+    def find(self, guild_id, text):
+        """Return the first bad word in text (normalized), or None"""
+        match = self.matcher(guild_id).search(normalize(text))
+        return match.group(0) if match else None
+
+    def invalidate(self, guild_id=None):
+        """Recompile one guild's list (or every list) on next use"""
+        if guild_id is None:
+            self._matchers.clear()
+        else:
+            self._matchers.pop(str(guild_id), None)
@@ -0,0 +1,73 @@
+"""
+Progress messages for Orion Discord Bot
+Long moderation jobs (purges, mass bans, role changes) show their progress by
+editing a status message. Each edit is an API call that competes with the
+job's own calls for the rate limit, so ProgressReporter only keeps the
+latest update and edits the message at most once every few seconds.
+"""
+
+import asyncio
+
+# Default minimum seconds between two edits of a progress message
+PROGRESS_INTERVAL = 3.0
+
+
+class ProgressReporter:
+    """Edits a status message with the latest progress, at most once per interval"""
+
+    def __init__(self, message, interval=PROGRESS_INTERVAL):
+        self.message = message
+        self.interval = interval
+        # Latest text that hasn't been sent yet
+        self._pending = None
+        self._last_edit = None
+        self._task = None
+        self._editing = False
+        self._finished = False
+
+    def update(self, content):
+        """Set the current progress text - it is sent with the next edit the interval allows"""
+        if self._finished:
+            return
+        self._pending = content
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._send_pending())
+
+    def callback(self, format_progress):
+        """Return a RestExecutor progress callback that reports format_progress(done, total, failed)"""
+        async def report(done, total, failed):
+            self.update(format_progress(done, total, failed))
+        return report
+
+    async def finish(self, **kwargs):
+        """Edit the message to its final state right away (kwargs as for message.edit)"""
+        self._finished = True
+        self._pending = None
+        if self._task is not None and not self._task.done():
+            if self._editing:
+                # Let the edit in flight land first, so it can't overwrite the final state
+                await self._task
+            else:
+                self._task.cancel()
+        await self._edit(**kwargs)
+
+    async def _send_pending(self):
+        # Updates made during the wait or the edit are sent by the next round
+        while self._pending is not None:
+            if self._last_edit is not None:
+                delay = self._last_edit + self.interval - asyncio.get_running_loop().time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            content, self._pending = self._pending, None
+            if content is not None:
+                await self._edit(content=content)
+
+    async def _edit(self, **kwargs):
+        self._last_edit = asyncio.get_running_loop().time()
+        self._editing = True
+        try:
+            await self.message.edit(**kwargs)
+        except Exception as e:
+            print(f"Error updating progress message: {e}")
+        finally:
+            self._editing = False
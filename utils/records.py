@@ -0,0 +1,214 @@
+"""
+Typed records for Orion Discord Bot
+Quarantine entries are kept in memory as QuarantineRecord objects with
+parsed datetimes and int IDs. They are converted from and to the plain
+dicts of the storage layer by QuarantineCodec, so the database rows and
+backup files keep their existing JSON layout.
+"""
+
+import datetime
+
+# Key of the per-guild settings dict that shares a row with the records
+SERVER_SETTINGS_KEY = "server_settings"
+
+
+def _parse_time(value):
+    if value is None:
+        return None
+    return datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _parse_id(value):
+    return int(value) if value is not None else None
+
+
+def _format_id(value):
+    return str(value) if value is not None else None
+
+
+class QuarantineRecord:
+    """One quarantined user - a timed quarantine has end_time and original_duration_minutes
+
+    role_id is the quarantine role given to the user; records without one
+    were quarantined with per-channel member overwrites.
+    """
+
+    __slots__ = (
+        "user_id", "reason", "moderator_id", "roles", "timestamp", "channel_id",
+        "public_view", "jail_cam_channel_id", "end_time", "original_duration_minutes", "role_id", "extra"
+    )
+
+    def __init__(self, user_id, reason, moderator_id, roles, timestamp, channel_id,
+                 public_view=False, jail_cam_channel_id=None, end_time=None,
+                 original_duration_minutes=None, role_id=None, extra=None):
+        self.user_id = user_id
+        self.reason = reason
+        self.moderator_id = moderator_id
+        self.roles = roles
+        self.timestamp = timestamp
+        self.channel_id = channel_id
+        self.public_view = public_view
+        self.jail_cam_channel_id = jail_cam_channel_id
+        self.end_time = end_time
+        self.original_duration_minutes = original_duration_minutes
+        self.role_id = role_id
+        # Fields this class doesn't know about, kept so they survive a save
+        self.extra = extra
+
+    def __repr__(self):
+        return f"QuarantineRecord(user_id={self.user_id}, end_time={self.end_time})"
+
+    @property
+    def is_timed(self):
+        return self.end_time is not None and self.original_duration_minutes is not None
+
+    def remaining(self, now):
+        """Return the time left as a timedelta (negative once expired), or None if indefinite"""
+        return self.end_time - now if self.end_time is not None else None
+
+    def is_expired(self, now):
+        return self.end_time is not None and now >= self.end_time
+
+    @classmethod
+    def from_dict(cls, user_id, data):
+        """Parse a stored record dict"""
+        data = dict(data)
+        end_time = data.pop("end_time", None)
+        try:
+            end_time = _parse_time(end_time)
+        except (ValueError, AttributeError) as e:
+            # Keep the raw value so it isn't lost, but treat the quarantine as indefinite
+            print(f"⚠️ Invalid quarantine end time for user {user_id}: {e}")
+            data["end_time"] = end_time
+            end_time = None
+
+        record = cls(
+            user_id=int(user_id),
+            reason=data.pop("reason", "No reason provided"),
+            moderator_id=_parse_id(data.pop("moderator", None)),
+            roles=[int(role_id) for role_id in data.pop("roles", [])],
+            timestamp=_parse_time(data.pop("timestamp", None)),
+            channel_id=_parse_id(data.pop("channel_id", None)),
+            public_view=data.pop("public_view", False),
+            jail_cam_channel_id=_parse_id(data.pop("jail_cam_channel_id", None)),
+            end_time=end_time,
+            original_duration_minutes=data.pop("original_duration_minutes", None),
+            role_id=_parse_id(data.pop("quarantine_role_id", None))
+        )
+        record.extra = data or None
+        return record
+
+    def to_dict(self):
+        """Return the record in its stored dict form"""
+        data = dict(self.extra) if self.extra else {}
+        data.update({
+            "reason": self.reason,
+            "moderator": _format_id(self.moderator_id),
+            "roles": list(self.roles),
+            "timestamp": str(self.timestamp) if self.timestamp is not None else None,
+            "channel_id": _format_id(self.channel_id),
+            "public_view": self.public_view,
+            "jail_cam_channel_id": _format_id(self.jail_cam_channel_id)
+        })
+        if self.end_time is not None:
+            data["end_time"] = str(self.end_time)
+        if self.original_duration_minutes is not None:
+            data["original_duration_minutes"] = self.original_duration_minutes
+        if self.role_id is not None:
+            data["quarantine_role_id"] = _format_id(self.role_id)
+        return data
+
+
+class QuarantineCodec:
+    """Converts a guild's quarantine row between stored dicts and QuarantineRecords"""
+
+    @staticmethod
+    def decode(guild_data):
+        decoded = {}
+        for key, value in guild_data.items():
+            if key != SERVER_SETTINGS_KEY and isinstance(value, dict):
+                try:
+                    value = QuarantineRecord.from_dict(key, value)
+                except (ValueError, TypeError) as e:
+                    print(f"⚠️ Keeping unparseable quarantine record for {key} as is: {e}")
+            decoded[key] = value
+        return decoded
+
+    @staticmethod
+    def encode(guild_data):
+        return {
+            key: value.to_dict() if isinstance(value, QuarantineRecord) else value
+            for key, value in guild_data.items()
+        }
+
+
+class GuildQuarantineIndex:
+    """One guild's quarantine state with int keys, for the checks made on every message
+
+    records maps user IDs to their QuarantineRecord. public_channel_ids
+    lists the quarantine channels that jail-cam messages are forwarded
+    to (each channel once, even when several public records share it).
+    """
+
+    __slots__ = ("records", "jail_cam_channel_id", "public_channel_ids")
+
+    def __init__(self, guild_data=None):
+        guild_data = guild_data or {}
+        self.records = {
+            int(key): value for key, value in guild_data.items() if isinstance(value, QuarantineRecord)
+        }
+        settings = guild_data.get(SERVER_SETTINGS_KEY) or {}
+        # Channel configured with /setjailcam, if any
+        self.jail_cam_channel_id = _parse_id(settings.get("jail_cam_channel_id"))
+        self._update_channels()
+
+    def __contains__(self, user_id):
+        return user_id in self.records
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def user_ids(self):
+        return self.records.keys()
+
+    def add(self, record):
+        self.records[record.user_id] = record
+        self._update_channels()
+
+    def remove(self, user_id):
+        if self.records.pop(user_id, None) is not None:
+            self._update_channels()
+
+    def _update_channels(self):
+        channel_ids = dict.fromkeys(
+            record.channel_id for record in self.records.values() if record.public_view and record.channel_id
+        )
+        self.public_channel_ids = tuple(channel_ids)
+
+
+class QuarantineIndex:
+    """GuildQuarantineIndex of every guild, built from the quarantine store on first use
+
+    The store stays the source of truth: code that changes a guild's
+    quarantine row updates the index too (see the quarantine helpers in
+    data_manager), and invalidate() drops guilds whose row was replaced.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._guilds = {}
+
+    def guild(self, guild_id):
+        guild_id = int(guild_id)
+        index = self._guilds.get(guild_id)
+        if index is None:
+            index = self._guilds[guild_id] = GuildQuarantineIndex(self.store.get(str(guild_id)))
+        return index
+
+    def invalidate(self, guild_id=None):
+        """Rebuild one guild (or every guild) from the store on next use"""
+        if guild_id is None:
+            self._guilds.clear()
+        else:
+            self._guilds.pop(int(guild_id), None)
@@ -0,0 +1,114 @@
+"""
+Bulk Discord API helper for Orion Discord Bot
+Runs many REST calls (bans, kicks, role and channel permission edits) with a
+limited number in flight per rate limit bucket, instead of one at a time or
+all at once.
+
+discord.py already waits out the rate limit of each route, but firing
+hundreds of calls together still trips Discord's per-guild limits. Calls
+are grouped into buckets (e.g. "ban:<guild>"); each bucket has its own
+concurrency limit, and when one of its calls is rate limited the whole
+bucket waits for the retry_after Discord asked for before continuing.
+"""
+
+import asyncio
+
+import discord
+
+from config import REST_CONCURRENCY
+
+
+class _Bucket:
+    def __init__(self, concurrency):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        # Loop time before which no call in this bucket is started
+        self.paused_until = 0.0
+
+
+class RestExecutor:
+    """Runs API calls concurrently, at most `concurrency` at a time per bucket"""
+
+    def __init__(self, concurrency=5, max_retries=3, retry_delay=1.0):
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._buckets = {}
+
+    def _bucket(self, name):
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            bucket = self._buckets[name] = _Bucket(self.concurrency)
+        return bucket
+
+    async def run(self, calls, bucket="default", progress=None):
+        """Run zero-argument coroutine functions and return their results in order
+
+        A call that still fails after its retries returns its exception
+        instead of a result, so one bad target doesn't stop the rest.
+        progress, if given, is awaited as progress(done, total, failed)
+        after each call - see utils.progress.ProgressReporter.callback,
+        which turns that into throttled message edits.
+        """
+        bucket = self._bucket(bucket)
+        counts = {"done": 0, "failed": 0}
+        total = len(calls)
+
+        async def run_one(call):
+            try:
+                async with bucket.semaphore:
+                    return await self._call(bucket, call)
+            except Exception:
+                counts["failed"] += 1
+                raise
+            finally:
+                counts["done"] += 1
+                if progress is not None:
+                    await self._progress(progress, counts, total)
+
+        return await asyncio.gather(*(run_one(call) for call in calls), return_exceptions=True)
+
+    async def _progress(self, progress, counts, total):
+        try:
+            await progress(counts["done"], total, counts["failed"])
+        except Exception as e:
+            print(f"Error reporting bulk operation progress: {e}")
+
+    async def _call(self, bucket, call):
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            delay = bucket.paused_until - loop.time()
+            while delay > 0:
+                await asyncio.sleep(delay)
+                delay = bucket.paused_until - loop.time()
+            try:
+                return await call()
+            except discord.RateLimited as e:
+                self._pause(bucket, e.retry_after)
+                error = e
+            except discord.HTTPException as e:
+                # 403/404 and other client errors won't succeed on a retry
+                if e.status != 429 and e.status < 500:
+                    raise
+                self._pause(bucket, _retry_after(e) or self.retry_delay * 2 ** attempt)
+                error = e
+        raise error
+
+    def _pause(self, bucket, seconds):
+        bucket.paused_until = max(bucket.paused_until, asyncio.get_running_loop().time() + seconds)
+
+
+def _retry_after(error):
+    # Seconds Discord asked us to wait, if the response says
+    try:
+        return float(error.response.headers.get("Retry-After"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def failures(results):
+    """Return the exceptions in a list of RestExecutor.run results"""
+    return [result for result in results if isinstance(result, BaseException)]
+
+
+# Shared by every bulk operation, so two running in the same guild share its limits
+rest_executor = RestExecutor(REST_CONCURRENCY)
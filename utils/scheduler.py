@@ -0,0 +1,119 @@
+"""
+Deadline scheduler for Orion Discord Bot
+Keeps timers in a min-heap ordered by deadline and sleeps until the earliest
+one is due, instead of polling. Rescheduling a key replaces its deadline;
+the old heap entry is skipped when it reaches the top.
+"""
+
+import heapq
+import asyncio
+import datetime
+import itertools
+
+# Longest single sleep - keeps wall clock changes from delaying timers for long
+MAX_SLEEP_SECONDS = 3600
+
+
+class DeadlineScheduler:
+    """Calls an async callback(key) once each key's deadline has passed"""
+
+    def __init__(self, callback, name="scheduler"):
+        self.callback = callback
+        self.name = name
+        # Heap of (deadline timestamp, sequence, key); entries whose sequence isn't
+        # the key's current one in _entries are stale
+        self._heap = []
+        # key -> (deadline timestamp, sequence)
+        self._entries = {}
+        self._sequence = itertools.count()
+        # Created in start(), on the loop that runs the scheduler
+        self._wakeup = None
+        self._task = None
+        # Callbacks that are still running, so they aren't garbage collected
+        self._running = set()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def schedule(self, key, when):
+        """Run the callback for key at datetime when, replacing any earlier deadline"""
+        deadline = when.timestamp()
+        sequence = next(self._sequence)
+        self._entries[key] = (deadline, sequence)
+        heapq.heappush(self._heap, (deadline, sequence, key))
+        self._compact()
+        # Only the runner's current sleep can be too long - wake it to re-check the top
+        if self._wakeup is not None and self._heap[0][1] == sequence:
+            self._wakeup.set()
+
+    def cancel(self, key):
+        """Forget the deadline of key (no-op if it has none)"""
+        self._entries.pop(key, None)
+        self._compact()
+
+    def deadline(self, key):
+        """Return the deadline of key as an aware datetime, or None"""
+        entry = self._entries.get(key)
+        return datetime.datetime.fromtimestamp(entry[0], datetime.timezone.utc) if entry else None
+
+    def next_deadline(self):
+        """Return the earliest deadline as an aware datetime, or None"""
+        self._drop_stale()
+        return datetime.datetime.fromtimestamp(self._heap[0][0], datetime.timezone.utc) if self._heap else None
+
+    def _compact(self):
+        # Rebuild once stale entries outnumber live ones, so the heap stays O(live timers)
+        if len(self._heap) > 2 * len(self._entries) + 16:
+            self._heap = [(deadline, sequence, key) for key, (deadline, sequence) in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def _drop_stale(self):
+        while self._heap and self._entries.get(self._heap[0][2], (None, None))[1] != self._heap[0][1]:
+            heapq.heappop(self._heap)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @property
+    def is_running(self):
+        return self._task is not None and not self._task.done()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            self._drop_stale()
+
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - datetime.datetime.now(datetime.timezone.utc).timestamp()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), min(delay, MAX_SLEEP_SECONDS))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, _, key = heapq.heappop(self._heap)
+            del self._entries[key]
+            task = loop.create_task(self._fire(key))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _fire(self, key):
+        try:
+            await self.callback(key)
+        except Exception as e:
+            print(f"❌ Error in {self.name} timer {key}: {e}")
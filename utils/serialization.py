@@ -0,0 +1,105 @@
+"""
+Row serializers for Orion Discord Bot
+Encode the values of data store rows. Each store picks a format in
+config.STORE_FORMATS: plain JSON text (the default, and what every
+existing row is written in), orjson or msgpack, optionally zlib-compressed.
+
+Binary rows start with a two byte tag naming their format and compression,
+so a row is always decoded by the format it was written in. Switching a
+store to another format needs no migration - old rows are read as they are
+and rewritten in the new format the next time they change.
+"""
+
+import json
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Tag bytes of binary rows
+_FORMAT_TAGS = {"json": b"J", "orjson": b"O", "msgpack": b"M"}
+_FORMATS_BY_TAG = {tag: name for name, tag in _FORMAT_TAGS.items()}
+_COMPRESSED = b"Z"
+_UNCOMPRESSED = b"-"
+
+
+def _dumps(fmt, value):
+    if fmt == "orjson":
+        # Like json.dumps, non-string dict keys are written as strings
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    if fmt == "msgpack":
+        return msgpack.packb(value, use_bin_type=True)
+    return json.dumps(value).encode('utf-8')
+
+
+def _loads(fmt, data):
+    if fmt == "msgpack":
+        if msgpack is None:
+            raise ValueError("row was written with msgpack, which is not installed")
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    # orjson writes standard JSON, so json can read it when orjson isn't installed
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class Serializer:
+    """Encodes rows in one format and decodes rows written in any format"""
+
+    def __init__(self, fmt="json", compress=False, level=1):
+        if fmt not in _FORMAT_TAGS:
+            raise ValueError(f"Unknown store format: {fmt}")
+        if (fmt == "orjson" and orjson is None) or (fmt == "msgpack" and msgpack is None):
+            print(f"⚠️ {fmt} is not installed - storing rows as JSON instead (pip install {fmt})")
+            fmt = "json"
+        self.format = fmt
+        self.compress = compress
+        self.level = level
+        self._tag = _FORMAT_TAGS[fmt] + (_COMPRESSED if compress else _UNCOMPRESSED)
+
+    @classmethod
+    def from_spec(cls, spec):
+        """Create a serializer from a config string such as "json", "orjson" or "msgpack+zlib" """
+        fmt, _, compression = spec.partition("+")
+        if compression not in ("", "zlib"):
+            raise ValueError(f"Unknown store compression: {compression}")
+        return cls(fmt, compress=compression == "zlib")
+
+    def dumps(self, value):
+        """Encode a row value - JSON text for plain json, tagged bytes otherwise"""
+        if self.format == "json" and not self.compress:
+            return json.dumps(value)
+        data = _dumps(self.format, value)
+        if self.compress:
+            data = zlib.compress(data, self.level)
+        return self._tag + data
+
+    @staticmethod
+    def loads(raw):
+        """Decode a row written by any serializer, raising ValueError if it is invalid"""
+        if isinstance(raw, str):
+            return json.loads(raw)
+
+        fmt = _FORMATS_BY_TAG.get(raw[:1])
+        if fmt is None or raw[1:2] not in (_COMPRESSED, _UNCOMPRESSED):
+            raise ValueError("row has an unknown format tag")
+        data = raw[2:]
+        try:
+            if raw[1:2] == _COMPRESSED:
+                data = zlib.decompress(data)
+            return _loads(fmt, data)
+        except ValueError:
+            raise
+        except Exception as e:
+            # zlib and msgpack raise their own error types for damaged data
+            raise ValueError(f"row could not be decoded: {e}") from e
+
+
+JSON_SERIALIZER = Serializer()
@@ -0,0 +1,977 @@
+"""
+Storage backend for Orion Discord Bot
+Persists the data_manager stores in an embedded SQLite database (WAL mode)
+with one table per store and one row per top-level key, encoded by the
+store's serializer. Writes run on a dedicated writer thread so they never
+block the asyncio event loop, and saves are coalesced so each store is
+written at most once per interval.
+
+Every row carries a checksum that is verified on load, and files written
+outside the database (backups) go through atomic_write, which uses a temp
+file, fsync and an atomic rename and appends a checksum footer.
+
+Append-mostly stores (warnings, notes) use a JournaledStore: adding an
+entry appends one line to a journal table instead of rewriting the row,
+and the journal is periodically compacted into the snapshot rows.
+
+Dict stores are sharded by their top-level key (the guild ID for almost
+all of them): loading a store only reads its keys, and each row is read
+and verified the first time it is accessed (on a separate connection, so
+the read never waits for a write). evict() drops a row from memory again,
+so memory scales with the guilds that are actually active.
+
+A store can also be bound to a loader with bind_loader(), so that it is
+only loaded on first access, and prefetch() reads rows in a worker thread
+ahead of time.
+"""
+
+import os
+import json
+import time
+import zlib
+import queue
+import asyncio
+import hashlib
+import sqlite3
+import tempfile
+import threading
+import datetime
+from concurrent.futures import Future
+from collections.abc import MutableMapping, MutableSequence
+
+from utils.serialization import JSON_SERIALIZER
+
+
+# Footer line that atomic_write appends to every file
+CHECKSUM_FOOTER = b"\n#sha256:"
+
+# _persisted marker for keys that exist in the database but aren't loaded
+_UNLOADED = object()
+
+
+def _written(future):
+    """Whether a write Future has finished without an error"""
+    return future.done() and future.exception() is None
+
+
+def fsync_directory(directory):
+    """Make a rename inside the directory durable (not supported on every OS)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, text):
+    """Write a text file crash-safely with a SHA-256 checksum footer
+
+    The data goes to a temp file in the same directory, is fsynced and then
+    renamed over the target, so readers see either the old or the new file
+    and never a truncated one.
+    """
+    data = text.encode('utf-8')
+    footer = CHECKSUM_FOOTER + hashlib.sha256(data).hexdigest().encode('ascii') + b"\n"
+    directory = os.path.dirname(os.path.abspath(path))
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".part")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.write(footer)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    fsync_directory(directory)
+
+
+def verify_checked(raw, name):
+    """Strip and verify the checksum footer of atomic_write output, returning the text"""
+    data, found, checksum = raw.rpartition(CHECKSUM_FOOTER)
+    if not found:
+        raise ValueError(f"{name} has no checksum footer")
+    if hashlib.sha256(data).hexdigest() != checksum.strip().decode('ascii', 'replace'):
+        raise ValueError(f"{name} failed checksum verification")
+    return data.decode('utf-8')
+
+
+def read_checked(path):
+    """Read a file written by atomic_write, raising ValueError if its checksum doesn't match"""
+    with open(path, 'rb') as f:
+        return verify_checked(f.read(), path)
+
+
+def row_checksum(value):
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    return zlib.crc32(value)
+
+
+class StorageBackend:
+    """SQLite database holding one key/value table per data store"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.RLock()
+        # Row reads use their own connection, so they never wait for a write
+        # transaction on the writer thread (WAL lets readers run alongside it)
+        self.read_lock = threading.Lock()
+        # True when a corrupt database file was moved aside and a new one created
+        self.recovered = False
+
+        try:
+            self._connect()
+        except sqlite3.DatabaseError as e:
+            print(f"❌ {path} is corrupt ({e}) - moving it aside and starting a new database")
+            self._move_aside()
+            self._connect()
+            self.recovered = True
+
+    def _connect(self):
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        try:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            # FULL syncs the WAL on every commit, so a committed save survives a power loss
+            self.conn.execute("PRAGMA synchronous=FULL")
+            result = self.conn.execute("PRAGMA quick_check").fetchone()[0]
+            if result != "ok":
+                raise sqlite3.DatabaseError(result)
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS storage_meta (store TEXT PRIMARY KEY, imported_at TEXT NOT NULL)"
+            )
+        except sqlite3.DatabaseError:
+            self.conn.close()
+            raise
+        self.read_conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+
+    def _move_aside(self):
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.replace(self.path + suffix, f"{self.path}.corrupt-{timestamp}{suffix}")
+
+    @staticmethod
+    def table_name(store):
+        return f"store_{store}"
+
+    def create_table(self, store):
+        """Create the table for a store if it doesn't exist yet"""
+        table = self.table_name(store)
+        with self.lock:
+            self.conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{table}" (key TEXT PRIMARY KEY, value TEXT NOT NULL, checksum INTEGER)'
+            )
+            # Tables created before row checksums existed get the column added
+            columns = [row[1] for row in self.conn.execute(f'PRAGMA table_info("{table}")')]
+            if "checksum" not in columns:
+                self.conn.execute(f'ALTER TABLE "{table}" ADD COLUMN checksum INTEGER')
+
+    def read_rows(self, store):
+        """Return ({key: value}, [corrupt keys]) for a store, verifying row checksums"""
+        rows = {}
+        corrupt = []
+        with self.lock:
+            cursor = self.conn.execute(f'SELECT key, value, checksum FROM "{self.table_name(store)}"')
+            for key, value, checksum in cursor:
+                # Rows written before checksums existed have none to verify
+                if checksum is not None and checksum != row_checksum(value):
+                    corrupt.append(key)
+                else:
+                    rows[key] = value
+        return rows, corrupt
+
+    def read_keys(self, store):
+        """Return the keys of a store without reading their values"""
+        with self.lock:
+            return [row[0] for row in self.conn.execute(f'SELECT key FROM "{self.table_name(store)}"')]
+
+    def read_row(self, store, key):
+        """Return the value of one row (None if it doesn't exist), verifying its checksum"""
+        with self.read_lock:
+            row = self.read_conn.execute(
+                f'SELECT value, checksum FROM "{self.table_name(store)}" WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, checksum = row
+        if checksum is not None and checksum != row_checksum(value):
+            raise ValueError(f"row {key!r} of the {store} store failed checksum verification")
+        return value
+
+    def write_rows(self, store, upserts, deletes, replace_all=False, journal=False):
+        """Write changed rows and remove deleted keys in a single transaction
+
+        With replace_all the table is emptied first, so upserts become its
+        complete contents. With journal, the journal lines of every written
+        key are dropped, since the new snapshot rows already contain them.
+        """
+        table = self.table_name(store)
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                if journal:
+                    journal_table = self.journal_name(store)
+                    if replace_all:
+                        self.conn.execute(f'DELETE FROM "{journal_table}"')
+                    else:
+                        self.conn.executemany(
+                            f'DELETE FROM "{journal_table}" WHERE key = ?',
+                            [(key,) for key in list(upserts) + list(deletes)]
+                        )
+                if replace_all:
+                    self.conn.execute(f'DELETE FROM "{table}"')
+                if upserts:
+                    self.conn.executemany(
+                        f'INSERT OR REPLACE INTO "{table}" (key, value, checksum) VALUES (?, ?, ?)',
+                        [(key, value, row_checksum(value)) for key, value in upserts.items()]
+                    )
+                if deletes:
+                    self.conn.executemany(
+                        f'DELETE FROM "{table}" WHERE key = ?',
+                        [(key,) for key in deletes]
+                    )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def journal_name(store):
+        return f"journal_{store}"
+
+    def create_journal(self, store):
+        """Create the append-only journal table of a store if it doesn't exist yet"""
+        with self.lock:
+            self.conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{self.journal_name(store)}" '
+                '(seq INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL, line TEXT NOT NULL, checksum INTEGER NOT NULL)'
+            )
+
+    def append_journal(self, store, key, line):
+        """Append one journal line (a single small insert)"""
+        with self.lock:
+            self.conn.execute(
+                f'INSERT INTO "{self.journal_name(store)}" (key, line, checksum) VALUES (?, ?, ?)',
+                (key, line, row_checksum(line))
+            )
+
+    def read_journal(self, store):
+        """Return ([(key, line)] in append order, number of corrupt lines skipped)"""
+        lines = []
+        corrupt = 0
+        with self.lock:
+            cursor = self.conn.execute(f'SELECT key, line, checksum FROM "{self.journal_name(store)}" ORDER BY seq')
+            for key, line, checksum in cursor:
+                if checksum != row_checksum(line):
+                    corrupt += 1
+                else:
+                    lines.append((key, line))
+        return lines, corrupt
+
+    def is_imported(self, store):
+        """Check whether the legacy JSON file of a store was already imported"""
+        with self.lock:
+            cursor = self.conn.execute("SELECT 1 FROM storage_meta WHERE store = ?", (store,))
+            return cursor.fetchone() is not None
+
+    def mark_imported(self, store):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO storage_meta (store, imported_at) VALUES (?, ?)",
+                (store, str(datetime.datetime.now(datetime.timezone.utc)))
+            )
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+        with self.read_lock:
+            self.read_conn.close()
+
+
+class StoreWriter:
+    """Dedicated thread that executes database writes in submission order"""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="store-writer", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                break
+            func, args, future = job
+            try:
+                future.set_result(func(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+    def submit(self, func, *args):
+        """Queue a write and return a Future for its result"""
+        future = Future()
+        if not self.thread.is_alive():
+            future.set_exception(RuntimeError("Store writer has been stopped"))
+            return future
+        self.queue.put((func, args, future))
+        return future
+
+    def flush(self):
+        """Return a Future that completes once every write queued so far is done"""
+        return self.submit(lambda: None)
+
+    def stop(self, timeout=None):
+        """Finish all queued writes, then stop the thread"""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(timeout)
+
+
+class WriteBehindScheduler:
+    """Coalesces saves so each store is written at most once per interval
+
+    A save only marks the store dirty. The first save after a quiet period
+    is written on the next event loop iteration; saves arriving within the
+    interval after that are folded into a single write at the end of it.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        # store name -> (store, TimerHandle) for stores waiting to be written
+        self.pending = {}
+        # store name -> monotonic time of the last write
+        self.last_write = {}
+
+    def mark_dirty(self, store):
+        """Schedule a write of the store, coalescing with any pending one"""
+        if store.name in self.pending:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (startup/shutdown) - write straight away
+            self._write(store)
+            return
+
+        elapsed = time.monotonic() - self.last_write.get(store.name, 0)
+        delay = max(0, self.interval - elapsed)
+        handle = loop.call_later(delay, self._write_pending, store.name)
+        self.pending[store.name] = (store, handle)
+
+    def _write_pending(self, name):
+        store, _ = self.pending.pop(name)
+        self._write(store)
+
+    def _write(self, store):
+        self.last_write[store.name] = time.monotonic()
+        try:
+            store.save()
+        except Exception as e:
+            print(f"Error saving {store.name} store: {e}")
+
+    def flush(self):
+        """Write every dirty store now (durability barrier)"""
+        for name in list(self.pending):
+            store, handle = self.pending.pop(name)
+            handle.cancel()
+            self._write(store)
+
+
+class _Store:
+    """Shared persistence logic for dict and list stores"""
+
+    # Whether the store has a journal table whose lines are folded into snapshot rows
+    journaled = False
+    # Whether rows are only read from the database when first accessed
+    lazy = False
+
+    def __init__(self, name, legacy_file=None, serializer=None, codec=None):
+        self.name = name
+        self.legacy_file = legacy_file
+        # Encodes row values (see utils.serialization); any format is decoded
+        self.serializer = serializer or JSON_SERIALIZER
+        # Optional object with decode(value)/encode(value) that converts row values
+        # to and from the in-memory objects (e.g. utils.records.QuarantineCodec)
+        self.codec = codec
+        self.backend = None
+        self.writer = None
+        # Set by the writer thread when a write fails, so the next save rewrites everything
+        self._write_failed = False
+        # Serialized value of every key as it was last written to the database
+        # (_UNLOADED for keys of a lazy store that haven't been read yet)
+        self._persisted = {}
+        # Keys of a lazy store that are in the database but not in memory
+        self._unloaded = set()
+        self._fallback = None
+        # Future of the most recently submitted write
+        self._last_write = None
+        # key -> (serialized value, Future of its write) for evicted rows that may not
+        # be in the database yet; reloading one uses this instead of waiting for the write
+        self._evicted_rows = {}
+        # Called on first access to load the store (see bind_loader)
+        self._loader = None
+        # Bumped whenever a write changes the stored data (lets backups skip unchanged stores)
+        self.version = 0
+
+    def _rows(self):
+        """Return the current contents as {key: value} rows"""
+        raise NotImplementedError
+
+    def _install(self, rows):
+        """Replace the in-memory contents with decoded {key: value} rows"""
+        raise NotImplementedError
+
+    def _to_rows(self, data):
+        """Convert plain data (as found in a JSON file) to {key: value} rows"""
+        raise NotImplementedError
+
+    def _from_rows(self, rows):
+        """Convert decoded {key: value} rows back to plain data (as found in a JSON file)"""
+        raise NotImplementedError
+
+    def _after_install(self, restored_keys):
+        """Called once the rows are installed; restored_keys came from a backup"""
+
+    def _after_snapshot(self, upserts, deletes, replace_all):
+        """Called by save with the rows it is about to write"""
+
+    def _decode(self, value):
+        return self.codec.decode(value) if self.codec is not None else value
+
+    def _encode(self, value):
+        return self.codec.encode(value) if self.codec is not None else value
+
+    def bind_loader(self, loader):
+        """Load the store by calling loader() the first time it is accessed"""
+        self._loader = loader
+
+    def _ensure_loaded(self):
+        if self._loader is not None:
+            loader, self._loader = self._loader, None
+            loader()
+
+    def _read_legacy(self):
+        """Read the legacy JSON file and return its contents as rows"""
+        if self.legacy_file and os.path.exists(self.legacy_file):
+            with open(self.legacy_file, 'r') as f:
+                return self._to_rows(json.load(f))
+        return {}
+
+    def load(self, backend, writer=None, fallback=None):
+        """Load the store from the database, importing the legacy JSON file on first boot
+
+        fallback is a callable returning the store's plain data from the
+        newest valid backup (or None). It is used to repair rows that fail
+        their checksum and to rebuild a store whose database was lost.
+        """
+        self._loader = None
+        self.backend = backend
+        self.writer = writer
+        self._fallback = fallback
+        self._persisted = {}
+        self._unloaded = set()
+        self._evicted_rows = {}
+
+        try:
+            backend.create_table(self.name)
+            if self.lazy:
+                keys = backend.read_keys(self.name)
+                # A store that is already in the database only needs its keys now;
+                # first boot and a rebuilt database take the full path below
+                if (keys or backend.is_imported(self.name)) and not (backend.recovered and not keys):
+                    self._install({})
+                    self._unloaded = set(keys)
+                    self._persisted = dict.fromkeys(keys, _UNLOADED)
+                    self._after_install(set())
+                    return
+            raw_rows, corrupt = backend.read_rows(self.name)
+        except sqlite3.DatabaseError as e:
+            print(f"❌ Could not read the {self.name} store: {e}")
+            raw_rows, corrupt = {}, None
+
+        rows = {}
+        for key, value in raw_rows.items():
+            try:
+                rows[key] = self.serializer.loads(value)
+            except ValueError:
+                corrupt = (corrupt or []) + [key]
+
+        # Corrupt rows, an unreadable table or a database rebuilt after corruption
+        # are repaired from the newest valid backup
+        lost = corrupt is None or (backend.recovered and not raw_rows)
+        restored_keys = set()
+        if (corrupt or lost) and fallback is not None:
+            backup = fallback()
+            if backup is None:
+                print(f"⚠️ No valid backup found to repair the {self.name} store")
+            else:
+                backup_rows = self._to_rows(backup)
+                if lost or isinstance(self, MutableSequence):
+                    rows = backup_rows
+                    restored_keys = set(rows)
+                else:
+                    restored_keys = {key for key in corrupt if key in backup_rows}
+                    rows.update({key: backup_rows[key] for key in restored_keys})
+                print(f"♻️ Restored the {self.name} store from backup")
+                backend.mark_imported(self.name)
+
+        if not rows and not backend.is_imported(self.name):
+            try:
+                rows = self._read_legacy()
+            except ValueError as e:
+                print(f"❌ Legacy {self.legacy_file} is corrupt ({e}) - using the newest backup instead")
+                backup = fallback() if fallback is not None else None
+                rows = self._to_rows(backup) if backup is not None else {}
+            if rows:
+                print(f"📥 Importing legacy {self.legacy_file} into the {self.name} store")
+            backend.mark_imported(self.name)
+
+        self._install(rows)
+        self._after_install(restored_keys)
+        # Anything that didn't come straight from the database is written back in full
+        if corrupt or lost or rows.keys() != raw_rows.keys():
+            self._write_failed = True
+            self.save()
+        else:
+            self._persisted = dict(raw_rows)
+
+    def _load_key(self, key):
+        """Read one row of a lazy store into memory, repairing it from backup if corrupt"""
+        self._unloaded.discard(key)
+        self._persisted.pop(key, None)
+        # A row evicted just now may still be waiting on the writer thread -
+        # never block the event loop on it, use the value it was evicted with
+        evicted = self._evicted_rows.pop(key, None)
+
+        try:
+            if evicted is not None and not _written(evicted[1]):
+                raw = evicted[0]
+            else:
+                raw = self.backend.read_row(self.name, key)
+            value = self.serializer.loads(raw) if raw is not None else None
+        except (ValueError, sqlite3.DatabaseError) as e:
+            print(f"⚠️ {e} - restoring it from backup")
+            backup = self._fallback() if self._fallback is not None else None
+            backup_rows = self._to_rows(backup) if backup is not None else {}
+            if key in backup_rows:
+                # The backup copy already contains any journaled entries
+                self._install_key(key, backup_rows[key], replay=False)
+                print(f"♻️ Restored {key} of the {self.name} store from backup")
+            else:
+                print(f"⚠️ No valid backup of {key} in the {self.name} store - dropping it")
+                self._persisted[key] = None
+            # The row isn't marked persisted, so this save rewrites (or deletes) it
+            self.save()
+            return
+
+        if raw is not None:
+            self._install_key(key, value)
+            self._persisted[key] = raw
+
+    async def prefetch(self, keys):
+        """Load rows ahead of first access, reading them in a worker thread
+
+        Rows that fail to read are left for _load_key, which repairs them.
+        """
+        self._ensure_loaded()
+        self._prune_evicted()
+        loop = asyncio.get_running_loop()
+        for key in keys:
+            # Rows whose write is still pending are read back from memory by _load_key
+            if key not in self._unloaded or key in self._evicted_rows:
+                continue
+            try:
+                raw = await loop.run_in_executor(None, self.backend.read_row, self.name, key)
+                value = self.serializer.loads(raw) if raw is not None else None
+            except (ValueError, sqlite3.DatabaseError):
+                continue
+            # Skip rows that were loaded, evicted or written while this one was being read
+            if raw is None or key not in self._unloaded or (self._last_write and not self._last_write.done()):
+                continue
+            self._unloaded.discard(key)
+            self._install_key(key, value)
+            self._persisted[key] = raw
+
+    def _install_key(self, key, value, replay=True):
+        """Put one decoded row of a lazy store into memory"""
+        raise NotImplementedError
+
+    def load_all(self):
+        """Read every row that isn't in memory yet"""
+        self._ensure_loaded()
+        for key in list(self._unloaded):
+            self._load_key(key)
+
+    def evict(self, key):
+        """Write a row's pending changes and drop it from memory (it stays in the database)"""
+        if not self.lazy or self._loader is not None or key in self._unloaded:
+            return
+        self.save()
+        if key not in self._persisted:
+            return
+        self._prune_evicted()
+        if self._last_write is not None and not _written(self._last_write):
+            self._evicted_rows[key] = (self._persisted[key], self._last_write)
+        self._evict_key(key)
+        self._persisted[key] = _UNLOADED
+        self._unloaded.add(key)
+
+    def _evict_key(self, key):
+        raise NotImplementedError
+
+    def _prune_evicted(self):
+        # Evicted rows whose write succeeded can be read from the database again
+        self._evicted_rows = {
+            key: entry for key, entry in self._evicted_rows.items() if not _written(entry[1])
+        }
+
+    def save(self):
+        """Persist only the keys whose value changed since the last save
+
+        The changed rows are snapshotted here (on the caller's thread) and
+        written by the writer thread if there is one. Returns a Future for
+        the write, or None if nothing changed.
+        """
+        self._ensure_loaded()
+        if self.backend is None:
+            raise RuntimeError(f"Store '{self.name}' has not been loaded")
+
+        # After a failed write the database may be behind, so rewrite the whole table
+        replace_all = self._write_failed
+        self._write_failed = False
+        if replace_all:
+            self.load_all()
+
+        dumps = self.serializer.dumps
+        current = {key: dumps(self._encode(value)) for key, value in self._rows().items()}
+        if replace_all:
+            upserts, deletes = current, []
+        else:
+            upserts = {key: value for key, value in current.items() if self._persisted.get(key) != value}
+            deletes = [key for key in self._persisted if key not in current and key not in self._unloaded]
+        # Rows that aren't in memory are unchanged by definition
+        current.update((key, _UNLOADED) for key in self._unloaded)
+        self._persisted = current
+        self._after_snapshot(upserts, deletes, replace_all)
+
+        if not upserts and not deletes and not replace_all:
+            return None
+
+        self.version += 1
+        return self._submit(self.backend.write_rows, self.name, upserts, deletes, replace_all, self.journaled)
+
+    def snapshot_rows(self):
+        """Save pending changes and return the serialized rows, for export_rows()
+
+        Only the row references are copied (serialized values are never changed
+        in place), so this is cheap enough for the event loop thread.
+        """
+        self.save()
+        return dict(self._persisted), self._last_write
+
+    def export_rows(self, snapshot):
+        """Return the plain contents captured by snapshot_rows(); safe to run in a worker thread"""
+        rows, last_write = snapshot
+        # Rows evicted before the snapshot may still be waiting on the writer thread
+        if last_write is not None:
+            try:
+                last_write.result()
+            except Exception:
+                pass
+
+        data = {}
+        for key, raw in rows.items():
+            if raw is _UNLOADED:
+                raw = self.backend.read_row(self.name, key)
+                if raw is None:
+                    continue
+            data[key] = self.serializer.loads(raw)
+        return self._from_rows(data)
+
+    def _submit(self, func, *args):
+        """Run a database write on the writer thread (or inline without one)"""
+        if self.writer is None:
+            future = Future()
+            future.set_result(func(*args))
+            return future
+
+        future = self.writer.submit(func, *args)
+        future.add_done_callback(self._on_written)
+        self._last_write = future
+        return future
+
+    def _on_written(self, future):
+        # Runs on the writer thread
+        if future.exception() is not None:
+            self._write_failed = True
+            print(f"Error writing {self.name} store: {future.exception()}")
+
+
+class DictStore(_Store, MutableMapping):
+    """Dict-like data store persisted one row per top-level key
+
+    Rows are read lazily: only the keys are loaded up front and each value
+    is read from the database on first access.
+    """
+
+    lazy = True
+
+    def __init__(self, name, legacy_file=None, serializer=None, codec=None):
+        _Store.__init__(self, name, legacy_file, serializer, codec)
+        self._data = {}
+
+    def _ensure(self, key):
+        self._ensure_loaded()
+        if key in self._unloaded:
+            self._load_key(key)
+
+    def __getitem__(self, key):
+        self._ensure(key)
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        self._ensure(key)
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        self._ensure(key)
+        del self._data[key]
+
+    def __iter__(self):
+        self._ensure_loaded()
+        # Snapshot the keys - iterating may load rows into _data
+        return iter(list(self._data) + list(self._unloaded))
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._data) + len(self._unloaded)
+
+    def __contains__(self, key):
+        self._ensure_loaded()
+        return key in self._data or key in self._unloaded
+
+    def __repr__(self):
+        return f"DictStore({self.name!r}, {len(self._data)} loaded, {len(self._unloaded)} unloaded)"
+
+    def replace(self, data):
+        """Replace the whole contents with a plain dict"""
+        self._ensure_loaded()
+        self._data = {key: self._decode(value) for key, value in data.items()}
+        # Rows that weren't loaded are replaced too, so the next save deletes them
+        self._unloaded = set()
+
+    def export(self):
+        """Return the contents as a plain dict (for backups), without keeping unloaded rows in memory"""
+        self._ensure_loaded()
+        data = {key: self._encode(value) for key, value in self._data.items()}
+        for key in list(self._unloaded):
+            raw = self.backend.read_row(self.name, key)
+            if raw is not None:
+                data[key] = self.serializer.loads(raw)
+        return data
+
+    def _rows(self):
+        return self._data
+
+    def _install(self, rows):
+        self._data = {key: self._decode(value) for key, value in rows.items()}
+
+    def _install_key(self, key, value, replay=True):
+        self._data[key] = self._decode(value)
+
+    def _evict_key(self, key):
+        self._data.pop(key, None)
+
+    def _to_rows(self, data):
+        return dict(data)
+
+    def _from_rows(self, rows):
+        return rows
+
+
+class ListStore(_Store, MutableSequence):
+    """List-like data store persisted one row per position"""
+
+    def __init__(self, name, legacy_file=None, serializer=None):
+        _Store.__init__(self, name, legacy_file, serializer)
+        self._data = []
+
+    def __getitem__(self, index):
+        self._ensure_loaded()
+        return self._data[index]
+
+    def __setitem__(self, index, value):
+        self._ensure_loaded()
+        self._data[index] = value
+
+    def __delitem__(self, index):
+        self._ensure_loaded()
+        del self._data[index]
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._data)
+
+    def insert(self, index, value):
+        self._ensure_loaded()
+        self._data.insert(index, value)
+
+    def __repr__(self):
+        return f"ListStore({self.name!r}, {self._data!r})"
+
+    def replace(self, data):
+        """Replace the whole contents with a plain list"""
+        self._ensure_loaded()
+        self._data = list(data)
+
+    def export(self):
+        """Return the contents as a plain list (for backups)"""
+        self._ensure_loaded()
+        return list(self._data)
+
+    def _rows(self):
+        return {str(index): value for index, value in enumerate(self._data)}
+
+    def _install(self, rows):
+        self._data = [rows[key] for key in sorted(rows, key=int)]
+
+    def _to_rows(self, data):
+        return {str(index): value for index, value in enumerate(data)}
+
+    def _from_rows(self, rows):
+        return [rows[key] for key in sorted(rows, key=int)]
+
+
+class JournaledStore(DictStore):
+    """DictStore of {guild_id: {user_id: [entries]}} with an append-only journal
+
+    append_entry and set_entries write one journal line instead of the whole
+    guild row. Once the journal holds compact_threshold lines the affected
+    rows are rewritten as snapshots and their journal lines dropped.
+    """
+
+    journaled = True
+
+    def __init__(self, name, legacy_file=None, compact_threshold=1000, serializer=None):
+        DictStore.__init__(self, name, legacy_file, serializer)
+        self.compact_threshold = compact_threshold
+        # Number of journal lines per key that aren't folded into its snapshot row yet
+        self._journal_counts = {}
+        # Journal ops of rows that aren't loaded yet, applied when they are
+        self._pending_ops = {}
+
+    def _after_install(self, restored_keys):
+        self.backend.create_journal(self.name)
+        self._journal_counts = {}
+        self._pending_ops = {}
+
+        try:
+            lines, corrupt = self.backend.read_journal(self.name)
+        except sqlite3.DatabaseError as e:
+            print(f"❌ Could not read the {self.name} journal: {e}")
+            return
+        if corrupt:
+            print(f"⚠️ Skipped {corrupt} corrupt line(s) in the {self.name} journal")
+
+        for key, line in lines:
+            # Rows restored from a backup already contain their journaled entries
+            if key in restored_keys:
+                continue
+            try:
+                op = json.loads(line)
+                if key in self._unloaded:
+                    self._pending_ops.setdefault(key, []).append(op)
+                else:
+                    self._apply(key, op)
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"⚠️ Skipped invalid line in the {self.name} journal: {e}")
+                continue
+            self._journal_counts[key] = self._journal_counts.get(key, 0) + 1
+
+    def _after_snapshot(self, upserts, deletes, replace_all):
+        # Rewritten rows have their journal lines dropped in the same transaction
+        if replace_all:
+            self._journal_counts = {}
+        for key in list(upserts) + list(deletes):
+            self._journal_counts.pop(key, None)
+
+    def _install_key(self, key, value, replay=True):
+        self._data[key] = self._decode(value)
+        ops = self._pending_ops.pop(key, [])
+        for op in ops if replay else []:
+            try:
+                self._apply(key, op)
+            except (KeyError, TypeError) as e:
+                print(f"⚠️ Skipped invalid line in the {self.name} journal: {e}")
+
+    def replace(self, data):
+        """Replace the whole contents with a plain dict, discarding the journal"""
+        self._ensure_loaded()
+        # The next save rewrites (or deletes) every journaled row, which drops its journal
+        # lines, and ops queued for rows that weren't loaded must not be replayed later
+        for key in self._journal_counts:
+            self._persisted[key] = None
+        self._pending_ops = {}
+        DictStore.replace(self, data)
+
+    def evict(self, key):
+        # Journal lines aren't re-read on reload, so fold the row's lines into its snapshot first
+        if key in self._journal_counts and key in self._persisted and key not in self._unloaded:
+            self._persisted[key] = None
+        DictStore.evict(self, key)
+
+    def _apply(self, key, op):
+        self._ensure(key)
+        users = self._data.setdefault(key, {})
+        if op["op"] == "append":
+            users.setdefault(op["user"], []).append(op["entry"])
+        elif op["op"] == "set":
+            users[op["user"]] = op["entries"]
+        else:
+            raise KeyError(op["op"])
+
+    def _journal(self, key, op):
+        self._apply(key, op)
+        if self.backend is None:
+            raise RuntimeError(f"Store '{self.name}' has not been loaded")
+
+        self._submit(self.backend.append_journal, self.name, key, json.dumps(op))
+        self.version += 1
+        self._journal_counts[key] = self._journal_counts.get(key, 0) + 1
+        if sum(self._journal_counts.values()) >= self.compact_threshold:
+            self.compact()
+
+    def append_entry(self, key, user_id, entry):
+        """Append an entry to a user's list (one journal line)"""
+        self._journal(key, {"op": "append", "user": user_id, "entry": entry})
+
+    def set_entries(self, key, user_id, entries):
+        """Replace a user's whole list, e.g. when clearing it (one journal line)"""
+        self._journal(key, {"op": "set", "user": user_id, "entries": list(entries)})
+
+    def compact(self):
+        """Fold the journal into snapshot rows of the keys it touched"""
+        upserts = {}
+        deletes = []
+        # Reading an unloaded row may repair it with a save, which changes _journal_counts
+        for key in list(self._journal_counts):
+            if key in self:
+                upserts[key] = self.serializer.dumps(self._encode(self[key]))
+                self._persisted[key] = upserts[key]
+            else:
+                deletes.append(key)
+                self._persisted.pop(key, None)
+
+        self._journal_counts = {}
+        if upserts or deletes:
+            self._submit(self.backend.write_rows, self.name, upserts, deletes, False, True)